@@ -5,7 +5,8 @@ from starlette.requests import Request
 from starlette.responses import JSONResponse
 
 from app.repository.exceptions import IntegrityException
-from app.service.exceptions import RecordNotFoundException, ValidationException
+from app.service import executor_service
+from app.service.exceptions import RecordNotFoundException, ValidationException, ConflictException
 
 app = FastAPI()
 logger = logging.getLogger(__name__)
@@ -18,11 +19,12 @@ async def startup():
 
 @app.on_event("shutdown")
 async def shutdown():
-    pass
+    executor_service.shutdown()
 
 
 from app.rest.schema_rest import router as schema_router
 from app.rest.domain_rest import router as domain_router
+from app.rest.event_rest import router as event_router
 from app.rest.hook_config_rest import router as config_router
 from app.rest.health_check_rest import router as health_router
 
@@ -30,6 +32,7 @@ app.include_router(health_router)
 app.include_router(config_router)
 app.include_router(schema_router)
 app.include_router(domain_router)
+app.include_router(event_router)
 
 
 def _exception_handler(_request: Request, _exc: Exception):
@@ -39,6 +42,9 @@ def _exception_handler(_request: Request, _exc: Exception):
     if isinstance(_exc, IntegrityException):
         return JSONResponse(status_code=409, content={"message": str(_exc), "detail": None})
 
+    if isinstance(_exc, ConflictException):
+        return JSONResponse(status_code=409, content={"message": str(_exc), "detail": _exc.details})
+
     if isinstance(_exc, ValidationException):
         return JSONResponse(status_code=400, content={"message": str(_exc), "detail": _exc.details})
 
@@ -8,8 +8,44 @@ class MongoSettings(BaseModel):
     connection_uri: str
 
 
+class ExpressionSettings(BaseModel):
+    engine: str = 'pyparsing'
+    cache_size: int = 1024
+    max_length: int = 2000
+    max_nesting: int = 8
+    max_depth: int = 32
+    max_nodes: int = 256
+    max_operations: int = 128
+    max_exponent: int = 64
+    max_result_bits: int = 4096
+    max_sequence_length: int = 10000
+
+
+class HookSettings(BaseModel):
+    routing_ttl: float = 30
+
+
+class SchemaSettings(BaseModel):
+    cache_ttl: float = 30
+    validator: str = 'jsonschema'
+
+
+class DomainSettings(BaseModel):
+    import_batch_size: int = 1000
+
+
+class ExecutorSettings(BaseModel):
+    workers: int = 2
+    threshold: int = 20000
+
+
 class AppSettings(BaseSettings):
     mongo: MongoSettings
+    expression: ExpressionSettings = ExpressionSettings()
+    hooks: HookSettings = HookSettings()
+    schemas: SchemaSettings = SchemaSettings()
+    executor: ExecutorSettings = ExecutorSettings()
+    domains: DomainSettings = DomainSettings()
 
     class Config:
         env_nested_delimiter = "__"
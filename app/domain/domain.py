@@ -1,6 +1,6 @@
 from datetime import datetime
 from enum import Enum
-from typing import Optional, List
+from typing import Any, Optional, List
 
 from fastapi.openapi.models import Schema
 from pydantic import Field
@@ -51,3 +51,35 @@ class DomainEvent(HookBaseDomain):
     class Meta:
         collection_name: str = "domain_event"
         key = ('id',)
+
+
+class DomainEventBulkResult(HookBaseDomain):
+    index: int
+    schema_name: Optional[str]
+    domain_id: Optional[str]
+    event_name: Optional[str]
+    events: List[DomainEvent] = Field([])
+    error: Optional[str]
+    detail: Optional[Any]
+
+
+class DomainBulkResult(HookBaseDomain):
+    index: int
+    domain_id: Optional[str]
+    created: Optional[bool]
+    error: Optional[str]
+    detail: Optional[Any]
+
+
+class DomainImportResult(HookBaseDomain):
+    total: int = 0
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    errors: List[DomainBulkResult] = Field([])
+
+
+class DomainPatchResult(HookBaseDomain):
+    domain: Domain
+    changed_paths: List[str] = Field([])
+    events: List[DomainEvent] = Field([])
@@ -24,6 +24,8 @@ class OID(str):
 
     @classmethod
     def validate(cls, v):
+        if isinstance(v, ObjectId):
+            return v
         try:
             return ObjectId(str(v))
         except InvalidId as exc:
@@ -48,6 +50,12 @@ class Webhook(HookBaseDomain):
     attempts: Optional[int] = Field(0)
 
 
+class HookCondition(HookBaseDomain):
+    normalized: Optional[str]
+    paths: Optional[List[str]]
+    always_true: Optional[bool] = Field(False)
+
+
 class Hook(HookBaseDomain):
     id: Optional[OID]
     type: Optional[HookType]
@@ -55,6 +63,7 @@ class Hook(HookBaseDomain):
     schema_name: Optional[str]
     event_name: Optional[str]
     condition: Optional[str]
+    condition_info: Optional[HookCondition]
     webhook: Optional[Webhook]
     queue_name: Optional[str]
 
@@ -1,33 +1,24 @@
 import typing
-from functools import partial
-from typing import Type
+from collections import defaultdict
+from typing import AsyncIterator, Dict, List, Set, Tuple, Type
 
-from bson import ObjectId
-from pymongo import ReturnDocument
+from pymongo import ASCENDING, ReturnDocument
 from pymongo.errors import DuplicateKeyError
 from pymongo.results import InsertOneResult
 
 from app.domain.hook import HookBaseDomain
 from app.repository.exceptions import IntegrityException
+from app.repository.mapping import get_mapping
 from app.repository.mongo import database
 from app.repository.mongo.database import default_database, from_mongo
-from app.repository.utils import split_key_and_values, get_collection_name, fill_audit
+from app.repository.utils import split_key_and_values, get_collection_name, fill_audit, create_audit_info
 
 E = typing.TypeVar("E", bound=HookBaseDomain)
 
 
-def _set_document_id(document: dict):
-    document_id = document.pop("id", None)
-
-    if document_id and not document.get("_id", None):
-        document["_id"] = document_id
-
-    return document
-
-
 async def create(entity: E) -> E:
     try:
-        mongo_dict = await fill_audit(_set_document_id(entity.dict()))
+        mongo_dict = await fill_audit(get_mapping(entity).to_document(entity))
         insert_result: InsertOneResult = await default_database[get_collection_name(entity)].insert_one(mongo_dict)
         document_id = insert_result.inserted_id
         inserted_document = {"_id": document_id, **mongo_dict}
@@ -48,40 +39,117 @@ async def update(entity: E, return_as: Type[E] = None) -> E:
     return from_mongo(type(entity) if not return_as else return_as, updated) if updated else None
 
 
+async def update_paths(entity: E, set_fields: dict, unset_fields: dict, return_as: Type[E] = None,
+                       expected: dict = None) -> E:
+    """
+    Atualiza somente os caminhos informados (notação com ponto) do documento da chave da entidade. Com expected, o
+    documento só é atualizado se ainda tiver esses valores; senão o retorno é None, como para uma chave inexistente.
+    """
+    key_filter, _ = split_key_and_values(entity)
+    if expected:
+        key_filter = {**key_filter, **expected}
+    changes = {"$set": {**set_fields, **create_audit_info()}}
+    if unset_fields:
+        changes["$unset"] = unset_fields
+
+    updated = await default_database[get_collection_name(entity)].find_one_and_update(
+        key_filter, changes, return_document=ReturnDocument.AFTER
+    )
+    return from_mongo(type(entity) if not return_as else return_as, updated) if updated else None
+
+
 async def find_by_key(entity: E, return_as: Type[E], skip: int = 0, limit: int = 100):
     key_filter, _ = split_key_and_values(entity)
     cursor = default_database[get_collection_name(entity)].find(key_filter, skip=skip, limit=limit)
     return [from_mongo(return_as, document) async for document in cursor]
 
 
+async def find_by_keys(entities: List[E], return_as: Type[E]) -> List[E]:
+    """
+    Busca várias entidades pelas chaves em uma única consulta: as chaves são agrupadas pelos atributos iniciais
+    e o último atributo da chave vira um $in.
+    """
+    groups = defaultdict(set)
+    for entity in entities:
+        key_filter, _ = split_key_and_values(entity)
+        *prefix, (last_attr, last_value) = key_filter.items()
+        groups[(tuple(prefix), last_attr)].add(last_value)
+
+    if not groups:
+        return []
+
+    filters = [{**dict(prefix), attr: {"$in": list(values)}} for (prefix, attr), values in groups.items()]
+    query = filters[0] if len(filters) == 1 else {"$or": filters}
+
+    cursor = default_database[get_collection_name(entities[0])].find(query)
+    return [from_mongo(return_as, document) async for document in cursor]
+
+
 async def find_first_by_key(entity: E, return_as: Type[E]):
-    ret = await find_by_key(entity, return_as, 0, 0)
-    return ret[0] if ret else None
+    key_filter, _ = split_key_and_values(entity)
+    document = await default_database[get_collection_name(entity)].find_one(key_filter)
+    return from_mongo(return_as, document) if document else None
 
 
-async def find_by_example(entity: E, return_as: Type[E], skip: int = 0, limit: int = 100):
-    key_filter = entity.dict(exclude_defaults=True, exclude_none=True, exclude_unset=True)
+def _find_by_example(entity: E, skip: int, limit: int, after: dict = None, sort: bool = False,
+                     projection: dict = None):
+    mapping = get_mapping(entity)
+    key_filter = mapping.to_document(entity, {"exclude_defaults": True, "exclude_none": True, "exclude_unset": True})
 
     limits = {"skip": skip, "limit": limit}
 
     if limit <= 0:
         limits = {}
 
-    entity_id = key_filter.pop("id", None)
+    if limit > 0 or sort:
+        limits["sort"] = [(field, ASCENDING) for field in mapping.sort_fields]
+
+    if after:
+        key_filter = _merge_filters(key_filter, mapping.keyset_filter(after))
+
+    return mapping.get_collection(default_database).find(key_filter, projection, **limits)
+
 
-    if entity_id:
-        key_filter["_id"] = ObjectId(entity_id) if type(entity_id) == str else entity_id
+async def find_by_example(entity: E, return_as: Type[E], skip: int = 0, limit: int = 100, after: dict = None,
+                          fields: Tuple[str, ...] = None):
+    """
+    Com fields, somente esses atributos são lidos do banco e o retorno é o modelo parcial correspondente.
+    """
+    projection = None
+    if fields:
+        return_as, projection = get_mapping(return_as).projection(fields)
 
-    cursor = default_database[get_collection_name(entity)].find(key_filter, **limits)
+    cursor = _find_by_example(entity, skip, limit, after, projection=projection)
     return [from_mongo(return_as, document) async for document in cursor]
 
 
+async def iter_by_example(entity: E, return_as: Type[E], after: dict = None,
+                          trusted: bool = False, fields: Tuple[str, ...] = None) -> AsyncIterator[E]:
+    """
+    Percorre todos os documentos do exemplo na ordem da chave, um de cada vez, sem montar a lista completa.
+    """
+    projection = None
+    if fields:
+        return_as, projection = get_mapping(return_as).projection(fields)
+
+    async for document in _find_by_example(entity, 0, 0, after, sort=True, projection=projection):
+        yield from_mongo(return_as, document, trusted)
+
+
+def _merge_filters(first: dict, second: dict) -> dict:
+    return {"$and": [first, second]} if set(first) & set(second) else {**first, **second}
+
+
 async def _get_collection(entity):
     return default_database[get_collection_name(entity)]
 
 
 async def upsert(entity: E) -> E:
-    return await database.upsert(entity, partial(get_collection_name, entity=entity))
+    return await database.upsert(entity)
+
+
+async def bulk_upsert(entities: List[E]) -> Tuple[Set[int], Dict[int, str]]:
+    return await database.bulk_upsert(entities)
 
 
 async def replace(entity: E) -> E:
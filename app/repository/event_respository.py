@@ -1,8 +1,11 @@
-from typing import List
+from typing import AsyncIterator, Dict, List, Tuple
 
 from bson import ObjectId
+from pymongo import ASCENDING
+from pymongo.errors import BulkWriteError
 
 from app.domain.domain import DomainEvent, DomainEventStatus
+from app.repository.mapping import get_mapping
 from app.repository.mongo import database
 from app.repository.mongo.database import default_database
 
@@ -11,11 +14,31 @@ def _get_collection():
     return default_database[DomainEvent.Meta.collection_name]
 
 
-async def create_events(list_events: List[DomainEvent]):
-    events = [evt.dict() for evt in list_events]
-    result = await _get_collection().insert_many(events)
-    cursor = _get_collection().find({"_id": {"$in": result.inserted_ids}})
-    return [database.from_mongo(DomainEvent, row) async for row in cursor]
+def _to_document(evt: DomainEvent) -> dict:
+    evt.id = evt.id or ObjectId()
+    return get_mapping(DomainEvent).to_document(evt)
+
+
+async def create_events(list_events: List[DomainEvent]) -> List[DomainEvent]:
+    # Os ids são gerados aqui, então os próprios eventos são o resultado, sem reler os documentos inseridos.
+    await _get_collection().insert_many([_to_document(evt) for evt in list_events])
+    return list_events
+
+
+async def insert_events(list_events: List[DomainEvent]) -> Dict[int, str]:
+    """
+    Insere os eventos em um único insert_many não ordenado.
+    Retorna as mensagens de erro por posição dos eventos que não foram gravados.
+    """
+    if not list_events:
+        return {}
+
+    try:
+        await _get_collection().insert_many([_to_document(evt) for evt in list_events], ordered=False)
+    except BulkWriteError as err:
+        return {error["index"]: error["errmsg"] for error in err.details.get("writeErrors", [])}
+
+    return {}
 
 
 async def get_event_and_mark_processing(event_id: str) -> None | DomainEvent:
@@ -28,29 +51,23 @@ async def get_event_and_mark_processing(event_id: str) -> None | DomainEvent:
     return None
 
 
-async def find_pending_events(limit_date) -> List[DomainEvent]:
+async def find_pending_events(limit_date, trusted: bool = False) -> List[DomainEvent]:
     cursor = _get_collection().find(
         {
             'status': DomainEventStatus.CREATED,
             'eta': {'$lte': limit_date}
         }
     )
-    return [database.from_mongo(DomainEvent, row) async for row in cursor]
+    return [database.from_mongo(DomainEvent, row, trusted) async for row in cursor]
 
 
-async def find_events(schema_name,
-                      event_id=None,
-                      event_name=None,
-                      queue_name=None,
-                      skip: int = 0, limit: int = 100):
-    limits = {"skip": skip, "limit": limit}
+def _find_events(schema_name, event_id=None, event_name=None, queue_name=None,
+                 skip: int = 0, limit: int = 100, after: dict = None, projection: dict = None):
+    limits = {"skip": skip, "limit": limit} if limit > 0 else {}
     filters = {'schema_name': schema_name}
 
-    if limit <= 0:
-        limits = {}
-
     if event_id:
-        filters['id'] = ObjectId(str(event_id))
+        filters['_id'] = ObjectId(str(event_id))
 
     if event_name:
         filters['event_name'] = event_name
@@ -58,5 +75,37 @@ async def find_events(schema_name,
     if queue_name:
         filters['hook.queue_name'] = queue_name
 
-    cursor = _get_collection().find(filters, **limits)
-    return [database.from_mongo(DomainEvent, row) async for row in cursor]
\ No newline at end of file
+    if after:
+        after_filter = get_mapping(DomainEvent).keyset_filter(after)
+        filters = {'$and': [filters, after_filter]} if '_id' in filters else {**filters, **after_filter}
+
+    return _get_collection().find(filters, projection, sort=[('_id', ASCENDING)], **limits)
+
+
+def _return_type(fields):
+    return get_mapping(DomainEvent).projection(fields) if fields else (DomainEvent, None)
+
+
+async def find_events(schema_name,
+                      event_id=None,
+                      event_name=None,
+                      queue_name=None,
+                      skip: int = 0, limit: int = 100,
+                      trusted: bool = False,
+                      after: dict = None,
+                      fields: Tuple[str, ...] = None):
+    return_as, projection = _return_type(fields)
+    cursor = _find_events(schema_name, event_id, event_name, queue_name, skip, limit, after, projection)
+    return [database.from_mongo(return_as, row, trusted) async for row in cursor]
+
+
+async def iter_events(schema_name,
+                      event_id=None,
+                      event_name=None,
+                      queue_name=None,
+                      trusted: bool = False,
+                      after: dict = None,
+                      fields: Tuple[str, ...] = None) -> AsyncIterator[DomainEvent]:
+    return_as, projection = _return_type(fields)
+    async for row in _find_events(schema_name, event_id, event_name, queue_name, 0, 0, after, projection):
+        yield database.from_mongo(return_as, row, trusted)
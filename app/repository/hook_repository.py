@@ -9,11 +9,12 @@ def _get_collection():
     return default_database[Hook.Meta.collection_name]
 
 
-async def find_eligible_hooks(schema_name: str, event_name: str, tags: List[str]) -> List[Hook]:
+async def find_eligible_hooks(schema_name: str, event_name: str, tags: List[List[str]]) -> List[Hook]:
     tags_filter = {}
 
-    if tags:
-        tags_filter = {"tags": {"$all": tags}}
+    # Um grupo vazio aceita qualquer hook, então o filtro só é aplicado quando todos os grupos têm tags.
+    if tags and all(tags):
+        tags_filter = {"$or": [{"tags": {"$all": filter_tags}} for filter_tags in tags]}
 
     cursor = _get_collection().find(
         {
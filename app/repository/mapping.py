@@ -0,0 +1,172 @@
+import typing
+from enum import Enum
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple, Type
+
+from bson import ObjectId
+from pydantic import BaseModel, create_model
+from pydantic.fields import ModelField, SHAPE_LIST, SHAPE_SINGLETON
+
+from app.domain.hook import OID, HookBaseDomain
+from app.repository.exceptions import RepositoryException
+from app.utils.misc import get_meta
+
+E = typing.TypeVar("E", bound=HookBaseDomain)
+Converter = Callable[[Any], Any]
+
+
+def _trusted_converter(field: ModelField) -> Optional[Converter]:
+    """
+    Conversão mínima de um valor lido do banco para o tipo do atributo: modelos aninhados (construídos também
+    sem validação) e enums. Os demais valores já estão no tipo gravado.
+    """
+    type_ = field.type_
+    if not isinstance(type_, type) or field.shape not in (SHAPE_SINGLETON, SHAPE_LIST):
+        return None
+
+    if issubclass(type_, BaseModel):
+        def convert(value):
+            return get_mapping(type_).construct(value) if isinstance(value, dict) else value
+    elif issubclass(type_, Enum):
+        convert = type_
+    else:
+        return None
+
+    if field.shape == SHAPE_LIST:
+        return lambda values: [convert(value) for value in values]
+    return convert
+
+
+class EntityMapping:
+    """
+    Metadados de persistência de uma classe de domínio, calculados uma única vez por classe: coleção, atributos da
+    chave, atributos do tipo OID e as conversões entre entidade e documento.
+    """
+    __slots__ = ('entity_cls', 'collection_name', 'key', 'oid_fields', 'sort_fields', '_trusted_fields',
+                 '_projections')
+
+    def __init__(self, entity_cls: Type[E]):
+        self.entity_cls = entity_cls
+        self.collection_name: Optional[str] = get_meta(entity_cls, "collection_name", raise_exc=False)
+        self.key: Tuple[str, ...] = tuple(get_meta(entity_cls, "key", raise_exc=False) or ())
+        self.oid_fields: FrozenSet[str] = frozenset(
+            name for name, field in entity_cls.__fields__.items() if field.type_ is OID)
+        self.sort_fields: Tuple[str, ...] = tuple(
+            "_id" if name in self.oid_fields else name for name in self.key) or ("_id",)
+        self._trusted_fields: List[Tuple[str, str, Optional[Converter]]] = [
+            (field.alias, name, _trusted_converter(field)) for name, field in entity_cls.__fields__.items()]
+        self._projections: Dict[Tuple[str, ...], Tuple[Type[E], dict]] = {}
+
+    def split_key_and_values(self, entity: E, to_dict_opts: dict = None) -> Tuple[dict, dict]:
+        key_filter = {}
+        dict_entity = entity.dict(**to_dict_opts or {})
+
+        for key_attr in self.key or list(dict_entity.keys()):
+            value = dict_entity.pop(key_attr)
+
+            if not value:
+                raise RepositoryException(f"A chave não pode ter atributos nulos: {key_attr}")
+
+            if key_attr in self.oid_fields or isinstance(value, ObjectId):
+                key_filter["_id"] = ObjectId(value) if type(value) == str else value
+            else:
+                key_filter[key_attr] = value
+
+        return key_filter, dict_entity
+
+    def to_document(self, entity: E, to_dict_opts: dict = None) -> dict:
+        document = entity.dict(**to_dict_opts or {})
+        document_id = document.pop("id", None)
+
+        if document_id and not document.get("_id", None):
+            document["_id"] = ObjectId(document_id) if type(document_id) == str else document_id
+
+        return document
+
+    def from_document(self, document: dict, trusted: bool = False) -> E:
+        """
+        Com trusted=True o modelo é montado sem validação (construct), para documentos gravados pela própria
+        aplicação.
+        """
+        data = dict(document)
+        document_id = data.pop("id", None)
+        document_id = data.pop("_id", document_id)
+        document_id = document_id if document_id is not None else OID()
+
+        if trusted:
+            data["id"] = document_id
+            return self.construct(data)
+
+        return self.entity_cls(**data, id=document_id)
+
+    def construct(self, data: dict) -> E:
+        values = {}
+        for alias, name, convert in self._trusted_fields:
+            if alias in data:
+                value = data[alias]
+                values[name] = convert(value) if convert and value is not None else value
+        return self.entity_cls.construct(**values)
+
+    def cursor_of(self, entity: E) -> dict:
+        """
+        Valores da chave de ordenação (sort_fields) da entidade, usados como posição de continuação da paginação.
+        """
+        names = self.key or ("id",)
+        return {
+            field: ObjectId(str(getattr(entity, name))) if field == "_id" else getattr(entity, name)
+            for field, name in zip(self.sort_fields, names)
+        }
+
+    def keyset_filter(self, after: dict) -> dict:
+        """
+        Filtro dos documentos posteriores a uma posição na ordem de sort_fields: (a, b) > (a0, b0) equivale a
+        a > a0 ou (a == a0 e b > b0).
+        """
+        if set(after) != set(self.sort_fields):
+            raise RepositoryException(f"Posição de paginação inválida para {self.entity_cls.__name__}: {list(after)}")
+
+        clauses = []
+        for idx, field in enumerate(self.sort_fields):
+            clause = {previous: after[previous] for previous in self.sort_fields[:idx]}
+            clause[field] = {"$gt": after[field]}
+            clauses.append(clause)
+
+        return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+    def projection(self, fields: typing.Iterable[str]) -> Tuple[Type[E], dict]:
+        """
+        Modelo parcial com os atributos pedidos (mais os da chave, usados na paginação) e a projeção equivalente
+        do Mongo. Calculados uma vez por combinação de atributos.
+        """
+        selected = set(fields) | set(self.key or ("id",))
+        names = tuple(name for name in self.entity_cls.__fields__ if name in selected)
+
+        if names not in self._projections:
+            partial_cls = create_model(
+                f"{self.entity_cls.__name__}Projection",
+                __base__=HookBaseDomain,
+                **{name: (Optional[self.entity_cls.__fields__[name].outer_type_], None) for name in names})
+            if hasattr(self.entity_cls, "Meta"):
+                partial_cls.Meta = self.entity_cls.Meta
+            document_fields = {"_id" if name in self.oid_fields else self.entity_cls.__fields__[name].alias: 1
+                               for name in names}
+            self._projections[names] = partial_cls, document_fields
+
+        return self._projections[names]
+
+    def get_collection(self, db):
+        if not self.collection_name:
+            raise TypeError(f"Entity {self.entity_cls} does not have meta attribute: collection_name")
+        return db[self.collection_name]
+
+
+_mappings: Dict[type, EntityMapping] = {}
+
+
+def get_mapping(entity: typing.Union[E, Type[E]]) -> EntityMapping:
+    entity_cls = entity if isinstance(entity, type) else type(entity)
+    mapping = _mappings.get(entity_cls)
+
+    if mapping is None:
+        mapping = _mappings.setdefault(entity_cls, EntityMapping(entity_cls))
+
+    return mapping
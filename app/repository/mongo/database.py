@@ -2,18 +2,19 @@ import asyncio
 import typing
 from datetime import date, datetime, timezone
 from decimal import Decimal
-from functools import partial
-from typing import Tuple
+from typing import Dict, List, Set, Tuple
 
 from bson import Decimal128
 from bson.codec_options import CodecOptions, TypeCodec, TypeRegistry
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import MongoClient, ReturnDocument
+from pymongo import MongoClient, ReturnDocument, UpdateOne
 from pymongo.database import Database
+from pymongo.errors import BulkWriteError
 
 from app.config.app import settings
-from app.domain.hook import HookBaseDomain, OID
-from app.repository.utils import split_key_and_values, fill_audit
+from app.domain.hook import HookBaseDomain
+from app.repository.mapping import get_mapping
+from app.repository.utils import create_audit_info
 
 E = typing.TypeVar("E", bound=HookBaseDomain)
 
@@ -57,24 +58,51 @@ def create_mongo_client_db() -> Tuple[MongoClient, Database]:
 mongo_client, default_database = create_mongo_client_db()
 
 
-def from_mongo(entity_cls: typing.Type[E], document: dict) -> E:
-    data_copy = dict(document)
-    document_id = data_copy.pop("id", None)
-    document_id = data_copy.pop("_id", document_id)
-    return entity_cls(**data_copy, id=OID(document_id))
+def from_mongo(entity_cls: typing.Type[E], document: dict, trusted: bool = False) -> E:
+    return get_mapping(entity_cls).from_document(document, trusted)
 
 
-async def exists(key_filter, get_collection_name: typing.Callable):
-    return await default_database[get_collection_name()].count_documents(key_filter) > 0
+def _upsert_update(dict_entity: dict, audit_info: dict) -> dict:
+    # Os dados de criação só são gravados quando o upsert insere o documento, sem consulta prévia de existência.
+    return {
+        "$set": {**dict_entity, **audit_info},
+        "$setOnInsert": {"created_by": audit_info["updated_by"], "created_at": audit_info["updated_at"]},
+    }
 
 
-async def upsert(entity: E, get_collection_name: typing.Callable) -> E:
-    key_filter, dict_entity = split_key_and_values(entity, {"exclude_unset": True})
-    exists_rec = partial(exists, key_filter=key_filter, get_collection_name=get_collection_name)
-    dict_entity = await fill_audit(dict_entity, exists_rec)
+async def upsert(entity: E) -> E:
+    mapping = get_mapping(entity)
+    key_filter, dict_entity = mapping.split_key_and_values(entity, {"exclude_unset": True})
 
-    updated = await default_database[get_collection_name()].find_one_and_update(
-        key_filter, {"$set": dict_entity}, upsert=True, return_document=ReturnDocument.AFTER
+    updated = await mapping.get_collection(default_database).find_one_and_update(
+        key_filter,
+        _upsert_update(dict_entity, create_audit_info()),
+        upsert=True,
+        return_document=ReturnDocument.AFTER
     )
 
     return from_mongo(type(entity), updated) if updated else None
+
+
+async def bulk_upsert(entities: List[E]) -> Tuple[Set[int], Dict[int, str]]:
+    """
+    Upsert das entidades pela chave em um único bulk_write não ordenado.
+    Retorna as posições das entidades inseridas e as mensagens de erro por posição das que não foram gravadas.
+    """
+    if not entities:
+        return set(), {}
+
+    mapping = get_mapping(entities[0])
+    audit_info = create_audit_info()
+    operations = []
+    for entity in entities:
+        key_filter, dict_entity = mapping.split_key_and_values(entity, {"exclude_unset": True})
+        operations.append(UpdateOne(key_filter, _upsert_update(dict_entity, audit_info), upsert=True))
+
+    try:
+        result = await mapping.get_collection(default_database).bulk_write(operations, ordered=False)
+    except BulkWriteError as err:
+        return ({upserted["index"] for upserted in err.details.get("upserted", [])},
+                {error["index"]: error["errmsg"] for error in err.details.get("writeErrors", [])})
+
+    return set(result.upserted_ids), {}
@@ -1,44 +1,19 @@
 import typing
 from datetime import datetime
 
-from bson import ObjectId
-
-from app.domain.hook import OID, HookBaseDomain
-from app.repository.exceptions import RepositoryException
+from app.domain.hook import HookBaseDomain
+from app.repository.mapping import get_mapping
 from app.utils.misc import get_meta
 
 E = typing.TypeVar("E", bound=HookBaseDomain)
 
 
-def is_oid(value, key, type_hints):
-    return isinstance(value, ObjectId) or type_hints.get(key, None) == OID
-
-
 def split_key_and_values(entity: E, to_dict_opts: dict = None) -> typing.Tuple[dict, dict]:
-    key_filter = {}
-    dict_entity = entity.dict(**to_dict_opts or {})
-    key = get_meta(entity, "key", raise_exc=False)
-
-    if not key:
-        key = list(dict_entity.keys())
-
-    type_hints = typing.get_type_hints(entity)
-
-    for key_attr in key:
-        key_filter[key_attr] = dict_entity.pop(key_attr)
-
-        if not key_filter[key_attr]:
-            raise RepositoryException(f"A chave não pode ter atributos nulos: {key_attr}")
-
-        if is_oid(key_filter[key_attr], key_attr, type_hints):
-            value = key_filter.pop(key_attr)
-            key_filter["_id"] = ObjectId(value) if type(value) == str else value
-
-    return key_filter, dict_entity
+    return get_mapping(entity).split_key_and_values(entity, to_dict_opts)
 
 
 def get_collection_name(entity: E) -> str:
-    return get_meta(entity, "collection_name")
+    return get_mapping(entity).collection_name or get_meta(entity, "collection_name")
 
 
 def create_audit_info():
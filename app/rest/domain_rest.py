@@ -1,12 +1,16 @@
-from typing import List
+from typing import AsyncIterator, List, Tuple, Union
 
 from fastapi import APIRouter, status, Depends, Path
+from pydantic import ValidationError
+from starlette.requests import Request
 
-from app.domain.domain import Domain, DomainEvent
+from app.domain.domain import Domain, DomainEvent, DomainBulkResult, DomainImportResult, DomainPatchResult
 from app.domain.hook import OID
 from app.rest import utils
-from app.rest.schemas import DomainRequest, DomainEventRequest, FindDomainRequest, FindEventsRequest, UpdateEventRequest
+from app.rest.schemas import DomainRequest, DomainEventRequest, FindDomainRequest, FindEventsRequest, \
+    UpdateEventRequest, BulkDomainsRequest, PatchDomainRequest
 from app.service import domain_service, base_service, event_service
+from app.service.exceptions import ValidationException
 
 router = APIRouter(
     tags=['Domain'],
@@ -25,14 +29,68 @@ async def post_domain(domain: DomainRequest, name: str = Path(example='price')):
     return await domain_service.create_domain(Domain(**domain.dict(), schema_name=name))
 
 
+@router.post(
+    f"{URL_BASE_DOMAIN}/bulk",
+    response_model=List[DomainBulkResult],
+    status_code=status.HTTP_200_OK
+)
+async def post_domains_bulk(request: BulkDomainsRequest, name: str = Path(example='price')):
+    return await domain_service.upsert_domains([Domain(**domain.dict(), schema_name=name)
+                                                for domain in request.domains])
+
+
+async def _read_domains(request: Request, name: str) -> AsyncIterator[Tuple[int, Union[Domain, ValidationException]]]:
+    async for index, line in utils.iter_ndjson(request):
+        try:
+            yield index, Domain(**DomainRequest.parse_raw(line).dict(), schema_name=name)
+        except ValidationError as err:
+            yield index, ValidationException('Invalid domain', details=err.errors())
+
+
+@router.post(
+    f"{URL_BASE_DOMAIN}/import",
+    response_model=DomainImportResult,
+    status_code=status.HTTP_200_OK
+)
+async def import_domains(request: Request, name: str = Path(example='price')):
+    return await domain_service.import_domains(_read_domains(request, name))
+
+
 @router.get(
     URL_BASE_DOMAIN,
     response_model=List[Domain],
     status_code=status.HTTP_200_OK
 )
-async def get_domains(name: str, params: FindDomainRequest = Depends()):
-    domain, pagination = utils.get_find_args(params)
-    return await base_service.find_entity(example=Domain(**domain, schema_name=name), **pagination)
+async def get_domains(request: Request, name: str, params: FindDomainRequest = Depends()):
+    domain, pagination = utils.get_find_args(params, Domain)
+
+    if utils.wants_ndjson(request):
+        return utils.ndjson_response(base_service.iter_entity(
+            example=Domain(**domain, schema_name=name), after=pagination.get('after'), fields=pagination.get('fields')))
+
+    domains = await base_service.find_entity(example=Domain(**domain, schema_name=name), **pagination)
+    return utils.list_response(domains, pagination)
+
+
+@router.patch(
+    f"{URL_BASE_DOMAIN}/{{domain_id}}",
+    response_model=DomainPatchResult,
+    status_code=status.HTTP_200_OK
+)
+async def patch_domain(patch: PatchDomainRequest,
+                       name: str = Path(example='price'),
+                       domain_id: str = Path(example='1234567890')):
+    domain, changed_paths = await domain_service.patch_domain(name, domain_id, patch.data)
+    events = []
+
+    if patch.event_name and changed_paths:
+        events = await event_service.insert_domain_event(DomainEvent(
+            event_name=patch.event_name,
+            schema_name=name,
+            domain_id=domain_id,
+            metadata={**(patch.metadata or {}), 'changed_paths': changed_paths}), domain)
+
+    return DomainPatchResult(domain=domain, changed_paths=changed_paths, events=events)
 
 
 @router.delete(
@@ -52,10 +110,10 @@ async def delete_domain(name: str, domain_id: str):
 async def post_domain_event(event: DomainEventRequest,
                             name: str = Path(example='price'),
                             domain_id: str = Path(example='1234567890')):
-    return await event_service.insert_event(DomainEvent(
+    return utils.json_response(await event_service.insert_event(DomainEvent(
         **event.dict(),
         schema_name=name,
-        domain_id=domain_id))
+        domain_id=domain_id)), status_code=status.HTTP_201_CREATED)
 
 
 @router.get(
@@ -63,15 +121,25 @@ async def post_domain_event(event: DomainEventRequest,
     response_model=List[DomainEvent],
     status_code=status.HTTP_200_OK
 )
-async def get_events(name: str, params: FindEventsRequest = Depends()):
-    _, pagination = utils.get_find_args(params)
-
-    return await event_service.find_events_of_schema(
+async def get_events(request: Request, name: str, params: FindEventsRequest = Depends()):
+    _, pagination = utils.get_find_args(params, DomainEvent)
+
+    if utils.wants_ndjson(request):
+        return utils.ndjson_response(event_service.iter_events_of_schema(
+            schema_name=name,
+            event_id=params.id,
+            event_name=params.event_name,
+            queue_name=params.queue_name,
+            after=pagination.get('after'),
+            fields=pagination.get('fields')))
+
+    events = await event_service.find_events_of_schema(
         schema_name=name,
         event_id=params.id,
         event_name=params.event_name,
         queue_name=params.queue_name,
         **pagination)
+    return utils.list_response(events, pagination)
 
 
 @router.patch(
@@ -0,0 +1,24 @@
+from typing import List
+
+from fastapi import APIRouter, status
+
+from app.domain.domain import DomainEvent, DomainEventBulkResult
+from app.rest import utils
+from app.rest.schemas import BulkDomainEventsRequest
+from app.service import event_service
+
+router = APIRouter(
+    tags=['Event'],
+)
+
+URL_BASE = '/api/v1/events'
+
+
+@router.post(
+    f"{URL_BASE}/bulk",
+    response_model=List[DomainEventBulkResult],
+    status_code=status.HTTP_200_OK
+)
+async def post_events_bulk(request: BulkDomainEventsRequest):
+    return utils.json_response(
+        await event_service.insert_events([DomainEvent(**event.dict()) for event in request.events]))
@@ -3,6 +3,8 @@ import logging
 from fastapi import APIRouter
 from starlette import status
 
+from app.service import executor_service
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(
@@ -21,6 +23,15 @@ async def get_health():
     return "ok"
 
 
+@router.get(
+    f'{URL_BASE}/executor',
+    response_model=dict,
+    status_code=status.HTTP_200_OK
+)
+async def get_executor_metrics():
+    return executor_service.metrics()._asdict()
+
+
 # @router.post(
 #     URL_BASE,
 #     response_model=dict,
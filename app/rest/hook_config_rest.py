@@ -2,6 +2,7 @@ from typing import List
 
 from fastapi import APIRouter, Depends
 from starlette import status
+from starlette.requests import Request
 
 from app.domain.hook import Hook, OID
 from app.rest import utils
@@ -29,9 +30,15 @@ async def post_hook(hook_config: HookConfigRequest):
     response_model=List[Hook],
     status_code=status.HTTP_200_OK
 )
-async def get_hooks(params: FindHookConfigRequest = Depends()):
-    domain, pagination = utils.get_find_args(params)
-    return await base_service.find_entity(example=Hook(**domain), **pagination)
+async def get_hooks(request: Request, params: FindHookConfigRequest = Depends()):
+    domain, pagination = utils.get_find_args(params, Hook)
+
+    if utils.wants_ndjson(request):
+        return utils.ndjson_response(base_service.iter_entity(
+            example=Hook(**domain), after=pagination.get('after'), fields=pagination.get('fields')))
+
+    hooks = await base_service.find_entity(example=Hook(**domain), **pagination)
+    return utils.list_response(hooks, pagination)
 
 
 @router.delete(
@@ -40,4 +47,4 @@ async def get_hooks(params: FindHookConfigRequest = Depends()):
     status_code=status.HTTP_202_ACCEPTED
 )
 async def delete_hook(hook_id: OID):
-    return await base_service.delete_entity_by_key(Hook(id=hook_id))
+    return await hook_service.delete_hook_config(Hook(id=hook_id))
@@ -2,11 +2,12 @@ from typing import List
 
 from fastapi import APIRouter, Depends
 from starlette import status
+from starlette.requests import Request
 
 from app.domain.domain import DomainSchema
 from app.rest import utils
 from app.rest.schemas import DomainSchemaRequest, FindDomainSchemaRequest, KeyDomainSchemaRequest
-from app.service import base_service
+from app.service import base_service, schema_service
 
 router = APIRouter(
     tags=['Schema'],
@@ -21,7 +22,7 @@ URL_BASE = '/api/v1/schemas'
     status_code=status.HTTP_201_CREATED
 )
 async def post_schema(domain_schema: DomainSchemaRequest):
-    return await base_service.create_entity(DomainSchema(**domain_schema.dict()))
+    return await schema_service.upsert_schema(DomainSchema(**domain_schema.dict()))
 
 
 @router.get(
@@ -29,9 +30,16 @@ async def post_schema(domain_schema: DomainSchemaRequest):
     response_model=List[DomainSchema],
     status_code=status.HTTP_200_OK
 )
-async def get_schemas(params: FindDomainSchemaRequest = Depends()):
-    domain, pagination = utils.get_find_args(params)
-    return await base_service.find_entity(example=DomainSchema(**domain), **pagination)
+async def get_schemas(request: Request, params: FindDomainSchemaRequest = Depends()):
+    domain, pagination = utils.get_find_args(params, DomainSchema)
+
+    if utils.wants_ndjson(request):
+        return utils.ndjson_response(
+            # Schemas mantêm a leitura validada: o modelo do OpenAPI aceita atributos extras e aliases.
+            base_service.iter_entity(example=DomainSchema(**domain), after=pagination.get('after'), trusted=False))
+
+    schemas = await base_service.find_entity(example=DomainSchema(**domain), **pagination)
+    return utils.list_response(schemas, pagination)
 
 
 @router.delete(
@@ -40,4 +48,4 @@ async def get_schemas(params: FindDomainSchemaRequest = Depends()):
     status_code=status.HTTP_202_ACCEPTED
 )
 async def delete_schema(name: str):
-    return await base_service.delete_entity_by_key(DomainSchema(name=name))
+    return await schema_service.delete_schema(DomainSchema(name=name))
@@ -10,6 +10,7 @@ from app.domain.hook import HookBaseDomain, HookType, OID
 class Pagination(BaseModel):
     page: int = Field(1, example=1, le=1)
     per_page: int = Field(100, example=100, le=200, ge=1)
+    cursor: Optional[str] = Field(None, description='Continuation token returned in the X-Next-Cursor header')
 
 
 class DomainSchemaRequest(HookBaseDomain):
@@ -38,14 +39,28 @@ class DomainRequest(HookBaseDomain):
     tags: Optional[List[List[str]]] = Field(..., example=[["tenant-x"]])
 
 
+class PatchDomainRequest(HookBaseDomain):
+    data: dict = Field(..., example={"price": 29.99}, description='JSON merge patch (RFC 7386) of the domain data')
+    event_name: Optional[str] = Field(None, example='price_changed',
+                                      description='Event emitted with the changed paths when the domain changes')
+    metadata: Optional[dict] = Field(None, example={"source": "erp"}, description='Metadata of the emitted event')
+
+
+class BulkDomainsRequest(HookBaseDomain):
+    domains: List[DomainRequest] = Field(..., min_items=1, max_items=5000)
+
+
 class FindDomainRequest(Pagination, HookBaseDomain):
     domain_id: Optional[str] = Field(None, example='1234567890')
+    fields: Optional[str] = Field(None, example='domain_id,data', description='Comma-separated fields to return')
 
 
 class FindEventsRequest(Pagination, HookBaseDomain):
     event_name: Optional[str] = Field(None, example='price_changed')
     queue_name: Optional[str] = Field(None, example='default')
     id: Optional[OID] = Field(None, description='Event id')
+    fields: Optional[str] = Field(None, example='id,event_name,domain_id',
+                                  description='Comma-separated fields to return')
 
 
 class UpdateEventRequest(HookBaseDomain):
@@ -57,6 +72,15 @@ class DomainEventRequest(HookBaseDomain):
     metadata: Optional[dict] = Field(..., example={"new_price": 30050})
 
 
+class BulkDomainEventRequest(DomainEventRequest):
+    schema_name: str = Field(..., example='price')
+    domain_id: str = Field(..., example='1234567890')
+
+
+class BulkDomainEventsRequest(HookBaseDomain):
+    events: List[BulkDomainEventRequest] = Field(..., min_items=1, max_items=5000)
+
+
 class WebhookRequest(HookBaseDomain):
     callback_url: HttpUrl = Field(..., example='https://example.com/')
     delay_time: int = Field(0, description='Wait time to trigger http request')
@@ -79,3 +103,4 @@ class FindHookConfigRequest(Pagination, HookBaseDomain):
     type: Optional[HookType]
     schema_name: Optional[str]
     event_name: Optional[str]
+    fields: Optional[str] = Field(None, example='id,queue_name,tags', description='Comma-separated fields to return')
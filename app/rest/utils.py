@@ -1,4 +1,109 @@
-def get_find_args(domain):
-    new_domain = domain.dict(exclude={'per_page', 'page'})
+import base64
+from typing import Any, AsyncIterator, List, Tuple, Type
 
-    return new_domain, {"skip": (domain.page - 1) * domain.per_page, "limit": domain.per_page}
+import bson
+from bson.errors import BSONError
+from fastapi.encoders import jsonable_encoder
+from starlette import status
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+
+from app.domain.hook import HookBaseDomain
+from app.service import base_service
+from app.service.exceptions import ValidationException
+
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+
+
+def encode_cursor(after: dict) -> str:
+    return base64.urlsafe_b64encode(bson.encode(after)).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, entity_cls: Type[HookBaseDomain]) -> dict:
+    try:
+        after = bson.decode(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, BSONError):
+        raise ValidationException('Invalid cursor', details=cursor)
+
+    if set(after) != set(base_service.get_cursor_fields(entity_cls)) or \
+            any(isinstance(value, (dict, list)) for value in after.values()):
+        raise ValidationException('Invalid cursor', details=cursor)
+
+    return after
+
+
+def parse_fields(fields: str, entity_cls: Type[HookBaseDomain]) -> Tuple[str, ...]:
+    selected = tuple(dict.fromkeys(field.strip() for field in fields.split(',') if field.strip()))
+    unknown = [field for field in selected if field not in entity_cls.__fields__]
+
+    if unknown:
+        raise ValidationException('Invalid fields', details=unknown)
+
+    return selected
+
+
+def get_find_args(domain, entity_cls: Type[HookBaseDomain] = None):
+    new_domain = domain.dict(exclude={'per_page', 'page', 'cursor', 'fields'})
+    pagination = {"skip": (domain.page - 1) * domain.per_page, "limit": domain.per_page}
+
+    if domain.cursor and entity_cls:
+        pagination.update(skip=0, after=decode_cursor(domain.cursor, entity_cls))
+
+    fields = getattr(domain, 'fields', None)
+    if fields and entity_cls:
+        pagination['fields'] = parse_fields(fields, entity_cls)
+
+    return new_domain, pagination
+
+
+def json_response(content: Any, status_code: int = status.HTTP_200_OK, headers: dict = None) -> JSONResponse:
+    """
+    Modelos já validados (ou lidos pelo caminho confiável do repositório) serializados direto, sem a nova validação
+    que o response_model do endpoint faria na saída; o response_model fica somente para a documentação.
+    """
+    return JSONResponse(jsonable_encoder(content), status_code=status_code, headers=headers)
+
+
+def list_response(entities: List[HookBaseDomain], pagination: dict) -> JSONResponse:
+    """
+    Página cheia indica que pode haver mais registros: a posição do último vira o cursor da próxima página.
+    """
+    headers = {}
+    if pagination['limit'] > 0 and len(entities) == pagination['limit']:
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(base_service.get_cursor(entities[-1]))
+
+    return json_response(entities, headers=headers)
+
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get('accept', '')
+
+
+def ndjson_response(entities: AsyncIterator[HookBaseDomain]) -> StreamingResponse:
+    """
+    Resposta em NDJSON, uma entidade por linha, serializada conforme o cursor do Mongo é percorrido.
+    """
+    async def _lines():
+        async for entity in entities:
+            yield entity.json(by_alias=True) + '\n'
+
+    return StreamingResponse(_lines(), media_type=NDJSON_MEDIA_TYPE)
+
+
+async def iter_ndjson(request: Request) -> AsyncIterator[Tuple[int, bytes]]:
+    """
+    Linhas de um corpo NDJSON lido em streaming, com a posição de cada linha no corpo. Linhas em branco são
+    ignoradas.
+    """
+    index, buffer = 0, b''
+
+    async for chunk in request.stream():
+        *lines, buffer = (buffer + chunk).split(b'\n')
+        for line in lines:
+            if line.strip():
+                yield index, line
+            index += 1
+
+    if buffer.strip():
+        yield index, buffer
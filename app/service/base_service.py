@@ -1,7 +1,8 @@
-from typing import TypeVar, List
+from typing import AsyncIterator, TypeVar, List, Type, Tuple
 
 from app.domain.hook import HookBaseDomain
 from app.repository import base_repository
+from app.repository.mapping import get_mapping
 from app.service.exceptions import RecordNotFoundException
 
 E = TypeVar("E", bound=HookBaseDomain)
@@ -11,8 +12,24 @@ async def create_entity(entity: E) -> E:
     return await base_repository.upsert(entity)
 
 
-async def find_entity(example: E, skip: int = 0, limit: int = 100) -> List[E]:
-    return await base_repository.find_by_example(example, return_as=type(example), skip=skip, limit=limit)
+async def find_entity(example: E, skip: int = 0, limit: int = 100, after: dict = None,
+                      fields: Tuple[str, ...] = None) -> List[E]:
+    return await base_repository.find_by_example(example, return_as=type(example), skip=skip, limit=limit,
+                                                 after=after, fields=fields)
+
+
+def iter_entity(example: E, after: dict = None, trusted: bool = True,
+                fields: Tuple[str, ...] = None) -> AsyncIterator[E]:
+    return base_repository.iter_by_example(example, return_as=type(example), after=after, trusted=trusted,
+                                           fields=fields)
+
+
+def get_cursor_fields(entity_cls: Type[E]) -> Tuple[str, ...]:
+    return get_mapping(entity_cls).sort_fields
+
+
+def get_cursor(entity: E) -> dict:
+    return get_mapping(entity).cursor_of(entity)
 
 
 async def delete_entity_by_key(entity: E) -> E:
@@ -1,35 +1,150 @@
-from jsonschema.exceptions import ValidationError, SchemaError
-from jsonschema.validators import validate
+from typing import AsyncIterator, Dict, Iterable, List, Tuple, Union
 
-from app.domain.domain import DomainSchema, Domain
+from app.config.app import settings
+from app.domain.domain import Domain, DomainBulkResult, DomainImportResult
 from app.repository import base_repository
-from app.service import schema_service
-from app.service.exceptions import RecordNotFoundException, ValidationException
+from app.service import schema_service, executor_service
+from app.service.exceptions import RecordNotFoundException, ValidationException, ConflictException
+from app.service.merge_patch import merge_patch
+from app.service.schema_registry import CompiledSchema
 
-
-def _validate_domain_schema(schema: DomainSchema, domain: Domain):
-    try:
-        validate(instance=domain.dict().get('data'), schema=schema.domain_schema.dict(exclude_none=True))
-    except ValidationError as verr:
-        raise ValidationException(f"Domain has a invalid schema: {schema.name}", details=verr.message)
-    except SchemaError as err:
-        raise ValidationException(f"Invalid schema: {schema.name}", details=err.message)
+PATCH_ATTEMPTS = 3
 
 
 async def create_domain(domain: Domain) -> Domain:
-    schema = await schema_service.get_schema_by_name(domain.schema_name)
-    _validate_domain_schema(schema, domain)
+    schema = await schema_service.get_compiled_schema(domain.schema_name)
+    data = domain.dict().get('data')
+    await executor_service.run(executor_service.size_of(data), schema.validate, data)
     ret = await base_repository.create(domain)
     return ret
 
 
+def _validate_batch(items: List[Tuple[CompiledSchema, dict]]) -> Dict[int, ValidationException]:
+    errors = {}
+    for position, (schema, data) in enumerate(items):
+        try:
+            schema.validate(data)
+        except ValidationException as exc:
+            errors[position] = exc
+    return errors
+
+
+async def upsert_domains(domains: List[Domain]) -> List[DomainBulkResult]:
+    """
+    Grava vários domínios de uma vez: os schemas vêm do registro de schemas compilados, os dados são validados em
+    um lote no executor de CPU e os válidos gravados em um único bulk_write de upserts pela chave. Os erros são
+    informados por item, sem interromper os demais.
+    """
+    results = [DomainBulkResult(index=idx, domain_id=domain.domain_id) for idx, domain in enumerate(domains)]
+    schemas = await schema_service.find_compiled_schemas_by_names({domain.schema_name for domain in domains})
+
+    to_validate = []
+    for idx, domain in enumerate(domains):
+        if domain.schema_name in schemas:
+            to_validate.append(idx)
+        else:
+            results[idx].error = f'Schema not found: {domain.schema_name}'
+
+    items = [(schemas[domains[idx].schema_name], domains[idx].data) for idx in to_validate]
+    errors = await executor_service.run(sum(executor_service.size_of(data) for _, data in items),
+                                        _validate_batch, items) if items else {}
+
+    to_write = []
+    for position, idx in enumerate(to_validate):
+        if position in errors:
+            results[idx].error, results[idx].detail = str(errors[position]), errors[position].details
+        else:
+            to_write.append(idx)
+
+    upserted, failures = await base_repository.bulk_upsert([domains[idx] for idx in to_write])
+    for position, idx in enumerate(to_write):
+        if position in failures:
+            results[idx].error = failures[position]
+        else:
+            results[idx].created = position in upserted
+
+    return results
+
+
+async def import_domains(entries: AsyncIterator[Tuple[int, Union[Domain, ValidationException]]]) -> DomainImportResult:
+    """
+    Importa um fluxo de domínios (ou dos erros de leitura de cada linha) em lotes de upsert_domains, mantendo
+    em memória somente o lote corrente e os erros.
+    """
+    summary = DomainImportResult()
+    batch: List[Tuple[int, Domain]] = []
+
+    async def _flush():
+        results = await upsert_domains([domain for _, domain in batch])
+        for (index, _), result in zip(batch, results):
+            result.index = index
+            if result.error:
+                summary.errors.append(result)
+            elif result.created:
+                summary.created += 1
+            else:
+                summary.updated += 1
+        batch.clear()
+
+    async for index, entry in entries:
+        summary.total += 1
+        if isinstance(entry, ValidationException):
+            summary.errors.append(DomainBulkResult(index=index, error=str(entry), detail=entry.details))
+            continue
+
+        batch.append((index, entry))
+        if len(batch) >= settings.domains.import_batch_size:
+            await _flush()
+
+    if batch:
+        await _flush()
+
+    summary.failed = len(summary.errors)
+    return summary
+
+
+async def patch_domain(schema_name: str, domain_id: str, data_patch: dict) -> Tuple[Domain, List[str]]:
+    """
+    Aplica um JSON merge patch sobre o data do domínio gravando somente os caminhos alterados ($set/$unset).
+    Somente o documento mesclado é validado. Retorna o domínio atualizado e os caminhos alterados.
+
+    O data lido vai no filtro da gravação: se outra alteração gravou o domínio depois da leitura, o patch é
+    reaplicado (e validado) sobre o documento novo, até PATCH_ATTEMPTS vezes, para que nunca seja gravado um data
+    que não foi validado inteiro.
+    """
+    schema = await schema_service.get_compiled_schema(schema_name)
+
+    for _ in range(PATCH_ATTEMPTS):
+        domain = await get_domain_by_id(schema_name, domain_id)
+
+        merged = merge_patch(domain.data, data_patch, 'data')
+        if not merged.changed_paths:
+            return domain, []
+
+        await executor_service.run(executor_service.size_of(merged.document), schema.validate, merged.document)
+
+        ret = await base_repository.update_paths(domain, merged.set_fields, merged.unset_fields,
+                                                 expected={"data": domain.data})
+        if ret:
+            return ret, merged.changed_paths
+
+    raise ConflictException(f'Domain changed concurrently: {schema_name}/{domain_id}',
+                            details={"schema_name": schema_name, "domain_id": domain_id})
+
+
 async def get_domain_by_id(schema_name: str, domain_id: str):
     key = Domain(schema_name=schema_name, domain_id=domain_id)
-    ret = await base_repository.find_by_key(key, Domain)
+    ret = await base_repository.find_first_by_key(key, Domain)
     if not ret:
         raise RecordNotFoundException(f'Domain not found: {schema_name}/{domain_id}',
                                       details=key.dict(include={'schema_name', 'domain_id'}))
-    return ret[0]
+    return ret
+
+
+async def find_domains_by_keys(keys: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], Domain]:
+    domains = await base_repository.find_by_keys(
+        [Domain(schema_name=schema_name, domain_id=domain_id) for schema_name, domain_id in keys], Domain)
+    return {(domain.schema_name, domain.domain_id): domain for domain in domains}
 
 
 async def _validate_domain(schema_name, domain_id):
@@ -1,13 +1,15 @@
 import logging
+from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import List
+from typing import AsyncIterator, List, Optional, Tuple, Union
 
 import requests
 
-from app.domain.domain import DomainEvent, DomainEventStatus
+from app.domain.domain import DomainEvent, DomainEventStatus, DomainEventBulkResult, Domain
 from app.domain.hook import HookType, OID, Hook
 from app.repository import event_respository, base_repository
-from app.service import schema_service, domain_service, hook_service, expression_service
+from app.service import schema_service, domain_service, hook_service, expression_service, executor_service
+from app.service.hook_routing import RouteMatch
 from app.service.exceptions import RecordNotFoundException, ValidationException
 from app.task import event_tasks
 
@@ -31,8 +33,8 @@ async def _process_webhook(event: DomainEvent):
 
 def _get_vars(event, domain):
     return {
-        "event": event.dict(include={'event_name', 'schema_name', 'domain_id', 'metadata'}),
-        "domain": domain.dict()
+        "event": expression_service.ModelView(event, include={'event_name', 'schema_name', 'domain_id', 'metadata'}),
+        "domain": expression_service.ModelView(domain)
     }
 
 
@@ -42,21 +44,85 @@ def _calculate_eta(hook: Hook):
     return datetime.utcnow()
 
 
+def _create_hook_events(event: DomainEvent, hooks: List[Hook]) -> List[DomainEvent]:
+    event_data = event.dict(exclude={'status', 'hook', 'eta'})
+
+    return [
+        DomainEvent(
+            **event_data,
+            status=DomainEventStatus.CREATED,
+            hook=hook,
+            eta=_calculate_eta(hook)
+        )
+        for hook in hooks
+    ]
+
+
+def _evaluate_conditions_batch(items: List[Tuple[List[str], DomainEvent, Domain]]) \
+        -> List[Union[List[Optional[bool]], Exception]]:
+    """
+    Resultado das condições de cada item ou, no lugar dele, o erro do item, para que um item não interrompa os
+    demais.
+    """
+    ret = []
+    for conditions, event, domain in items:
+        try:
+            ret.append(hook_service.evaluate_conditions(conditions, _get_vars(event, domain)))
+        except Exception as exc:
+            logger.exception(f'Failed to evaluate hook conditions of {event.schema_name}/{event.domain_id}')
+            ret.append(exc)
+    return ret
+
+
+def _evaluation_size(conditions: List[str], event: DomainEvent, domain: Domain) -> int:
+    return len(conditions) * (executor_service.size_of(domain.data) + executor_service.size_of(event.metadata))
+
+
+async def _match_events(items: List[Tuple[DomainEvent, Domain, RouteMatch]]) \
+        -> List[Union[List[DomainEvent], Exception]]:
+    """
+    Monta os eventos dos hooks de cada item. Os hooks já foram separados pelo índice de condições; somente as
+    condições restantes vão para o executor de CPU, fora do event loop (e divididas entre os workers) quando a
+    carga é grande.
+    """
+    pending = {idx: ([hook.condition for hook in match.to_evaluate], event, domain)
+               for idx, (event, domain, match) in enumerate(items) if match.to_evaluate}
+    evaluated = await executor_service.run_chunks(_evaluate_conditions_batch, list(pending.values()),
+                                                  [_evaluation_size(*item) for item in pending.values()])
+    results = dict(zip(pending, evaluated))
+
+    ret = []
+    for idx, (event, domain, match) in enumerate(items):
+        result = results.get(idx, [])
+        if isinstance(result, Exception):
+            ret.append(result)
+            continue
+
+        try:
+            ret.append(_create_hook_events(
+                event, hook_service.select_hooks(event.schema_name, event.event_name, match, result)))
+        except Exception as exc:
+            logger.exception(f'Failed to create hook events of {event.schema_name}/{event.domain_id}')
+            ret.append(exc)
+    return ret
+
+
 async def insert_event(event: DomainEvent) -> List[DomainEvent]:
     await schema_service.exists_schema(event.schema_name)
     domain = await domain_service.get_domain_by_id(event.schema_name, event.domain_id)
+    return await insert_domain_event(event, domain)
 
-    hooks = await hook_service.find_eligible_hooks(event.schema_name, event.event_name, domain.tags)
-    events: List[DomainEvent] = []
 
-    for hook in hooks:
-        if not hook.condition or expression_service.evaluate(hook.condition, _get_vars(event, domain)):
-            events.append(DomainEvent(
-                **event.dict(exclude={'status', 'hook', 'eta'}),
-                status=DomainEventStatus.CREATED,
-                hook=hook,
-                eta=_calculate_eta(hook)
-            ))
+async def insert_domain_event(event: DomainEvent, domain: Domain) -> List[DomainEvent]:
+    """
+    Insere o evento de um domínio já lido (e de schema já verificado) pelo chamador.
+    """
+    match, = await hook_service.find_matching_hooks(event.schema_name, event.event_name,
+                                                    [(domain.tags, _get_vars(event, domain))])
+    events, = await _match_events([(event, domain, match)])
+
+    if isinstance(events, Exception):
+        raise events
 
     if not events:
         return []
@@ -67,8 +133,71 @@ async def insert_event(event: DomainEvent) -> List[DomainEvent]:
     return ret
 
 
+async def insert_events(events: List[DomainEvent]) -> List[DomainEventBulkResult]:
+    """
+    Insere eventos de vários domínios de uma vez: schemas e domínios são buscados com uma consulta cada, os hooks
+    uma vez por (schema, evento), os eventos gerados são gravados em um único insert_many e os disparos publicados
+    juntos. Os erros são informados por item, sem interromper os demais.
+    """
+    results = [DomainEventBulkResult(index=idx, **event.dict(include={'schema_name', 'domain_id', 'event_name'}))
+               for idx, event in enumerate(events)]
+
+    schemas = await schema_service.find_schemas_by_names({event.schema_name for event in events})
+    domains = await domain_service.find_domains_by_keys(
+        {(event.schema_name, event.domain_id) for event in events if event.schema_name in schemas})
+
+    routes = defaultdict(list)
+    for idx, event in enumerate(events):
+        domain = domains.get((event.schema_name, event.domain_id))
+
+        if event.schema_name not in schemas:
+            results[idx].error = f'Schema not found: {event.schema_name}'
+        elif not domain:
+            results[idx].error = f'Domain not found: {event.schema_name}/{event.domain_id}'
+            results[idx].detail = event.dict(include={'schema_name', 'domain_id'})
+        else:
+            routes[(event.schema_name, event.event_name)].append((idx, event, domain))
+
+    indexes, to_match = [], []
+    for (schema_name, event_name), items in routes.items():
+        matches = await hook_service.find_matching_hooks(
+            schema_name, event_name, [(domain.tags, _get_vars(event, domain)) for _, event, domain in items])
+
+        for (idx, event, domain), match in zip(items, matches):
+            indexes.append(idx)
+            to_match.append((event, domain, match))
+
+    new_events: List[DomainEvent] = []
+    owners: List[int] = []
+    for idx, hook_events in zip(indexes, await _match_events(to_match)):
+        if isinstance(hook_events, Exception):
+            results[idx].error = str(hook_events) or type(hook_events).__name__
+            continue
+        new_events.extend(hook_events)
+        owners.extend([idx] * len(hook_events))
+
+    failures = await event_respository.insert_events(new_events)
+
+    to_dispatch = []
+    for position, (idx, new_event) in enumerate(zip(owners, new_events)):
+        if position in failures:
+            results[idx].error = failures[position]
+            continue
+        results[idx].events.append(new_event)
+        if _is_immediate(new_event):
+            to_dispatch.append(new_event)
+
+    logger.info(f"Dispatching {len(to_dispatch)} of {len(new_events)} events created from {len(events)} requests")
+    await event_tasks.dispatch_events(to_dispatch)
+    return results
+
+
+def _is_immediate(event: DomainEvent) -> bool:
+    return event.hook.type == HookType.WEBHOOK and (event.hook.webhook.delay_time or 0) <= 0
+
+
 async def dispatch_event(event: DomainEvent):
-    if event.hook.type == HookType.WEBHOOK and event.hook.webhook.delay_time <= 0:
+    if _is_immediate(event):
         logger.info(f"Dispatching event '{event.event_name}' of {event.schema_name}/{event.domain_id}: {event.id}")
         await event_tasks.dispatch_event(event)
 
@@ -103,7 +232,7 @@ async def mark_event_as_failure(event_id: str, exc):
 
 
 async def trigger_pending_events():
-    events = await event_respository.find_pending_events(datetime.utcnow())
+    events = await event_respository.find_pending_events(datetime.utcnow(), trusted=True)
 
     logger.info(f'Starting processing of scheduled events...')
 
@@ -117,11 +246,24 @@ async def find_events_of_schema(schema_name,
                                 event_id=None,
                                 event_name=None,
                                 queue_name=None,
-                                skip: int = 0, limit: int = 100):
-    ret = await event_respository.find_events(schema_name, event_id, event_name, queue_name, skip, limit)
+                                skip: int = 0, limit: int = 100,
+                                after: dict = None,
+                                fields: Tuple[str, ...] = None):
+    ret = await event_respository.find_events(schema_name, event_id, event_name, queue_name, skip, limit,
+                                              trusted=True, after=after, fields=fields)
     return ret
 
 
+def iter_events_of_schema(schema_name,
+                          event_id=None,
+                          event_name=None,
+                          queue_name=None,
+                          after: dict = None,
+                          fields: Tuple[str, ...] = None) -> AsyncIterator[DomainEvent]:
+    return event_respository.iter_events(schema_name, event_id, event_name, queue_name, trusted=True, after=after,
+                                         fields=fields)
+
+
 async def update_event_status(schema_name: str, event_id: str, status: DomainEventStatus) -> DomainEvent:
     events = await base_repository.find_by_example(
         DomainEvent(id=event_id, schema_name=schema_name), return_as=DomainEvent)
@@ -8,3 +8,9 @@ class ValidationException(Exception):
     def __init__(self, *args, details=None):
         super().__init__(*args)
         self.details = details
+
+
+class ConflictException(Exception):
+    def __init__(self, *args, details=None):
+        super().__init__(*args)
+        self.details = details
@@ -0,0 +1,26 @@
+from typing import Any, Callable, List, Sequence
+
+from app.config.app import settings
+from app.utils.executor import CpuExecutor, ExecutorMetrics, payload_size
+
+_executor = CpuExecutor(workers=settings.executor.workers, threshold=settings.executor.threshold)
+
+
+def size_of(value: Any) -> int:
+    return payload_size(value, _executor.threshold)
+
+
+async def run(size: int, fnc: Callable, *args):
+    return await _executor.run(size, fnc, *args)
+
+
+async def run_chunks(fnc: Callable[[list], list], items: Sequence, sizes: Sequence[int]) -> List:
+    return await _executor.run_chunks(fnc, items, sizes)
+
+
+def metrics() -> ExecutorMetrics:
+    return _executor.metrics()
+
+
+def shutdown():
+    _executor.shutdown()
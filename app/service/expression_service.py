@@ -1,5 +1,109 @@
-from app.service.extensions.evaluate_expression import pyparsing_engine
+from typing import Any, Iterable, Mapping
 
+from pydantic import BaseModel
 
-def evaluate(expression, variables):
-    return pyparsing_engine.evaluate(expression, variables)
\ No newline at end of file
+from app.config.app import settings
+from app.service.exceptions import ValidationException
+from app.service.extensions.evaluate_expression import pyparsing_engine, closure_engine, larkparsing_engine, budget, \
+    analysis
+from app.service.extensions.evaluate_expression.exceptions import ExpressionException
+from app.service.extensions.evaluate_expression.expression_tree import Node
+from app.utils.cache import LRUCache, CacheInfo
+
+ENGINES = {
+    'pyparsing': pyparsing_engine,
+    'closure': closure_engine,
+    'lark': larkparsing_engine,
+}
+
+
+class ModelView(Mapping):
+    """
+    Visão somente leitura de um model pydantic usada como variável de uma condição. Os caminhos são
+    resolvidos direto nos atributos do model, sem copiar o documento como faria o model.dict().
+    """
+    __slots__ = ('_model', '_fields')
+
+    def __init__(self, model: BaseModel, include: Iterable[str] = None):
+        self._model = model
+        self._fields = frozenset(include) if include is not None else frozenset(model.__fields__)
+
+    def __contains__(self, key):
+        return key in self._fields
+
+    def __getitem__(self, key):
+        if key not in self._fields:
+            raise KeyError(key)
+        value = getattr(self._model, key)
+        return ModelView(value) if isinstance(value, BaseModel) else value
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+
+class _InvalidCondition:
+    __slots__ = ('error',)
+
+    def __init__(self, error: ExpressionException):
+        self.error = error
+
+
+budget.set_limits(budget.Budget(**settings.expression.dict(include=set(budget.Budget._fields))))
+_compiled_conditions = LRUCache(maxsize=settings.expression.cache_size)
+
+
+def _get_engine(engine: str):
+    try:
+        return ENGINES[engine]
+    except KeyError:
+        raise ValueError(f"Unknown expression engine: {engine}")
+
+
+def _compile(expression: str, engine: str):
+    module = _get_engine(engine)
+    try:
+        budget.check_expression(expression)
+        tree = module.parse(expression)
+        budget.check_tree(tree)
+        compiled = module.compile_tree(analysis.fold_constants(tree))
+    except ExpressionException as exc:
+        # Condições inválidas também ficam em cache, para não repetir o parse a cada evento.
+        return _InvalidCondition(exc)
+    return compiled
+
+
+def compile_condition(expression: str, engine: str = None) -> Any:
+    engine = engine or settings.expression.engine
+    compiled = _compiled_conditions.get_or_create((engine, expression), lambda: _compile(expression, engine))
+
+    if isinstance(compiled, _InvalidCondition):
+        raise type(compiled.error)(*compiled.error.args)
+
+    return compiled
+
+
+def parse_condition(expression: str, engine: str = None) -> Node:
+    compiled = compile_condition(expression, engine)
+    return getattr(compiled, 'tree', compiled)
+
+
+def analyze_condition(expression: str) -> analysis.ConditionAnalysis:
+    try:
+        return analysis.analyze(parse_condition(expression))
+    except ExpressionException as exc:
+        raise ValidationException(f"Invalid condition: {expression}", details=str(exc))
+
+
+def evaluate(expression, variables, engine: str = None):
+    return compile_condition(expression, engine).evaluate(variables)
+
+
+def cache_info() -> CacheInfo:
+    return _compiled_conditions.info()
+
+
+def clear_cache():
+    _compiled_conditions.clear()
@@ -0,0 +1,145 @@
+import re
+from typing import List, NamedTuple
+
+from app.service.extensions.evaluate_expression.exceptions import BudgetExceededException
+from app.service.extensions.evaluate_expression.expression_tree import Node, Constant, Path, UnaryOp, BinaryOp, \
+    BoolOp
+
+_PRECEDENCE = {
+    'or': 1, 'and': 1,
+    '<': 2, '<=': 2, '>': 2, '>=': 2, '!=': 2, '==': 2,
+    '+': 3, '-': 3,
+    '*': 4, '/': 4,
+    '**': 5,
+}
+_UNARY_PRECEDENCE = 6
+_LEAF_PRECEDENCE = 7
+_REAL_PATTERN = re.compile(r'\d+\.\d+')
+
+
+class ConditionAnalysis(NamedTuple):
+    normalized: str
+    paths: List[str]
+    always_true: bool
+
+
+def _is_representable(value) -> bool:
+    """
+    Somente valores que a gramática consegue escrever de volta viram constantes na normalização.
+    """
+    if isinstance(value, (bool, int)):
+        return True
+    if isinstance(value, float):
+        return _REAL_PATTERN.fullmatch(repr(abs(value))) is not None
+    if isinstance(value, str):
+        return '"' not in value and '\n' not in value
+    return False
+
+
+def _fold(node: Node, fnc) -> Node:
+    try:
+        value = fnc()
+    except BudgetExceededException:
+        raise
+    except Exception:
+        # Erros como divisão por zero ficam para o momento da avaliação.
+        return node
+    return Constant(value) if _is_representable(value) else node
+
+
+def fold_constants(node: Node) -> Node:
+    if isinstance(node, UnaryOp):
+        operand = fold_constants(node.operand)
+        node = UnaryOp(node.op, operand)
+        return _fold(node, lambda: node.evaluate({})) if isinstance(operand, Constant) else node
+
+    if isinstance(node, BinaryOp):
+        left, right = fold_constants(node.left), fold_constants(node.right)
+        node = BinaryOp(node.op, left, right)
+        if isinstance(left, Constant) and isinstance(right, Constant):
+            return _fold(node, lambda: node.evaluate({}))
+        return node
+
+    if isinstance(node, BoolOp):
+        first = fold_constants(node.first)
+        rest = [(op, fold_constants(operand)) for op, operand in node.rest]
+
+        # Mesma regra de curto-circuito da avaliação: um operando constante decide a cadeia inteira
+        # ou é descartado, e a avaliação segue a partir do próximo operando.
+        while isinstance(first, Constant) and rest:
+            op, operand = rest[0]
+            if (not first.value and op == 'and') or (first.value and op == 'or'):
+                return first
+            first, rest = operand, rest[1:]
+
+        return BoolOp(first, rest) if rest else first
+
+    return node
+
+
+def referenced_paths(node: Node) -> List[str]:
+    paths, stack = set(), [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, Path):
+            paths.add('.'.join(current.path))
+        stack.extend(current.children())
+    return sorted(paths)
+
+
+def _precedence(node: Node) -> int:
+    if isinstance(node, BinaryOp):
+        return _PRECEDENCE[node.op]
+    if isinstance(node, BoolOp):
+        return _PRECEDENCE['and']
+    if isinstance(node, UnaryOp):
+        return _UNARY_PRECEDENCE
+    if isinstance(node, Constant) and not isinstance(node.value, bool) and isinstance(node.value, (int, float)) \
+            and node.value < 0:
+        return _UNARY_PRECEDENCE
+    return _LEAF_PRECEDENCE
+
+
+def _wrap(node: Node, min_precedence: int) -> str:
+    text = to_expression(node)
+    return f'({text})' if _precedence(node) < min_precedence else text
+
+
+def to_expression(node: Node) -> str:
+    """
+    Escreve a árvore de volta na gramática das condições, com espaçamento e parênteses canônicos.
+    """
+    if isinstance(node, Constant):
+        if isinstance(node.value, bool):
+            return 'true' if node.value else 'false'
+        if isinstance(node.value, str):
+            return f'"{node.value}"'
+        return repr(node.value)
+
+    if isinstance(node, Path):
+        return '.'.join(node.path)
+
+    if isinstance(node, UnaryOp):
+        return f'{node.op}{_wrap(node.operand, _UNARY_PRECEDENCE)}'
+
+    if isinstance(node, BinaryOp):
+        precedence = _PRECEDENCE[node.op]
+        if node.op == '**':
+            return f'{_wrap(node.left, precedence + 1)} ** {_wrap(node.right, precedence)}'
+        return f'{_wrap(node.left, precedence)} {node.op} {_wrap(node.right, precedence + 1)}'
+
+    if isinstance(node, BoolOp):
+        precedence = _PRECEDENCE['and']
+        operands = [_wrap(node.first, precedence + 1)]
+        operands.extend(f'{op} {_wrap(operand, precedence + 1)}' for op, operand in node.rest)
+        return ' '.join(operands)
+
+    raise TypeError(f"Unsupported expression node: {type(node).__name__}")
+
+
+def analyze(tree: Node) -> ConditionAnalysis:
+    return ConditionAnalysis(
+        normalized=to_expression(tree),
+        paths=referenced_paths(tree),
+        always_true=isinstance(tree, Constant) and bool(tree.value),
+    )
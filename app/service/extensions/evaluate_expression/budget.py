@@ -0,0 +1,97 @@
+from typing import NamedTuple
+
+from app.service.extensions.evaluate_expression.exceptions import BudgetExceededException
+
+
+class Budget(NamedTuple):
+    max_length: int = 2000
+    max_nesting: int = 8
+    max_depth: int = 32
+    max_nodes: int = 256
+    max_operations: int = 128
+    max_exponent: int = 64
+    max_result_bits: int = 4096
+    max_sequence_length: int = 10000
+
+
+limits = Budget()
+
+
+def set_limits(budget: Budget):
+    global limits
+    limits = budget
+
+
+def check_expression(expression: str, budget: Budget = None):
+    """
+    Verificações feitas antes do parse, para que condições patológicas não cheguem ao parser.
+    """
+    budget = budget or limits
+
+    if len(expression) > budget.max_length:
+        raise BudgetExceededException(f"Condition exceeds {budget.max_length} characters")
+
+    nesting = 0
+    for char in expression:
+        if char == '(':
+            nesting += 1
+            if nesting > budget.max_nesting:
+                raise BudgetExceededException(f"Condition exceeds {budget.max_nesting} nested parentheses")
+        elif char == ')':
+            nesting -= 1
+
+
+def check_tree(tree, budget: Budget = None):
+    budget = budget or limits
+    nodes, operations = 0, 0
+    stack = [(tree, 1)]
+
+    while stack:
+        node, depth = stack.pop()
+        nodes += 1
+
+        if depth > budget.max_depth:
+            raise BudgetExceededException(f"Condition exceeds max depth of {budget.max_depth}")
+        if nodes > budget.max_nodes:
+            raise BudgetExceededException(f"Condition exceeds {budget.max_nodes} nodes")
+
+        children = node.children()
+        # Operadores unários e binários contam uma operação; uma cadeia and/or conta uma por operador.
+        operations += max(len(children) - 1, 1) if children else 0
+
+        if operations > budget.max_operations:
+            raise BudgetExceededException(f"Condition exceeds {budget.max_operations} operations")
+
+        if getattr(node, 'op', None) == '**':
+            exponent = getattr(children[1], 'value', None)
+            if isinstance(exponent, (int, float)) and abs(exponent) > budget.max_exponent:
+                raise BudgetExceededException(f"Exponent exceeds {budget.max_exponent}: {exponent}")
+
+        stack.extend((child, depth + 1) for child in children)
+
+
+def bounded_pow(base, exponent):
+    if isinstance(exponent, (int, float)) and abs(exponent) > limits.max_exponent:
+        raise BudgetExceededException(f"Exponent exceeds {limits.max_exponent}: {exponent}")
+
+    if isinstance(base, int) and isinstance(exponent, int) and exponent > 0 \
+            and abs(base).bit_length() * exponent > limits.max_result_bits:
+        raise BudgetExceededException(f"Result of {base} ** {exponent} exceeds {limits.max_result_bits} bits")
+
+    try:
+        return base ** exponent
+    except OverflowError as exc:
+        raise BudgetExceededException(str(exc))
+
+
+def bounded_mul(left, right):
+    for sequence, times in ((left, right), (right, left)):
+        if isinstance(sequence, (str, list, tuple)) and isinstance(times, int) \
+                and len(sequence) * times > limits.max_sequence_length:
+            raise BudgetExceededException(f"Result exceeds {limits.max_sequence_length} items")
+
+    if isinstance(left, int) and isinstance(right, int) \
+            and left.bit_length() + right.bit_length() > limits.max_result_bits:
+        raise BudgetExceededException(f"Result exceeds {limits.max_result_bits} bits")
+
+    return left * right
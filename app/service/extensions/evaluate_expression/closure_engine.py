@@ -0,0 +1,112 @@
+from typing import Any, Callable
+
+from app.service.extensions.evaluate_expression import pyparsing_engine
+from app.service.extensions.evaluate_expression.expression_tree import Node, Constant, Path, UnaryOp, BinaryOp, \
+    BoolOp, ARITH_OPERATORS, get_value
+
+Predicate = Callable[[dict], Any]
+
+
+def _compile_path(path) -> Predicate:
+    if len(path) == 1:
+        key = path[0]
+        return lambda variables: variables[key] if variables is not None and key in variables else None
+
+    return lambda variables: get_value(variables, path)
+
+
+def _compile_binary_op(node: BinaryOp) -> Predicate:
+    fnc = ARITH_OPERATORS[node.op]
+
+    if isinstance(node.right, Constant):
+        left, right_value = compile_node(node.left), node.right.value
+        return lambda variables: fnc(left(variables), right_value)
+
+    if isinstance(node.left, Constant):
+        left_value, right = node.left.value, compile_node(node.right)
+        return lambda variables: fnc(left_value, right(variables))
+
+    left, right = compile_node(node.left), compile_node(node.right)
+    return lambda variables: fnc(left(variables), right(variables))
+
+
+def _compile_bool_op(node: BoolOp) -> Predicate:
+    operands = [compile_node(node.first), *(compile_node(operand) for _, operand in node.rest)]
+    ops = {op for op, _ in node.rest}
+
+    if ops == {'and'} and len(operands) == 2:
+        first, second = operands
+        return lambda variables: first(variables) and second(variables)
+
+    if ops == {'or'} and len(operands) == 2:
+        first, second = operands
+        return lambda variables: first(variables) or second(variables)
+
+    first, rest = operands[0], list(zip((op for op, _ in node.rest), operands[1:]))
+
+    def _evaluate(variables):
+        bool_ret = first(variables)
+        for op, operand in rest:
+            if (not bool_ret and op == 'and') or (bool_ret and op == 'or'):
+                return bool_ret
+            bool_ret = operand(variables)
+        return bool_ret
+
+    return _evaluate
+
+
+def compile_node(node: Node) -> Predicate:
+    if isinstance(node, Constant):
+        value = node.value
+        return lambda variables: value
+
+    if isinstance(node, Path):
+        return _compile_path(node.path)
+
+    if isinstance(node, UnaryOp):
+        operand = compile_node(node.operand)
+        return (lambda variables: -operand(variables)) if node.op == '-' else operand
+
+    if isinstance(node, BinaryOp):
+        return _compile_binary_op(node)
+
+    if isinstance(node, BoolOp):
+        return _compile_bool_op(node)
+
+    raise TypeError(f"Unsupported expression node: {type(node).__name__}")
+
+
+class CompiledCondition:
+    """
+    Condição convertida em closures Python. Na serialização (ex.: envio para um pool de processos)
+    apenas a árvore é transportada e as closures são recriadas no destino.
+    """
+    __slots__ = ('tree', 'evaluate')
+
+    def __init__(self, tree: Node):
+        self.tree = tree
+        self.evaluate: Predicate = compile_node(tree)
+
+    def __reduce__(self):
+        return CompiledCondition, (self.tree,)
+
+    def __eq__(self, other):
+        return isinstance(other, CompiledCondition) and self.tree == other.tree
+
+    def __hash__(self):
+        return hash(self.tree)
+
+
+parse = pyparsing_engine.parse
+
+
+def compile_tree(tree: Node) -> CompiledCondition:
+    return CompiledCondition(tree)
+
+
+def compile_expression(expression) -> CompiledCondition:
+    return compile_tree(parse(expression))
+
+
+def evaluate(expression, variables):
+    return compile_expression(expression).evaluate(variables)
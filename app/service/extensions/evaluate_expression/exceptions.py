@@ -0,0 +1,10 @@
+class ExpressionException(Exception):
+    pass
+
+
+class ExpressionSyntaxException(ExpressionException):
+    pass
+
+
+class BudgetExceededException(ExpressionException):
+    pass
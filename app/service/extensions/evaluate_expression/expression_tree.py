@@ -0,0 +1,118 @@
+import operator
+from typing import Any, List, Tuple
+
+from app.service.extensions.evaluate_expression.budget import bounded_pow, bounded_mul
+
+ARITH_OPERATORS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': bounded_mul,
+    '/': operator.truediv,
+    '**': bounded_pow,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "!=": operator.ne,
+    "==": operator.eq,
+}
+
+
+def get_value(value: dict, path):
+    ret = value
+    for att in path:
+        ret = ret[att] if ret is not None and att in ret else None
+    return ret
+
+
+class Node:
+    __slots__ = ()
+
+    def evaluate(self, variables: dict) -> Any:
+        raise NotImplementedError
+
+    def children(self) -> Tuple['Node', ...]:
+        return ()
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    def __hash__(self):
+        return hash((type(self), *(getattr(self, slot) for slot in self.__slots__)))
+
+    def __repr__(self):
+        attrs = ', '.join(repr(getattr(self, slot)) for slot in self.__slots__)
+        return f'{type(self).__name__}({attrs})'
+
+
+class Constant(Node):
+    __slots__ = ('value',)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def evaluate(self, variables: dict) -> Any:
+        return self.value
+
+
+class Path(Node):
+    __slots__ = ('path',)
+
+    def __init__(self, path: Tuple[str, ...]):
+        self.path = tuple(path)
+
+    def evaluate(self, variables: dict) -> Any:
+        return get_value(variables, self.path)
+
+
+class UnaryOp(Node):
+    __slots__ = ('op', 'operand')
+
+    def __init__(self, op: str, operand: Node):
+        self.op = op
+        self.operand = operand
+
+    def children(self) -> Tuple[Node, ...]:
+        return (self.operand,)
+
+    def evaluate(self, variables: dict) -> Any:
+        value = self.operand.evaluate(variables)
+        return -value if self.op == '-' else value
+
+
+class BinaryOp(Node):
+    __slots__ = ('op', 'left', 'right')
+
+    def __init__(self, op: str, left: Node, right: Node):
+        self.op = op
+        self.left = left
+        self.right = right
+
+    def children(self) -> Tuple[Node, ...]:
+        return self.left, self.right
+
+    def evaluate(self, variables: dict) -> Any:
+        return ARITH_OPERATORS[self.op](self.left.evaluate(variables), self.right.evaluate(variables))
+
+
+class BoolOp(Node):
+    """
+    Sequência de operandos ligados por 'and'/'or' avaliada da esquerda para a direita, com curto-circuito.
+    """
+    __slots__ = ('first', 'rest')
+
+    def __init__(self, first: Node, rest: List[Tuple[str, Node]]):
+        self.first = first
+        self.rest = tuple(rest)
+
+    def children(self) -> Tuple[Node, ...]:
+        return (self.first, *(node for _, node in self.rest))
+
+    def evaluate(self, variables: dict) -> Any:
+        bool_ret = self.first.evaluate(variables)
+        for op, node in self.rest:
+            if (not bool_ret and op == 'and') or (bool_ret and op == 'or'):
+                return bool_ret
+            bool_ret = node.evaluate(variables)
+        return bool_ret
@@ -1,66 +1,92 @@
-import timeit
-
-from lark import Lark, Transformer, v_args
-
-grammar = """
-    ?start: sum
-
-    ?sum: product
-        | sum "+" product   -> add
-        | sum "-" product   -> sub
-
-    ?product: atom
-        | product "*" atom  -> mul
-        | product "/" atom  -> div
-        
-    path: NAME "." NAME     -> getvalue
-        | path "." NAME     -> dotnot
-    
-    ?atom: NUMBER           -> number
-         | "-" atom         -> neg
-         | NAME             -> var
-         | "(" sum ")"
-         | path
-
-    %import common.CNAME -> NAME
-    %import common.NUMBER
-    %import common.WS_INLINE
-
-    %ignore WS_INLINE
-"""
-
-
-@v_args(inline=True)
-class CalculateTree(Transformer):
-    from operator import add, sub, mul, truediv as div, neg
-    number = float
-
-    def __init__(self):
-        super().__init__()
-        self.vars = {'a': {'b': {'c': 200}}}
-
-    def getvalue(self, prop_var, prop_att):
-        ret = self.vars.get(prop_var)
-        if prop_att in ret:
-            return ret[prop_att]
-        return None
-
-    def dotnot(self, value, prop_att):
-        if prop_att in value:
-            return value[prop_att]
-        return value
-
-    def var(self, name):
-        try:
-            return self.vars[name]
-        except KeyError:
-            raise Exception("Variable not found: %s" % name)
-
-
-parser = Lark(grammar, parser="lalr", transformer=CalculateTree())
-
-if __name__ == '__main__':
-    start_time = timeit.default_timer()
-    print(parser.parse('a.b.c'))
-    print(timeit.default_timer() - start_time)
+from app.service.extensions.evaluate_expression.condition_parser import Lark_StandAlone, Transformer, v_args, \
+    UnexpectedInput
+from app.service.extensions.evaluate_expression.exceptions import ExpressionSyntaxException
+from app.service.extensions.evaluate_expression.expression_tree import Node, Constant, Path, UnaryOp, BinaryOp, BoolOp
+
+
+def _left_chain(operands):
+    ret = operands[0]
+    for idx in range(1, len(operands), 2):
+        ret = BinaryOp(str(operands[idx]), ret, operands[idx + 1])
+    return ret
+
+
+class ExpressionTreeBuilder(Transformer):
+    """
+    Converte a árvore sintática do Lark nos mesmos nós gerados pelo pyparsing_engine,
+    garantindo que os dois engines avaliem as condições de forma idêntica.
+    """
+
+    @v_args(inline=True)
+    def real(self, token):
+        return Constant(float(token))
+
+    @v_args(inline=True)
+    def integer(self, token):
+        return Constant(int(token))
+
+    @v_args(inline=True)
+    def string(self, token):
+        return Constant(token[1:-1])
+
+    @v_args(inline=True)
+    def boolean(self, token):
+        return Constant(token.lower() == 'true')
+
+    def path(self, tokens):
+        return Path(tuple(str(token) for token in tokens))
+
+    @v_args(inline=True)
+    def signed(self, sign, operand):
+        return UnaryOp(sign, operand)
+
+    def power(self, operands):
+        res = operands[-1]
+        for val in operands[-2::-1]:
+            res = BinaryOp('**', val, res)
+        return res
+
+    def product(self, operands):
+        return _left_chain(operands)
+
+    def sum(self, operands):
+        return _left_chain(operands)
+
+    def comparison(self, operands):
+        return _left_chain(operands)
+
+    def or_expr(self, operands):
+        return BoolOp(operands[0], [(str(operands[idx]).lower(), operands[idx + 1])
+                                    for idx in range(1, len(operands), 2)])
+
+    @v_args(inline=True)
+    def add_op(self, token):
+        return str(token)
+
+    mul_op = add_op
+    sign = add_op
+
+
+# O parser é gerado previamente a partir de condition.lark (make generate-parser),
+# então aqui apenas as tabelas LALR são carregadas, sem compilar a gramática.
+parser = Lark_StandAlone(transformer=ExpressionTreeBuilder())
+
+
+def parse(expression) -> Node:
+    try:
+        return parser.parse(expression)
+    except UnexpectedInput as exc:
+        raise ExpressionSyntaxException(str(exc)) from exc
+
+
+def compile_tree(tree: Node) -> Node:
+    return tree
+
+
+def compile_expression(expression) -> Node:
+    return compile_tree(parse(expression))
+
+
+def evaluate(expression, variables):
+    return parse(expression).evaluate(variables)
 
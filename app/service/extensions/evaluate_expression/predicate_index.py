@@ -0,0 +1,162 @@
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from decimal import Decimal
+from typing import Any, Dict, Hashable, List, NamedTuple, Set, Tuple
+
+from app.service.extensions.evaluate_expression.expression_tree import Node, BinaryOp, BoolOp, Constant, Path, \
+    get_value
+
+INTERVAL_OPERATORS = ('<', '<=', '>', '>=')
+_FLIPPED_OPERATORS = {'==': '==', '<': '>', '<=': '>=', '>': '<', '>=': '<='}
+_NUMBER_TYPES = (int, float, Decimal)
+
+
+class Atom(NamedTuple):
+    path: Tuple[str, ...]
+    op: str
+    value: Any
+
+
+def _as_atom(node: Node):
+    if not isinstance(node, BinaryOp) or node.op not in _FLIPPED_OPERATORS:
+        return None
+
+    if isinstance(node.left, Path) and isinstance(node.right, Constant):
+        path, op, value = node.left.path, node.op, node.right.value
+    elif isinstance(node.left, Constant) and isinstance(node.right, Path):
+        path, op, value = node.right.path, _FLIPPED_OPERATORS[node.op], node.left.value
+    else:
+        return None
+
+    if op in INTERVAL_OPERATORS and (isinstance(value, bool) or not isinstance(value, _NUMBER_TYPES)):
+        return None
+
+    return Atom(path, op, value)
+
+
+def decompose(tree: Node) -> Tuple[Set[Atom], bool]:
+    """
+    Quebra uma condição em átomos indexáveis (caminho == constante ou caminho </<=/>/>= número) ligados por 'and'.
+    Retorna os átomos e se sobrou alguma parte da condição que precisa ser avaliada individualmente.
+    """
+    if isinstance(tree, BoolOp) and all(op == 'and' for op, _ in tree.rest):
+        conjuncts = [tree.first, *(node for _, node in tree.rest)]
+    else:
+        conjuncts = [tree]
+
+    atoms, residual = set(), False
+    for conjunct in conjuncts:
+        atom = _as_atom(conjunct)
+        if atom:
+            atoms.add(atom)
+        else:
+            residual = True
+
+    return atoms, residual
+
+
+class _SortedThresholds:
+    def __init__(self):
+        self.thresholds: List[Any] = []
+        self.keys: List[Hashable] = []
+
+    def add(self, threshold, key: Hashable):
+        idx = bisect_right(self.thresholds, threshold)
+        self.thresholds.insert(idx, threshold)
+        self.keys.insert(idx, key)
+
+    def remove(self, threshold, key: Hashable):
+        for idx in range(bisect_left(self.thresholds, threshold), bisect_right(self.thresholds, threshold)):
+            if self.keys[idx] == key:
+                del self.thresholds[idx]
+                del self.keys[idx]
+                return
+
+    def matching(self, op: str, value) -> List[Hashable]:
+        if op == '>':
+            return self.keys[:bisect_left(self.thresholds, value)]
+        if op == '>=':
+            return self.keys[:bisect_right(self.thresholds, value)]
+        if op == '<':
+            return self.keys[bisect_right(self.thresholds, value):]
+        return self.keys[bisect_left(self.thresholds, value):]
+
+    def __len__(self):
+        return len(self.keys)
+
+
+class PredicateIndex:
+    """
+    Índice das condições de um conjunto de hooks. As igualdades ficam em mapas valor -> hooks e as comparações
+    numéricas em listas ordenadas por limite, ambos por caminho. Um hook é candidato quando todos os seus átomos
+    são satisfeitos; somente as condições com partes não indexáveis precisam ser avaliadas individualmente.
+    """
+
+    def __init__(self):
+        self._equality: Dict[Tuple[str, ...], Dict[Any, Set[Hashable]]] = defaultdict(lambda: defaultdict(set))
+        self._intervals: Dict[Tuple[str, ...], Dict[str, _SortedThresholds]] = defaultdict(
+            lambda: defaultdict(_SortedThresholds))
+        self._atoms: Dict[Hashable, Set[Atom]] = {}
+        self._residual: Set[Hashable] = set()
+        self._unindexed: Set[Hashable] = set()
+
+    def add(self, key: Hashable, tree: Node):
+        if key in self._atoms:
+            self.remove(key)
+
+        atoms, residual = decompose(tree)
+        self._atoms[key] = atoms
+
+        if residual:
+            self._residual.add(key)
+        if not atoms:
+            self._unindexed.add(key)
+
+        for atom in atoms:
+            if atom.op == '==':
+                self._equality[atom.path][atom.value].add(key)
+            else:
+                self._intervals[atom.path][atom.op].add(atom.value, key)
+
+    def remove(self, key: Hashable):
+        for atom in self._atoms.pop(key, ()):
+            if atom.op == '==':
+                self._equality[atom.path][atom.value].discard(key)
+            else:
+                self._intervals[atom.path][atom.op].remove(atom.value, key)
+        self._residual.discard(key)
+        self._unindexed.discard(key)
+
+    def __contains__(self, key: Hashable):
+        return key in self._atoms
+
+    def __len__(self):
+        return len(self._atoms)
+
+    def _satisfied_atoms(self, variables):
+        for path, values in self._equality.items():
+            value = get_value(variables, path)
+            try:
+                yield from values.get(value, ())
+            except TypeError:
+                # Valores não hasheáveis (dict, list) nunca são iguais a uma constante.
+                continue
+
+        for path, operators in self._intervals.items():
+            value = get_value(variables, path)
+            if isinstance(value, bool) or not isinstance(value, _NUMBER_TYPES):
+                continue
+            for op, thresholds in operators.items():
+                yield from thresholds.matching(op, value)
+
+    def match(self, variables) -> Tuple[Set[Hashable], Set[Hashable]]:
+        """
+        Retorna os hooks cuja condição é verdadeira apenas pelos átomos e os que ainda precisam ser avaliados.
+        Caminhos ausentes ou com valores de tipo incompatível não satisfazem nenhum átomo.
+        """
+        counts = defaultdict(int)
+        for key in self._satisfied_atoms(variables):
+            counts[key] += 1
+
+        candidates = {key for key, count in counts.items() if count == len(self._atoms[key])}
+        return candidates - self._residual, (candidates & self._residual) | self._unindexed
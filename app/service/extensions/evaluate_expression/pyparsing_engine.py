@@ -1,15 +1,13 @@
-import distutils.util
-import operator
-import timeit
+import threading
 
 import pyparsing as pp
 
+from app.service.extensions.evaluate_expression.exceptions import ExpressionSyntaxException
+from app.service.extensions.evaluate_expression.expression_tree import Node, Constant, Path, UnaryOp, BinaryOp, BoolOp
 
-def _get_value(value: dict, path):
-    ret = value
-    for att in path:
-        ret = ret[att] if ret is not None and att in ret else None
-    return ret
+
+def _as_node(value) -> Node:
+    return value if isinstance(value, Node) else Constant(value)
 
 
 def _operator_operands(tokens):
@@ -23,53 +21,28 @@ def _operator_operands(tokens):
 
 def _parse_signop(results: pp.ParseResults):
     sign, value = results[0]
-    mult = {"+": 1, "-": -1}[sign]
-    return mult * value
+    return UnaryOp(sign, _as_node(value))
 
 
 def _parse_power(results: pp.ParseResults):
     value = results[0]
-    res = value[-1]
+    res = _as_node(value[-1])
     for val in value[-3::-2]:
-        res = val ** res
+        res = BinaryOp('**', _as_node(val), res)
     return res
 
 
-def _do_arith_expr(op1, op, op2):
-    _handlers = {
-        '+': operator.add,
-        '-': operator.sub,
-        '*': operator.mul,
-        '/': operator.truediv,
-        "<": lambda a, b: a < b,
-        "<=": lambda a, b: a <= b,
-        ">": lambda a, b: a > b,
-        ">=": lambda a, b: a >= b,
-        "!=": lambda a, b: a != b,
-        "==": lambda a, b: a == b,
-        'or': lambda a, b: a or b,
-        'and': lambda a, b: a and b,
-    }
-
-    return _handlers[op](op1, op2)
-
-
 def _parse_arith_expr(results: pp.ParseResults):
     value = results[0]
-    ret = value[0]
+    ret = _as_node(value[0])
     for op, val in _operator_operands(value[1:]):
-        ret = _do_arith_expr(ret, op, val)
+        ret = BinaryOp(op, ret, _as_node(val))
     return ret
 
 
 def _parse_and_or(results: pp.ParseResults):
     value = results[0]
-    bool_ret = value[0]
-    for op, val in _operator_operands(value[1:]):
-        if (not bool_ret and op == 'and') or (bool_ret and op == 'or'):
-            return bool_ret
-        bool_ret = _do_arith_expr(bool_ret, op, val)
-    return bool_ret
+    return BoolOp(_as_node(value[0]), [(op.lower(), _as_node(val)) for op, val in _operator_operands(value[1:])])
 
 
 pp.ParserElement.enablePackrat()
@@ -88,9 +61,11 @@ mult_op = pp.one_of("* /")
 plus_op = pp.one_of("+ -")
 exp_op = pp.Literal("**")
 
-bool_value.set_parse_action(lambda results: distutils.util.strtobool(results[0]) == 1)
-real.set_parse_action(lambda results: float(results[0]))
-integer.set_parse_action(lambda results: int(results[0]))
+dot_notation_path.set_parse_action(lambda results: Path(results))
+quoted_string.set_parse_action(lambda results: Constant(results[0]))
+bool_value.set_parse_action(lambda results: Constant(results[0].lower() == 'true'))
+real.set_parse_action(lambda results: Constant(float(results[0])))
+integer.set_parse_action(lambda results: Constant(int(results[0])))
 comparison_op = pp.one_of("< <= > >= != ==")
 
 arith_expr = pp.infix_notation(
@@ -112,13 +87,28 @@ comp_expr = pp.infix_notation(
 exp = pp.infix_notation(comp_expr, [(and_or, 2, pp.OpAssoc.LEFT, _parse_and_or)])
 
 
-def evaluate(expression, variables):
-    dot_notation_path.set_parse_action(lambda results: _get_value(variables, results))
-    ret = exp.parse_string(expression, parse_all=True)[0]
-    return ret
+# O cache packrat do pyparsing é global e reiniciado a cada parse_string, por isso o parse é serializado.
+# A árvore gerada é imutável e pode ser avaliada em paralelo, inclusive após ser serializada para outro processo.
+_parse_lock = threading.Lock()
 
 
-if __name__ == '__main__':
-    start_time = timeit.default_timer()
-    print(evaluate('3.1 + 14.2 + a', {'a': 200}))
-    print(timeit.default_timer() - start_time)
+def parse(expression) -> Node:
+    try:
+        with _parse_lock:
+            ret = exp.parse_string(expression, parse_all=True)[0]
+    except pp.ParseBaseException as exc:
+        raise ExpressionSyntaxException(str(exc)) from exc
+    return _as_node(ret)
+
+
+def compile_tree(tree: Node) -> Node:
+    return tree
+
+
+def compile_expression(expression) -> Node:
+    return compile_tree(parse(expression))
+
+
+def evaluate(expression, variables):
+    return parse(expression).evaluate(variables)
+
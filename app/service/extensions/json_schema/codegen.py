@@ -0,0 +1,350 @@
+"""
+Geração de código Python especializado para validar um JSON Schema, no estilo do fastjsonschema.
+
+O código gerado apenas responde se a instância é válida: cada palavra-chave vira um teste inline que retorna False
+na primeira falha, e somente os subschemas de anyOf, oneOf, not e if viram funções separadas. A mensagem de erro
+continua a cargo do jsonschema, executado só quando a instância é inválida.
+
+As regras seguem as do jsonschema (tipos, comparação de enum/const sem confundir bool com int, uniqueItems,
+multipleOf com float). Schemas com palavras-chave não suportadas aqui ($ref, contains, prefixItems, ...)
+levantam UnsupportedSchemaException, e o chamador usa o validador do jsonschema.
+"""
+import itertools
+import math
+import re
+from collections.abc import Mapping, Sequence
+from fractions import Fraction
+from numbers import Number
+from typing import Any, Callable, Dict, List, Tuple
+
+from jsonschema import Draft6Validator, Draft7Validator, Draft201909Validator, Draft202012Validator
+
+from app.service.extensions.json_schema.exceptions import UnsupportedSchemaException
+
+Check = Callable[[Any], bool]
+
+SUPPORTED_VALIDATORS = (Draft6Validator, Draft7Validator, Draft201909Validator, Draft202012Validator)
+SUPPORTED_KEYWORDS = frozenset({
+    'type', 'enum', 'const', 'format',
+    'multipleOf', 'maximum', 'exclusiveMaximum', 'minimum', 'exclusiveMinimum',
+    'maxLength', 'minLength', 'pattern',
+    'items', 'maxItems', 'minItems', 'uniqueItems',
+    'properties', 'patternProperties', 'additionalProperties', 'required', 'maxProperties', 'minProperties',
+    'dependentRequired', 'allOf', 'anyOf', 'oneOf', 'not', 'if',
+})
+
+TYPE_CHECKS = {
+    'array': 'isinstance({0}, list)',
+    'boolean': 'isinstance({0}, bool)',
+    'integer': '(isinstance({0}, int) and not isinstance({0}, bool) or isinstance({0}, float) and {0}.is_integer())',
+    'null': '{0} is None',
+    'number': '(isinstance({0}, Number) and not isinstance({0}, bool))',
+    'object': 'isinstance({0}, dict)',
+    'string': 'isinstance({0}, str)',
+}
+NUMBER_KEYWORDS = ('multipleOf', 'maximum', 'exclusiveMaximum', 'minimum', 'exclusiveMinimum')
+STRING_KEYWORDS = ('maxLength', 'minLength', 'pattern')
+ARRAY_KEYWORDS = ('items', 'maxItems', 'minItems', 'uniqueItems')
+OBJECT_KEYWORDS = ('properties', 'patternProperties', 'additionalProperties', 'required', 'maxProperties',
+                   'minProperties', 'dependentRequired')
+
+
+def _unbool(element, true=object(), false=object()):
+    if element is True:
+        return true
+    elif element is False:
+        return false
+    return element
+
+
+def json_equal(one, two) -> bool:
+    """
+    Igualdade de valores JSON como no jsonschema: bool não é igual a 0/1, também dentro de listas e objetos.
+    """
+    if isinstance(one, str) or isinstance(two, str):
+        return one == two
+    if isinstance(one, Sequence) and isinstance(two, Sequence):
+        return len(one) == len(two) and all(json_equal(i, j) for i, j in zip(one, two))
+    if isinstance(one, Mapping) and isinstance(two, Mapping):
+        return one.keys() == two.keys() and all(json_equal(one[key], two[key]) for key in one)
+    return _unbool(one) == _unbool(two)
+
+
+def _enum(instance, enums) -> bool:
+    if instance == 0 or instance == 1:
+        unbooled = _unbool(instance)
+        return any(unbooled == _unbool(each) for each in enums)
+    return instance in enums
+
+
+def _uniq(container) -> bool:
+    try:
+        sort = sorted(_unbool(i) for i in container)
+        return not any(json_equal(i, j) for i, j in zip(sort, itertools.islice(sort, 1, None)))
+    except (NotImplementedError, TypeError):
+        seen = []
+        for element in container:
+            element = _unbool(element)
+            if any(json_equal(i, element) for i in seen):
+                return False
+            seen.append(element)
+    return True
+
+
+def _not_float_multiple(instance, multiple: float) -> bool:
+    quotient = instance / multiple
+    try:
+        return int(quotient) != quotient
+    except OverflowError:
+        return (Fraction(instance) / Fraction(multiple)).denominator != 1
+
+
+_RUNTIME = {
+    'Number': Number,
+    '_equal': json_equal,
+    '_enum': _enum,
+    '_uniq': _uniq,
+    '_not_float_multiple': _not_float_multiple,
+}
+
+
+class _CodeGenerator:
+
+    def __init__(self, keywords):
+        self._keywords = frozenset(keywords)
+        self._functions: List[List[str]] = []
+        self._constants: Dict[str, Any] = {}
+        self._counter = itertools.count()
+
+    def _name(self, prefix: str) -> str:
+        return f'{prefix}{next(self._counter)}'
+
+    def _constant(self, value) -> str:
+        if isinstance(value, (int, str)) and not isinstance(value, bool) or \
+                isinstance(value, float) and math.isfinite(value):
+            return repr(value)
+        name = self._name('_c')
+        self._constants[name] = value
+        return name
+
+    def _pattern(self, pattern: str) -> str:
+        name = self._name('_re')
+        self._constants[name] = re.compile(pattern)
+        return name
+
+    def function(self, schema) -> str:
+        name = self._name('_validate')
+        lines = [f'def {name}(data):']
+        self._functions.append(lines)
+        self._emit(schema, 'data', lines, 1)
+        lines.append('    return True')
+        return name
+
+    def source(self) -> str:
+        return '\n\n'.join('\n'.join(lines) for lines in reversed(self._functions)) + '\n'
+
+    def namespace(self) -> dict:
+        return {**_RUNTIME, **self._constants}
+
+    def _block(self, header: str, schema_emitter, lines: List[str], indent: int):
+        body: List[str] = []
+        schema_emitter(body, indent + 1)
+        lines.append('    ' * indent + header)
+        lines.extend(body or ['    ' * (indent + 1) + 'pass'])
+
+    def _emit(self, schema, var: str, lines: List[str], indent: int):
+        pad = '    ' * indent
+
+        if schema is True:
+            return
+        if schema is False:
+            lines.append(f'{pad}return False')
+            return
+
+        unsupported = (set(schema) & self._keywords) - SUPPORTED_KEYWORDS
+        if unsupported:
+            raise UnsupportedSchemaException(f"Unsupported keywords: {sorted(unsupported)}")
+
+        # Assim como no jsonschema, palavras-chave desconhecidas pela versão do schema são ignoradas.
+        schema = {keyword: value for keyword, value in schema.items()
+                  if keyword in self._keywords or keyword in ('then', 'else')}
+
+        types = schema.get('type')
+        types = [types] if isinstance(types, str) else types
+        if types is not None:
+            checks = ' or '.join(TYPE_CHECKS[type_].format(var) for type_ in types) or 'False'
+            lines.append(f'{pad}if not ({checks}):')
+            lines.append(f'{pad}    return False')
+
+        if 'enum' in schema:
+            lines.append(f'{pad}if not _enum({var}, {self._constant(schema["enum"])}):')
+            lines.append(f'{pad}    return False')
+
+        if 'const' in schema:
+            lines.append(f'{pad}if not _equal({var}, {self._constant(schema["const"])}):')
+            lines.append(f'{pad}    return False')
+
+        groups = (
+            (NUMBER_KEYWORDS, {'number', 'integer'}, TYPE_CHECKS['number'], self._emit_number),
+            (STRING_KEYWORDS, {'string'}, TYPE_CHECKS['string'], self._emit_string),
+            (ARRAY_KEYWORDS, {'array'}, TYPE_CHECKS['array'], self._emit_array),
+            (OBJECT_KEYWORDS, {'object'}, TYPE_CHECKS['object'], self._emit_object),
+        )
+        for keywords, group_types, type_check, group_emitter in groups:
+            if not any(keyword in schema for keyword in keywords):
+                continue
+            if types and set(types) <= group_types:
+                # O teste de tipo acima já garante o tipo das palavras-chave do grupo.
+                group_emitter(schema, var, lines, indent)
+            else:
+                self._block(f'if {type_check.format(var)}:',
+                            lambda body, level: group_emitter(schema, var, body, level), lines, indent)
+
+        for subschema in schema.get('allOf', ()):
+            self._emit(subschema, var, lines, indent)
+
+        if 'anyOf' in schema:
+            calls = ' or '.join(f'{self.function(subschema)}({var})' for subschema in schema['anyOf'])
+            lines.append(f'{pad}if not ({calls}):')
+            lines.append(f'{pad}    return False')
+
+        if 'oneOf' in schema:
+            calls = ' + '.join(f'{self.function(subschema)}({var})' for subschema in schema['oneOf'])
+            lines.append(f'{pad}if ({calls}) != 1:')
+            lines.append(f'{pad}    return False')
+
+        if 'not' in schema:
+            lines.append(f'{pad}if {self.function(schema["not"])}({var}):')
+            lines.append(f'{pad}    return False')
+
+        if 'if' in schema:
+            self._block(f'if {self.function(schema["if"])}({var}):',
+                        lambda body, level: self._emit(schema.get('then', True), var, body, level), lines, indent)
+            if 'else' in schema:
+                self._block('else:', lambda body, level: self._emit(schema['else'], var, body, level), lines, indent)
+
+    def _emit_number(self, schema, var: str, lines: List[str], indent: int):
+        pad = '    ' * indent
+        comparisons = (('maximum', '>'), ('exclusiveMaximum', '>='), ('minimum', '<'), ('exclusiveMinimum', '<='))
+
+        for keyword, operator in comparisons:
+            if keyword in schema:
+                lines.append(f'{pad}if {var} {operator} {self._constant(schema[keyword])}:')
+                lines.append(f'{pad}    return False')
+
+        if 'multipleOf' in schema:
+            multiple = schema['multipleOf']
+            if isinstance(multiple, float):
+                lines.append(f'{pad}if _not_float_multiple({var}, {self._constant(multiple)}):')
+            else:
+                lines.append(f'{pad}if {var} % {self._constant(multiple)}:')
+            lines.append(f'{pad}    return False')
+
+    def _emit_string(self, schema, var: str, lines: List[str], indent: int):
+        pad = '    ' * indent
+
+        if 'maxLength' in schema:
+            lines.append(f'{pad}if len({var}) > {schema["maxLength"]!r}:')
+            lines.append(f'{pad}    return False')
+        if 'minLength' in schema:
+            lines.append(f'{pad}if len({var}) < {schema["minLength"]!r}:')
+            lines.append(f'{pad}    return False')
+        if 'pattern' in schema:
+            lines.append(f'{pad}if not {self._pattern(schema["pattern"])}.search({var}):')
+            lines.append(f'{pad}    return False')
+
+    def _emit_array(self, schema, var: str, lines: List[str], indent: int):
+        pad = '    ' * indent
+
+        if 'maxItems' in schema:
+            lines.append(f'{pad}if len({var}) > {schema["maxItems"]!r}:')
+            lines.append(f'{pad}    return False')
+        if 'minItems' in schema:
+            lines.append(f'{pad}if len({var}) < {schema["minItems"]!r}:')
+            lines.append(f'{pad}    return False')
+        if schema.get('uniqueItems'):
+            lines.append(f'{pad}if not _uniq({var}):')
+            lines.append(f'{pad}    return False')
+
+        items = schema.get('items', True)
+        if isinstance(items, list):
+            raise UnsupportedSchemaException("Unsupported keywords: ['items'] (tuple validation)")
+        if items is False:
+            lines.append(f'{pad}if {var}:')
+            lines.append(f'{pad}    return False')
+        elif items is not True:
+            item = self._name('item')
+            self._block(f'for {item} in {var}:', lambda body, level: self._emit(items, item, body, level),
+                        lines, indent)
+
+    def _emit_object(self, schema, var: str, lines: List[str], indent: int):
+        pad = '    ' * indent
+
+        for required in schema.get('required', ()):
+            lines.append(f'{pad}if {required!r} not in {var}:')
+            lines.append(f'{pad}    return False')
+
+        if 'maxProperties' in schema:
+            lines.append(f'{pad}if len({var}) > {schema["maxProperties"]!r}:')
+            lines.append(f'{pad}    return False')
+        if 'minProperties' in schema:
+            lines.append(f'{pad}if len({var}) < {schema["minProperties"]!r}:')
+            lines.append(f'{pad}    return False')
+
+        for prop, dependencies in schema.get('dependentRequired', {}).items():
+            missing = ' or '.join(f'{dependency!r} not in {var}' for dependency in dependencies)
+            if missing:
+                lines.append(f'{pad}if {prop!r} in {var} and ({missing}):')
+                lines.append(f'{pad}    return False')
+
+        properties = schema.get('properties', {})
+        for prop, subschema in properties.items():
+            self._emit_property(prop, subschema, var, lines, indent)
+
+        patterns = {self._pattern(pattern): subschema
+                    for pattern, subschema in schema.get('patternProperties', {}).items()}
+        for pattern, subschema in patterns.items():
+            key, value = self._name('key'), self._name('value')
+            lines.append(f'{pad}for {key}, {value} in {var}.items():')
+            self._block(f'if {pattern}.search({key}):',
+                        lambda body, level, value=value, subschema=subschema: self._emit(subschema, value, body, level),
+                        lines, indent + 1)
+
+        additional = schema.get('additionalProperties', True)
+        if additional is not True:
+            key, value = self._name('key'), self._name('value')
+            extra = ' and '.join([f'{key} not in {self._constant(frozenset(properties))}'] +
+                                 [f'not {pattern}.search({key})' for pattern in patterns])
+            lines.append(f'{pad}for {key}, {value} in {var}.items():')
+            self._block(f'if {extra}:', lambda body, level: self._emit(additional, value, body, level),
+                        lines, indent + 1)
+
+    def _emit_property(self, prop: str, subschema, var: str, lines: List[str], indent: int):
+        value = self._name('value')
+
+        def _emit_value(body, level):
+            body.append('    ' * level + f'{value} = {var}[{prop!r}]')
+            self._emit(subschema, value, body, level)
+
+        self._block(f'if {prop!r} in {var}:', _emit_value, lines, indent)
+
+
+def generate_source(schema, validator_cls) -> Tuple[str, str, dict]:
+    """
+    Gera o código do validador do schema e retorna (código, nome da função de entrada, namespace).
+    """
+    if validator_cls not in SUPPORTED_VALIDATORS:
+        raise UnsupportedSchemaException(f"Unsupported JSON Schema draft: {validator_cls.__name__}")
+
+    generator = _CodeGenerator(validator_cls.VALIDATORS)
+    name = generator.function(schema)
+    return generator.source(), name, generator.namespace()
+
+
+def compile_schema(schema, validator_cls) -> Check:
+    """
+    Compila o schema (já verificado com check_schema) em uma função que retorna se a instância é válida.
+    """
+    source, name, namespace = generate_source(schema, validator_cls)
+    exec(compile(source, '<json-schema>', 'exec'), namespace)
+    return namespace[name]
@@ -0,0 +1,6 @@
+class JsonSchemaException(Exception):
+    pass
+
+
+class UnsupportedSchemaException(JsonSchemaException):
+    pass
@@ -0,0 +1,217 @@
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from app.domain.hook import Hook
+from app.service.extensions.evaluate_expression.exceptions import ExpressionException
+from app.service.extensions.evaluate_expression.expression_tree import Node
+from app.service.extensions.evaluate_expression.predicate_index import PredicateIndex
+
+RouteKey = Tuple[str, str]
+
+
+def filter_by_tags(hooks: List[Hook], tags: List[List[str]]) -> List[Hook]:
+    """
+    Hooks cujas tags contêm ao menos um dos grupos de tags do domínio, cada hook uma única vez.
+    """
+    groups = [set(filter_tags) for filter_tags in tags or [[]]]
+    return [hook for hook in hooks if any(group.issubset(hook.tags or ()) for group in groups)]
+
+
+class TagIndex:
+    """
+    Índice invertido tag -> bitset dos hooks que possuem a tag. Cada hook ocupa um bit (slot); os hooks de um grupo
+    de tags do domínio são a interseção dos bitsets das tags do grupo, e o resultado final é a união entre os grupos.
+    """
+    __slots__ = ('_hooks', '_slots', '_free_slots', '_tag_bits', '_all_bits')
+
+    def __init__(self, hooks: List[Hook] = ()):
+        self._hooks: List[Optional[Hook]] = []
+        self._slots: Dict[str, int] = {}
+        self._free_slots: List[int] = []
+        self._tag_bits: Dict[str, int] = {}
+        self._all_bits = 0
+
+        for hook in hooks:
+            self.add(hook)
+
+    def add(self, hook: Hook):
+        hook_id = str(hook.id)
+        if hook_id in self._slots:
+            self.remove(hook)
+
+        slot = self._free_slots.pop() if self._free_slots else len(self._hooks)
+        if slot == len(self._hooks):
+            self._hooks.append(hook)
+        else:
+            self._hooks[slot] = hook
+
+        bit = 1 << slot
+        self._slots[hook_id] = slot
+        self._all_bits |= bit
+        for tag in set(hook.tags or ()):
+            self._tag_bits[tag] = self._tag_bits.get(tag, 0) | bit
+
+    def remove(self, hook: Hook):
+        slot = self._slots.pop(str(hook.id), None)
+        if slot is None:
+            return
+
+        bit = 1 << slot
+        self._all_bits &= ~bit
+        for tag in set(self._hooks[slot].tags or ()):
+            bits = self._tag_bits[tag] & ~bit
+            if bits:
+                self._tag_bits[tag] = bits
+            else:
+                del self._tag_bits[tag]
+
+        self._hooks[slot] = None
+        self._free_slots.append(slot)
+
+    def match(self, tags: List[List[str]]) -> List[Hook]:
+        matched = 0
+        for filter_tags in tags or [[]]:
+            bits = self._all_bits
+            for tag in filter_tags:
+                bits &= self._tag_bits.get(tag, 0)
+                if not bits:
+                    break
+            matched |= bits
+
+        hooks = []
+        while matched:
+            lowest = matched & -matched
+            hooks.append(self._hooks[lowest.bit_length() - 1])
+            matched ^= lowest
+        return hooks
+
+    def hooks(self) -> List[Hook]:
+        return [hook for hook in self._hooks if hook is not None]
+
+
+def always_true(hook: Hook) -> bool:
+    return not hook.condition or bool(hook.condition_info and hook.condition_info.always_true)
+
+
+class RouteMatch(NamedTuple):
+    accepted: List[Hook]
+    to_evaluate: List[Hook]
+    rejected: List[Hook]
+
+
+class ConditionIndex:
+    """
+    Hooks de uma rota separados pela condição, indexados uma única vez: os sem condição (ou sempre verdadeiros) e
+    os de condição inválida em índices de tags próprios e os demais no PredicateIndex. Um evento consulta os índices
+    e confere as tags somente dos candidatos, sem percorrer todos os hooks da rota.
+    """
+    __slots__ = ('_parse', '_predicates', '_conditional', '_unconditional', '_invalid')
+
+    def __init__(self, parse: Callable[[str], Node], hooks: List[Hook] = ()):
+        self._parse = parse
+        self._predicates = PredicateIndex()
+        self._conditional: Dict[str, Hook] = {}
+        self._unconditional = TagIndex()
+        self._invalid = TagIndex()
+
+        for hook in hooks:
+            self.add(hook)
+
+    def add(self, hook: Hook):
+        self.remove(hook)
+
+        if always_true(hook):
+            self._unconditional.add(hook)
+            return
+
+        try:
+            tree = self._parse(hook.condition)
+        except ExpressionException:
+            self._invalid.add(hook)
+            return
+
+        self._predicates.add(str(hook.id), tree)
+        self._conditional[str(hook.id)] = hook
+
+    def remove(self, hook: Hook):
+        hook_id = str(hook.id)
+        self._unconditional.remove(hook)
+        self._invalid.remove(hook)
+        if self._conditional.pop(hook_id, None):
+            self._predicates.remove(hook_id)
+
+    def match(self, tags: List[List[str]], variables: Any) -> RouteMatch:
+        accepted, to_evaluate = self._predicates.match(variables)
+        return RouteMatch(
+            accepted=self._unconditional.match(tags) + self._eligible(accepted, tags),
+            to_evaluate=self._eligible(to_evaluate, tags),
+            rejected=self._invalid.match(tags),
+        )
+
+    def _eligible(self, hook_ids, tags: List[List[str]]) -> List[Hook]:
+        # Ids de ObjectId ordenados seguem a ordem de criação dos hooks.
+        return filter_by_tags([self._conditional[hook_id] for hook_id in sorted(hook_ids)], tags)
+
+
+class _Route:
+    __slots__ = ('index', 'conditions', 'loaded_at')
+
+    def __init__(self, hooks: List[Hook], parse: Optional[Callable[[str], Node]]):
+        self.index = TagIndex(hooks)
+        self.conditions = ConditionIndex(parse, hooks) if parse else None
+        self.loaded_at = time.monotonic()
+
+
+class RoutingTable:
+    """
+    Hooks em memória por (schema_name, event_name). As rotas são carregadas do banco no primeiro uso, atualizadas
+    quando hooks são criados ou removidos por esta instância e recarregadas após o ttl, o que cobre as alterações
+    feitas por outras instâncias. Com ttl <= 0 a tabela fica desabilitada.
+
+    Com parse, as condições dos hooks de cada rota também são indexadas (ConditionIndex) na carga da rota; a
+    recarga descarta os hooks removidos por outras instâncias.
+    """
+
+    def __init__(self, ttl: float, parse: Callable[[str], Node] = None):
+        self.ttl = ttl
+        self.parse = parse
+        self._routes: Dict[RouteKey, _Route] = {}
+
+    def _get_route(self, key: RouteKey) -> Optional[_Route]:
+        route = self._routes.get(key)
+        if not route or time.monotonic() - route.loaded_at > self.ttl:
+            return None
+        return route
+
+    def get(self, key: RouteKey) -> Optional[List[Hook]]:
+        route = self._get_route(key)
+        return route.index.hooks() if route else None
+
+    def match(self, key: RouteKey, tags: List[List[str]]) -> Optional[List[Hook]]:
+        route = self._get_route(key)
+        return route.index.match(tags) if route else None
+
+    def conditions(self, key: RouteKey) -> Optional[ConditionIndex]:
+        route = self._get_route(key)
+        return route.conditions if route else None
+
+    def load(self, key: RouteKey, hooks: List[Hook]):
+        if self.ttl > 0:
+            self._routes[key] = _Route(hooks, self.parse)
+
+    def add(self, hook: Hook):
+        route = self._routes.get((hook.schema_name, hook.event_name))
+        if route:
+            route.index.add(hook)
+            if route.conditions:
+                route.conditions.add(hook)
+
+    def remove(self, hook: Hook):
+        route = self._routes.get((hook.schema_name, hook.event_name))
+        if route:
+            route.index.remove(hook)
+            if route.conditions:
+                route.conditions.remove(hook)
+
+    def clear(self):
+        self._routes.clear()
@@ -1,25 +1,99 @@
-from typing import List
+import logging
+from typing import Any, List, Optional, Tuple
 
-from app.domain.hook import Hook, HookType
+from app.config.app import settings
+from app.domain.hook import Hook, HookType, HookCondition
 from app.repository import base_repository, hook_repository
-from app.service import schema_service
-from app.service.exceptions import ValidationException
+from app.service import schema_service, expression_service
+from app.service.exceptions import ValidationException, RecordNotFoundException
+from app.service.extensions.evaluate_expression.exceptions import ExpressionException
+from app.service.hook_routing import ConditionIndex, RouteMatch, RoutingTable
+
+logger = logging.getLogger(__name__)
+
+_routing_table = RoutingTable(ttl=settings.hooks.routing_ttl, parse=expression_service.parse_condition)
 
 
 async def create_hook_config(hook: Hook) -> Hook:
     if hook.type == HookType.WEBHOOK and not hook.webhook:
         raise ValidationException(f"Attribute 'webhook' is required when type is '{HookType.WEBHOOK}'")
 
+    if hook.condition:
+        hook.condition_info = HookCondition(**expression_service.analyze_condition(hook.condition)._asdict())
+
     await schema_service.exists_schema(hook.schema_name)
-    return await base_repository.create(hook)
+    ret = await base_repository.create(hook)
+    _routing_table.add(ret)
+    return ret
+
+
+async def delete_hook_config(hook: Hook) -> Hook:
+    ret = await base_repository.delete_by_key(hook, return_as=Hook)
+    if not ret:
+        raise RecordNotFoundException()
+
+    _routing_table.remove(ret)
+    return ret
 
 
 async def find_hooks_by_example(example: Hook) -> List[Hook]:
     return await base_repository.find_by_example(example, return_as=Hook, limit=0)
 
 
-async def find_eligible_hooks(schema_name: str, event_name: str, tags: List[List[str]]) -> List[Hook]:
-    result = []
-    for filter_tags in tags if tags else [[]]:
-        result.extend(await hook_repository.find_eligible_hooks(schema_name, event_name, filter_tags))
-    return result
+async def _get_conditions(schema_name: str, event_name: str, tags_list: List[List[List[str]]]) -> ConditionIndex:
+    if _routing_table.ttl <= 0:
+        # Sem a tabela de rotas, o filtro de tags de um único domínio é aplicado na consulta.
+        tags = tags_list[0] if len(tags_list) == 1 else []
+        return ConditionIndex(expression_service.parse_condition,
+                              await hook_repository.find_eligible_hooks(schema_name, event_name, tags))
+
+    key = (schema_name, event_name)
+    conditions = _routing_table.conditions(key)
+
+    if conditions is None:
+        _routing_table.load(key, await hook_repository.find_eligible_hooks(schema_name, event_name, []))
+        conditions = _routing_table.conditions(key)
+
+    return conditions
+
+
+async def find_matching_hooks(schema_name: str, event_name: str,
+                              items: List[Tuple[List[List[str]], Any]]) -> List[RouteMatch]:
+    """
+    Hooks de cada item (grupos de tags do domínio e variáveis das condições) separados pelo índice de condições da
+    rota, lida uma única vez: os aceitos, os que ainda precisam ter a condição avaliada e os de condição inválida.
+    """
+    conditions = await _get_conditions(schema_name, event_name, [tags for tags, _ in items])
+    return [conditions.match(tags, variables) for tags, variables in items]
+
+
+def clear_cache():
+    _routing_table.clear()
+
+
+def evaluate_conditions(conditions: List[str], variables) -> List[Optional[bool]]:
+    """
+    Resultado de cada condição, ou None para as rejeitadas (inválidas ou acima do orçamento de avaliação).
+    """
+    ret = []
+    for condition in conditions:
+        try:
+            ret.append(bool(expression_service.evaluate(condition, variables)))
+        except ExpressionException as exc:
+            logger.warning(f'Condition rejected: {condition}: {exc}')
+            ret.append(None)
+    return ret
+
+
+def select_hooks(schema_name: str, event_name: str, match: RouteMatch, results: List[Optional[bool]]) -> List[Hook]:
+    """
+    Hooks aceitos pelo índice somados aos de condição avaliada como verdadeira (results, na ordem de to_evaluate).
+    """
+    rejected = [str(hook.id) for hook in match.rejected]
+    rejected.extend(str(hook.id) for hook, result in zip(match.to_evaluate, results) if result is None)
+
+    if rejected:
+        logger.warning(f'Hooks of {schema_name}/{event_name} skipped by invalid or over-budget conditions: '
+                       f'{", ".join(sorted(rejected))}')
+
+    return match.accepted + [hook for hook, result in zip(match.to_evaluate, results) if result]
@@ -0,0 +1,68 @@
+from typing import Any, Dict, List, NamedTuple
+
+from app.service.exceptions import ValidationException
+from app.service.extensions.json_schema.codegen import json_equal
+
+
+class MergeResult(NamedTuple):
+    document: dict
+    set_fields: Dict[str, Any]
+    unset_fields: Dict[str, str]
+    changed_paths: List[str]
+
+
+def _check_key(key: str):
+    if not key or '.' in key or key.startswith('$'):
+        raise ValidationException('Invalid patch key', details=key)
+
+
+def _strip_nulls(value):
+    if isinstance(value, dict):
+        for key in value:
+            _check_key(key)
+        return {key: _strip_nulls(item) for key, item in value.items() if item is not None}
+    if isinstance(value, list):
+        return [_strip_nulls(item) for item in value]
+    return value
+
+
+def _merge(target: dict, patch: dict, path: List[str], ret: MergeResult) -> dict:
+    merged = dict(target)
+
+    for key, value in patch.items():
+        _check_key(key)
+        key_path = [*path, key]
+
+        if value is None:
+            if key in merged:
+                del merged[key]
+                ret.unset_fields['.'.join(key_path)] = ''
+                ret.changed_paths.append('.'.join(key_path[1:]))
+        elif isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value, key_path, ret)
+        else:
+            value = _strip_nulls(value)
+            if key not in merged or not json_equal(merged[key], value):
+                merged[key] = value
+                ret.set_fields['.'.join(key_path)] = value
+                ret.changed_paths.append('.'.join(key_path[1:]))
+
+    return merged
+
+
+def merge_patch(target: dict, patch: dict, field: str) -> MergeResult:
+    """
+    Aplica um JSON merge patch (RFC 7386) sobre o atributo field de um documento: null remove a chave, objetos
+    são mesclados recursivamente e os demais valores substituem o atual. Retorna o valor mesclado, as
+    atualizações pontuais equivalentes ($set/$unset, com o caminho a partir do documento) e os caminhos alterados
+    (a partir de field). Valores iguais aos atuais (com a igualdade do JSON, em que true não é igual a 1) não geram
+    atualização.
+    """
+    ret = MergeResult({}, {}, {}, [])
+    document = _merge(target if isinstance(target, dict) else {}, patch, [field], ret)
+
+    if not isinstance(target, dict) and ret.changed_paths:
+        # Sem um objeto gravado em field, os caminhos internos não podem ser atualizados: o valor é gravado inteiro.
+        return ret._replace(document=document, set_fields={field: document}, unset_fields={})
+
+    return ret._replace(document=document)
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import time
+from typing import Any, Callable, Dict, Optional
+
+from jsonschema.exceptions import SchemaError, best_match
+from jsonschema.validators import validator_for
+
+from app.service.exceptions import ValidationException
+from app.service.extensions.json_schema import codegen
+from app.service.extensions.json_schema.exceptions import UnsupportedSchemaException
+from app.utils.cache import LRUCache
+
+VALIDATORS = ('jsonschema', 'codegen')
+
+
+def schema_version(schema_dict: dict) -> str:
+    return hashlib.sha1(json.dumps(schema_dict, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def _check_validator(validator: str):
+    if validator not in VALIDATORS:
+        raise ValueError(f"Unknown schema validator: {validator}")
+
+
+class CompiledSchema:
+    """
+    Schema de domínio com o validador do jsonschema já construído (e o schema já verificado), reaproveitado em todas
+    as validações da mesma versão do schema.
+
+    Com o validador 'codegen', as instâncias válidas são confirmadas pelo código gerado para o schema e o jsonschema
+    só é executado para descrever o erro das inválidas (ou para os schemas que o gerador não suporta).
+    """
+    __slots__ = ('name', 'schema', 'version', '_schema_dict', '_validator_name', '_validator', '_check',
+                 '_schema_error')
+
+    def __init__(self, name: str, schema: Any, schema_dict: dict, version: str = None, validator: str = 'jsonschema'):
+        _check_validator(validator)
+        self.name = name
+        self.schema = schema
+        self.version = version or schema_version(schema_dict)
+        self._schema_dict = schema_dict
+        self._validator_name = validator
+        self._validator = None
+        self._check: Optional[Callable[[Any], bool]] = None
+        self._schema_error: Optional[SchemaError] = None
+
+        try:
+            validator_cls = validator_for(schema_dict)
+            validator_cls.check_schema(schema_dict)
+            self._validator = validator_cls(schema_dict)
+        except SchemaError as err:
+            self._schema_error = err
+            return
+
+        if validator == 'codegen':
+            try:
+                self._check = codegen.compile_schema(schema_dict, validator_cls)
+            except UnsupportedSchemaException:
+                pass
+
+    def __reduce__(self):
+        # Enviado a outro processo (pool de CPU) somente com o schema; o validador é compilado lá uma única vez.
+        return _restore, (self.name, self._schema_dict, self.version, self._validator_name)
+
+    @property
+    def generated(self) -> bool:
+        return self._check is not None
+
+    def validate(self, instance):
+        if self._schema_error:
+            raise ValidationException(f"Invalid schema: {self.name}", details=self._schema_error.message)
+
+        if self._check is not None and self._check(instance):
+            return
+
+        error = best_match(self._validator.iter_errors(instance))
+        if error:
+            raise ValidationException(f"Domain has a invalid schema: {self.name}", details=error.message)
+
+
+_restored = LRUCache(maxsize=256)
+
+
+def _restore(name: str, schema_dict: dict, version: str, validator: str) -> CompiledSchema:
+    return _restored.get_or_create((name, version, validator),
+                                   lambda: CompiledSchema(name, None, schema_dict, version, validator))
+
+
+class _Entry:
+    __slots__ = ('compiled', 'loaded_at')
+
+    def __init__(self, compiled: CompiledSchema):
+        self.compiled = compiled
+        self.loaded_at = time.monotonic()
+
+
+class SchemaRegistry:
+    """
+    Schemas compilados em memória por nome. São invalidados quando o schema é alterado ou removido por esta
+    instância e recarregados após o ttl, o que cobre as alterações feitas por outras instâncias; se a versão
+    recarregada for a mesma, o validador já compilado é mantido. Com ttl <= 0 o registro fica desabilitado.
+    """
+
+    def __init__(self, ttl: float, validator: str = 'jsonschema'):
+        _check_validator(validator)
+        self.ttl = ttl
+        self.validator = validator
+        self._entries: Dict[str, _Entry] = {}
+
+    def get(self, name: str) -> Optional[CompiledSchema]:
+        entry = self._entries.get(name)
+        if not entry or time.monotonic() - entry.loaded_at > self.ttl:
+            return None
+        return entry.compiled
+
+    def put(self, name: str, schema: Any, schema_dict: dict) -> CompiledSchema:
+        version = schema_version(schema_dict)
+        entry = self._entries.get(name)
+
+        if entry and entry.compiled.version == version:
+            entry.compiled.schema = schema
+            compiled = entry.compiled
+        else:
+            compiled = CompiledSchema(name, schema, schema_dict, version, self.validator)
+
+        if self.ttl > 0:
+            self._entries[name] = _Entry(compiled)
+        return compiled
+
+    def invalidate(self, name: str):
+        self._entries.pop(name, None)
+
+    def clear(self):
+        self._entries.clear()
@@ -1,17 +1,77 @@
+from typing import Dict, Iterable
+
+from app.config.app import settings
 from app.domain.domain import DomainSchema
 from app.repository import base_repository
+from app.service import base_service
 from app.service.exceptions import RecordNotFoundException
+from app.service.schema_registry import CompiledSchema, SchemaRegistry
 
+_registry = SchemaRegistry(ttl=settings.schemas.cache_ttl, validator=settings.schemas.validator)
 
-async def get_schema_by_name(schema_name: str) -> DomainSchema:
-    schema = await base_repository.find_by_key(DomainSchema(name=schema_name), return_as=DomainSchema)
 
-    if not schema:
-        raise RecordNotFoundException(f'O schema fornecido não existe: {schema_name}')
+def _compile(schema: DomainSchema) -> CompiledSchema:
+    schema_dict = schema.domain_schema.dict(exclude_none=True) if schema.domain_schema else {}
+    return _registry.put(schema.name, schema, schema_dict)
+
+
+async def get_compiled_schema(schema_name: str) -> CompiledSchema:
+    compiled = _registry.get(schema_name)
+
+    if compiled is None:
+        schema = await base_repository.find_first_by_key(DomainSchema(name=schema_name), return_as=DomainSchema)
+
+        if not schema:
+            raise RecordNotFoundException(f'O schema fornecido não existe: {schema_name}')
 
-    return schema[0]
+        compiled = _compile(schema)
+
+    return compiled
+
+
+async def get_schema_by_name(schema_name: str) -> DomainSchema:
+    return (await get_compiled_schema(schema_name)).schema
 
 
 async def exists_schema(schema_name: str):
-    await get_schema_by_name(schema_name)
+    await get_compiled_schema(schema_name)
     return True
+
+
+async def find_compiled_schemas_by_names(schema_names: Iterable[str]) -> Dict[str, CompiledSchema]:
+    ret, missing = {}, []
+    for name in schema_names:
+        compiled = _registry.get(name)
+        if compiled:
+            ret[name] = compiled
+        else:
+            missing.append(name)
+
+    if missing:
+        schemas = await base_repository.find_by_keys([DomainSchema(name=name) for name in missing],
+                                                     return_as=DomainSchema)
+        ret.update((schema.name, _compile(schema)) for schema in schemas)
+
+    return ret
+
+
+async def find_schemas_by_names(schema_names: Iterable[str]) -> Dict[str, DomainSchema]:
+    return {name: compiled.schema for name, compiled in (await find_compiled_schemas_by_names(schema_names)).items()}
+
+
+async def upsert_schema(schema: DomainSchema) -> DomainSchema:
+    ret = await base_service.create_entity(schema)
+    _registry.invalidate(schema.name)
+    return ret
+
+
+async def delete_schema(schema: DomainSchema) -> DomainSchema:
+    try:
+        return await base_service.delete_entity_by_key(schema)
+    finally:
+        # Depois da remoção, para que uma leitura concorrente não volte a guardar o schema removido.
+        _registry.invalidate(schema.name)
+
+
+def clear_cache():
+    _registry.clear()
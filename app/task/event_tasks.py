@@ -1,4 +1,5 @@
 import logging
+from typing import List
 
 from app.config.celery import celery
 from app.domain.domain import DomainEvent
@@ -38,9 +39,25 @@ def trigger_events():
     _call_service(event_service.trigger_pending_events)
 
 
-async def dispatch_event(event: DomainEvent):
-    await run_in_executor(
-        _process_event.s(str(event.id)).apply_async,
+def _publish_event(event: DomainEvent):
+    _process_event.s(str(event.id)).apply_async(
         retry=True,
         queue=event.hook.queue_name or 'default',
         retry_policy={'max_retries': event.hook.webhook.max_retries})
+
+
+def _publish_events(events: List[DomainEvent]):
+    for event in events:
+        _publish_event(event)
+
+
+async def dispatch_event(event: DomainEvent):
+    await run_in_executor(_publish_event, event)
+
+
+async def dispatch_events(events: List[DomainEvent]):
+    """
+    Publica os eventos em um único salto para o executor.
+    """
+    if events:
+        await run_in_executor(_publish_events, events)
@@ -0,0 +1,63 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, NamedTuple
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+
+class LRUCache:
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]):
+        with self._lock:
+            if key in self._data:
+                self._hits += 1
+                self._data.move_to_end(key)
+                return self._data[key]
+            self._misses += 1
+
+        # A criação acontece fora do lock para não serializar as threads durante o parse.
+        value = factory()
+
+        with self._lock:
+            return self._put(key, value)
+
+    def _put(self, key: Hashable, value: Any):
+        if self.maxsize <= 0:
+            return value
+
+        value = self._data.setdefault(key, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self._evictions += 1
+
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._evictions, len(self._data), self.maxsize)
+
+    def __contains__(self, key: Hashable):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,156 @@
+import asyncio
+import math
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+
+class ExecutorMetrics(NamedTuple):
+    inline: int
+    offloaded: int
+    queue_depth: int
+    max_queue_depth: int
+    wait_time_total: float
+    wait_time_max: float
+
+
+def payload_size(value: Any, limit: int) -> int:
+    """
+    Tamanho aproximado de um documento (quantidade de nós, com textos longos pesando mais), contado somente até o
+    limite para que a medida não custe mais que o trabalho que ela decide onde executar.
+    """
+    size, stack = 0, [value]
+
+    while stack and size < limit:
+        value = stack.pop()
+        size += 1
+        if isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+        elif isinstance(value, str):
+            size += len(value) // 64
+
+    return size
+
+
+def _timed_call(fnc: Callable, args: tuple) -> Tuple[Any, Optional[BaseException], float]:
+    start = time.perf_counter()
+    try:
+        return fnc(*args), None, time.perf_counter() - start
+    except Exception as exc:
+        return None, exc, time.perf_counter() - start
+
+
+class CpuExecutor:
+    """
+    Executa trabalho síncrono de CPU chamado a partir do event loop: cargas abaixo de threshold rodam inline
+    (o salto para outro processo custaria mais que a execução) e as maiores em um pool de processos, liberando o
+    loop. Com workers <= 0 tudo roda inline.
+
+    A função e os argumentos das cargas enviadas ao pool precisam ser serializáveis com pickle. Os workers são
+    iniciados com spawn, e não fork: um fork herdaria travados os locks (caches, clientes do Motor) que outras
+    threads do processo seguram no momento. Cada worker importa os módulos e reconstrói os próprios caches
+    (condições e schemas compilados) no primeiro uso.
+    """
+
+    def __init__(self, workers: int, threshold: int):
+        self.workers = workers
+        self.threshold = threshold
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._inline = 0
+        self._offloaded = 0
+        self._queue_depth = 0
+        self._max_queue_depth = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+        return self._pool
+
+    def _reset_pool(self, pool: ProcessPoolExecutor):
+        # Outra tarefa pode já ter recriado o pool depois da mesma falha.
+        if self._pool is pool:
+            pool.shutdown(wait=False)
+            self._pool = None
+
+    async def _submit(self, fnc: Callable, args: tuple) -> Tuple[Any, Optional[BaseException], float]:
+        """
+        Envia a carga ao pool. Se um worker morreu (ex.: falta de memória), o pool quebrado é descartado e a carga
+        é reenviada uma vez a um pool novo.
+        """
+        for attempt in range(2):
+            pool = self._get_pool()
+            try:
+                return await asyncio.get_running_loop().run_in_executor(pool, _timed_call, fnc, args)
+            except BrokenProcessPool:
+                self._reset_pool(pool)
+                if attempt:
+                    raise
+
+    async def run(self, size: int, fnc: Callable, *args):
+        if self.workers <= 0 or size < self.threshold:
+            self._inline += 1
+            return fnc(*args)
+
+        self._offloaded += 1
+        self._queue_depth += 1
+        self._max_queue_depth = max(self._max_queue_depth, self._queue_depth)
+        start = time.perf_counter()
+
+        try:
+            ret, error, run_time = await self._submit(fnc, args)
+        finally:
+            self._queue_depth -= 1
+
+        # O tempo de espera é o tempo total menos a execução medida no worker, o que inclui a fila do pool e a
+        # serialização dos argumentos e do retorno.
+        wait_time = max(0.0, time.perf_counter() - start - run_time)
+        self._wait_time_total += wait_time
+        self._wait_time_max = max(self._wait_time_max, wait_time)
+
+        if error:
+            raise error
+        return ret
+
+    async def run_chunks(self, fnc: Callable[[list], list], items: Sequence, sizes: Sequence[int]) -> List:
+        """
+        Executa fnc, que recebe uma lista de itens e retorna um resultado por item, dividindo os itens em partes
+        contíguas distribuídas entre os workers. Se uma parte falhar, o erro é o resultado de cada item dela.
+        """
+        total = sum(sizes)
+        if self.workers <= 0 or total < self.threshold:
+            return await self.run(total, fnc, list(items))
+
+        target = max(self.threshold, math.ceil(total / self.workers))
+        chunks, chunk, chunk_size = [], [], 0
+        for item, size in zip(items, sizes):
+            chunk.append(item)
+            chunk_size += size
+            if chunk_size >= target:
+                chunks.append((chunk, chunk_size))
+                chunk, chunk_size = [], 0
+        if chunk:
+            chunks.append((chunk, chunk_size))
+
+        parts = await asyncio.gather(*(self.run(size, fnc, chunk) for chunk, size in chunks), return_exceptions=True)
+
+        ret = []
+        for (chunk, _), part in zip(chunks, parts):
+            if isinstance(part, BaseException) and not isinstance(part, Exception):
+                raise part
+            ret.extend([part] * len(chunk) if isinstance(part, Exception) else part)
+        return ret
+
+    def metrics(self) -> ExecutorMetrics:
+        return ExecutorMetrics(self._inline, self._offloaded, self._queue_depth, self._max_queue_depth,
+                               self._wait_time_total, self._wait_time_max)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
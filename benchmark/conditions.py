@@ -0,0 +1,40 @@
+"""
+Corpus de condições de hooks usado pelos benchmarks dos engines de expressão.
+"""
+
+VARIABLES = {
+    "event": {
+        "event_name": "price_changed",
+        "schema_name": "price",
+        "domain_id": "1234567890",
+        "metadata": {"new_price": 30050, "old_price": 29990, "currency": "BRL", "discount": 0.15},
+    },
+    "domain": {
+        "domain_id": "1234567890",
+        "schema_name": "price",
+        "data": {"name": "Eggs", "price": 34.99, "stock": 120, "category": {"id": 7, "name": "food"}},
+        "tags": [["tenant-x"]],
+    },
+}
+
+
+def _deeply_nested(depth: int) -> str:
+    expression = "event.metadata.new_price > 100"
+    for idx in range(depth):
+        expression = f"({expression} and domain.data.stock > {idx})"
+    return expression
+
+
+def _many_paths(count: int) -> str:
+    paths = ["event.metadata.new_price", "event.metadata.old_price", "domain.data.price", "domain.data.stock",
+             "domain.data.category.id"]
+    return " or ".join(f"{paths[idx % len(paths)]} * {idx + 1} >= {idx * 1000}" for idx in range(count))
+
+
+CONDITIONS = {
+    "short": "event.metadata.new_price > 20000",
+    "equality": 'domain.data.name == "Eggs" and event.event_name == "price_changed"',
+    "arithmetic": "(event.metadata.new_price - event.metadata.old_price) / event.metadata.old_price * 100 > 0.1",
+    "deeply_nested": _deeply_nested(6),
+    "many_paths": _many_paths(24),
+}
@@ -0,0 +1,136 @@
+"""
+Benchmark dos engines de expressão disponíveis no expression_service.
+
+Uso:
+    python -m benchmark.expression_benchmark --save-baseline benchmark/baseline.json
+    python -m benchmark.expression_benchmark --baseline benchmark/baseline.json --threshold 0.3
+
+Com --baseline o processo termina com código 1 se a vazão (operações por segundo) de qualquer
+medição cair mais do que o threshold em relação ao baseline, e com código 2 se o arquivo de baseline não existir
+(a não ser com --allow-missing-baseline, que apenas ignora a comparação).
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+from typing import Dict
+
+import pyparsing as pp
+
+from app.service import expression_service
+from benchmark.conditions import CONDITIONS, VARIABLES
+
+DEFAULT_THRESHOLD = float(os.getenv('BENCHMARK_THRESHOLD', '0.3'))
+
+
+def _ops_per_second(fnc, repeat: int = 5) -> float:
+    timer = timeit.Timer(fnc)
+    number, _ = timer.autorange()
+    return number / min(timer.repeat(repeat=repeat, number=number))
+
+
+def _memory_per_condition(engine, expression: str, copies: int = 5) -> float:
+    module = expression_service.ENGINES[engine]
+    module.compile_expression(expression)
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    compiled = [module.compile_expression(expression) for _ in range(copies)]
+    # Descarta o cache packrat do pyparsing para medir apenas o que fica retido pela condição compilada.
+    pp.ParserElement.reset_cache()
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del compiled
+    return (after - before) / copies
+
+
+def measure(engine: str, expression: str) -> Dict[str, float]:
+    module = expression_service.ENGINES[engine]
+    compiled = module.compile_expression(expression)
+
+    def _cold():
+        expression_service.clear_cache()
+        expression_service.evaluate(expression, VARIABLES, engine=engine)
+
+    return {
+        "parse_ops": _ops_per_second(lambda: module.compile_expression(expression)),
+        "cold_eval_ops": _ops_per_second(_cold),
+        "warm_eval_ops": _ops_per_second(lambda: compiled.evaluate(VARIABLES)),
+        "cached_eval_ops": _ops_per_second(lambda: expression_service.evaluate(expression, VARIABLES, engine=engine)),
+        "bytes_per_condition": _memory_per_condition(engine, expression),
+    }
+
+
+def run() -> Dict[str, Dict[str, float]]:
+    results = {}
+    for engine in expression_service.ENGINES:
+        for name, expression in CONDITIONS.items():
+            results[f"{engine}/{name}"] = measure(engine, expression)
+    return results
+
+
+def find_regressions(results: dict, baseline: dict, threshold: float):
+    regressions = []
+    for key, metrics in results.items():
+        for metric, value in metrics.items():
+            expected = baseline.get(key, {}).get(metric)
+            if not expected or not metric.endswith('_ops'):
+                continue
+            if value < expected * (1 - threshold):
+                regressions.append((key, metric, expected, value))
+    return regressions
+
+
+def _print_results(results: dict):
+    header = f"{'engine/condition':<28}{'parse/s':>12}{'cold/s':>12}{'warm/s':>14}{'cached/s':>14}{'bytes':>10}"
+    print(header)
+    print('-' * len(header))
+    for key, metrics in results.items():
+        print(f"{key:<28}{metrics['parse_ops']:>12.0f}{metrics['cold_eval_ops']:>12.0f}"
+              f"{metrics['warm_eval_ops']:>14.0f}{metrics['cached_eval_ops']:>14.0f}"
+              f"{metrics['bytes_per_condition']:>10.0f}")
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--baseline', help='JSON file with previous results to compare against')
+    arg_parser.add_argument('--save-baseline', help='Write the results to this JSON file')
+    arg_parser.add_argument('--allow-missing-baseline', action='store_true',
+                            help='Skip the comparison instead of failing when the baseline file does not exist')
+    arg_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                            help='Maximum allowed throughput drop, as a fraction (default: %(default)s)')
+    args = arg_parser.parse_args(argv)
+
+    results = run()
+    _print_results(results)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    if not args.baseline:
+        return 0
+
+    if not os.path.exists(args.baseline):
+        if args.allow_missing_baseline:
+            print(f"Baseline {args.baseline} not found, skipping comparison")
+            return 0
+        print(f"Baseline {args.baseline} not found (create it with --save-baseline)", file=sys.stderr)
+        return 2
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+
+    regressions = find_regressions(results, baseline, args.threshold)
+    for key, metric, expected, value in regressions:
+        print(f"REGRESSION {key} {metric}: {value:.0f}/s < {expected:.0f}/s (threshold {args.threshold:.0%})")
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+Compara o casamento de hooks por grupo de tags (uma consulta por grupo, resultados concatenados) com a
+passagem única sem duplicados e com o índice invertido de tags (TagIndex) usado pela tabela de rotas,
+para domínios com muitos grupos de tags. As consultas ao banco são contadas por um repositório em memória.
+
+Uso:
+    python -m benchmark.hook_matching_benchmark --hooks 2000 --groups 1 4 16 64
+"""
+import argparse
+import random
+import sys
+import timeit
+from typing import List
+
+from app.domain.hook import Hook, OID
+from app.service.hook_routing import TagIndex, filter_by_tags
+
+TENANTS = [f"tenant-{idx}" for idx in range(200)]
+REGIONS = ["north", "south", "east", "west"]
+
+
+def _create_hooks(count: int) -> List[Hook]:
+    rnd = random.Random(42)
+    return [
+        Hook(id=OID(), schema_name='price', event_name='price_changed',
+             tags=[rnd.choice(TENANTS), *rnd.sample(REGIONS, rnd.randint(1, len(REGIONS)))])
+        for _ in range(count)
+    ]
+
+
+def _create_tag_groups(count: int) -> List[List[str]]:
+    rnd = random.Random(count)
+    tenants = rnd.sample(TENANTS, min(count, len(TENANTS)))
+    # Grupos do mesmo tenant em regiões diferentes, como em domínios publicados para várias regiões.
+    return [[tenants[idx // len(REGIONS) % len(tenants)], REGIONS[idx % len(REGIONS)]] for idx in range(count)]
+
+
+class _CountingRepository:
+    """
+    Substitui hook_repository.find_eligible_hooks, contando as consultas (round trips) feitas.
+    """
+
+    def __init__(self, hooks: List[Hook]):
+        self.hooks = hooks
+        self.finds = 0
+
+    def find_eligible_hooks(self, tags: List[List[str]]) -> List[Hook]:
+        self.finds += 1
+        return filter_by_tags(self.hooks, tags)
+
+
+def _per_group(repository: _CountingRepository, tags: List[List[str]]) -> List[Hook]:
+    result = []
+    for filter_tags in tags:
+        result.extend(repository.find_eligible_hooks([filter_tags]))
+    return result
+
+
+def _single_pass(repository: _CountingRepository, tags: List[List[str]]) -> List[Hook]:
+    return repository.find_eligible_hooks(tags)
+
+
+def _measure(fnc, hooks: List[Hook], tags: List[List[str]], number: int):
+    """
+    Consultas e hooks retornados em uma chamada e o tempo médio por chamada em microssegundos.
+    """
+    repository = _CountingRepository(hooks)
+    fan_out = len(fnc(repository, tags))
+    round_trips = repository.finds
+    elapsed = timeit.timeit(lambda: fnc(repository, tags), number=number) / number * 1e6
+    return round_trips, fan_out, elapsed
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--hooks', type=int, default=2000)
+    arg_parser.add_argument('--groups', type=int, nargs='+', default=[1, 4, 16, 64])
+    args = arg_parser.parse_args(argv)
+
+    hooks = _create_hooks(args.hooks)
+    tag_index = TagIndex(hooks)
+    header = f"{'groups':>8}{'round trips':>14}{'fan-out':>10}{'per group us':>15}" \
+             f"{'round trips':>14}{'fan-out':>10}{'single pass us':>17}{'tag index us':>15}"
+    print(header)
+    print('-' * len(header))
+
+    for groups in args.groups:
+        tags = _create_tag_groups(groups)
+        number = 20
+        per_group = _measure(_per_group, hooks, tags, number)
+        single_pass = _measure(_single_pass, hooks, tags, number)
+        indexed = timeit.timeit(lambda: tag_index.match(tags), number=number) / number * 1e6
+        print(f"{groups:>8}{per_group[0]:>14}{per_group[1]:>10}{per_group[2]:>15.0f}"
+              f"{single_pass[0]:>14}{single_pass[1]:>10}{single_pass[2]:>17.0f}{indexed:>15.0f}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
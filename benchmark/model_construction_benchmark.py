@@ -0,0 +1,99 @@
+"""
+Compara a montagem de eventos lidos do banco com validação completa do pydantic e pelo caminho confiável
+(construct) do repositório, em documentos de evento com hook e webhook aninhados como os gravados pela aplicação.
+Também mede o caminho de saída dos endpoints de listagem: a leitura confiável serializada pelo response_model do
+FastAPI (que valida os modelos de novo) e pelo json_response usado pelos endpoints.
+
+Uso:
+    python -m benchmark.model_construction_benchmark --events 200 --repeat 5
+"""
+import argparse
+import asyncio
+import sys
+import timeit
+from datetime import datetime, timezone
+from typing import List
+
+from bson import ObjectId
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from starlette.responses import JSONResponse
+
+from app.domain.domain import DomainEvent
+from app.repository.mapping import get_mapping
+from app.rest import utils
+
+
+def _create_documents(count: int) -> List[dict]:
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "_id": ObjectId(),
+            "event_name": "price_changed",
+            "schema_name": "price",
+            "domain_id": f"{idx:010d}",
+            "metadata": {"new_price": 30.0 + idx, "old_price": 29.9 + idx, "currency": "BRL"},
+            "status": "created",
+            "eta": now,
+            "failure_message": None,
+            "hook": {
+                "id": ObjectId(),
+                "type": "webhook",
+                "tags": ["tenant-x", "north"],
+                "schema_name": "price",
+                "event_name": "price_changed",
+                "condition": "event.metadata.new_price > 20",
+                "condition_info": {"normalized": "event.metadata.new_price > 20",
+                                   "paths": ["event.metadata.new_price"], "always_true": False},
+                "webhook": {"callback_url": "https://example.com/hooks/price", "delay_time": 0,
+                            "http_headers": {"Authorization": "Bearer abc"}, "timeout": 3, "max_retries": 3,
+                            "attempts": 0},
+                "queue_name": "default",
+            },
+        }
+        for idx in range(count)
+    ]
+
+
+def _response_model_body(field, events: List[DomainEvent]) -> bytes:
+    return JSONResponse(asyncio.run(serialize_response(field=field, response_content=events))).body
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--events', type=int, nargs='+', default=[1, 200, 2000])
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    args = arg_parser.parse_args(argv)
+
+    mapping = get_mapping(DomainEvent)
+    field = create_response_field(name='response', type_=List[DomainEvent])
+    header = f"{'events':>8}{'validated ms':>15}{'trusted ms':>13}{'speedup':>10}" \
+             f"{'response_model ms':>20}{'json_response ms':>19}{'speedup':>10}"
+    print(header)
+    print('-' * len(header))
+
+    for count in args.events:
+        documents = _create_documents(count)
+        assert [mapping.from_document(doc, trusted=True) for doc in documents] == \
+               [mapping.from_document(doc) for doc in documents]
+
+        validated = min(timeit.repeat(lambda: [mapping.from_document(doc) for doc in documents],
+                                      number=1, repeat=args.repeat)) * 1e3
+        trusted = min(timeit.repeat(lambda: [mapping.from_document(doc, trusted=True) for doc in documents],
+                                    number=1, repeat=args.repeat)) * 1e3
+
+        events = [mapping.from_document(doc, trusted=True) for doc in documents]
+        assert _response_model_body(field, events) == utils.json_response(events).body
+
+        response_model = min(timeit.repeat(lambda: _response_model_body(field, events),
+                                           number=1, repeat=args.repeat)) * 1e3
+        json_response = min(timeit.repeat(lambda: utils.json_response(events).body,
+                                          number=1, repeat=args.repeat)) * 1e3
+        print(f"{count:>8}{validated:>15.2f}{trusted:>13.2f}{validated / trusted:>9.1f}x"
+              f"{response_model:>20.2f}{json_response:>19.2f}{response_model / json_response:>9.1f}x")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""
+Compara a validação do Domain.data pelo validador do jsonschema (já compilado pelo registro de schemas) com o
+validador de código gerado, em schemas largos como os de domínios com muitos atributos.
+
+Uso:
+    python -m benchmark.schema_validation_benchmark --properties 10 50 200 --domains 500 --repeat 5
+"""
+import argparse
+import sys
+import timeit
+from typing import List
+
+from app.service.schema_registry import CompiledSchema
+
+PROPERTY_SCHEMAS = [
+    {"type": "number", "minimum": 0},
+    {"type": "string", "maxLength": 64},
+    {"type": "integer", "minimum": 0, "maximum": 1000},
+    {"type": "boolean"},
+    {"type": "array", "items": {"type": "string"}, "maxItems": 10},
+    {"type": "object", "properties": {"currency": {"enum": ["BRL", "USD"]}, "amount": {"type": "number"}},
+     "required": ["currency"]},
+]
+PROPERTY_VALUES = [34.99, "Eggs", 12, True, ["tenant-x", "north"], {"currency": "BRL", "amount": 9.99}]
+
+
+def _create_schema(properties: int) -> dict:
+    return {
+        "type": "object",
+        "properties": {f"attr_{idx}": PROPERTY_SCHEMAS[idx % len(PROPERTY_SCHEMAS)] for idx in range(properties)},
+        "required": [f"attr_{idx}" for idx in range(0, properties, 2)],
+        "additionalProperties": False,
+    }
+
+
+def _create_domains(properties: int, count: int) -> List[dict]:
+    return [
+        {f"attr_{idx}": PROPERTY_VALUES[idx % len(PROPERTY_VALUES)] for idx in range(properties)}
+        for _ in range(count)
+    ]
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--properties', type=int, nargs='+', default=[10, 50, 200])
+    arg_parser.add_argument('--domains', type=int, default=500)
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    args = arg_parser.parse_args(argv)
+
+    header = f"{'properties':>11}{'jsonschema ms':>16}{'codegen ms':>13}{'speedup':>10}"
+    print(header)
+    print('-' * len(header))
+
+    for properties in args.properties:
+        schema = _create_schema(properties)
+        domains = _create_domains(properties, args.domains)
+        interpreted = CompiledSchema('bench', None, schema)
+        generated = CompiledSchema('bench', None, schema, validator='codegen')
+        assert generated.generated
+
+        def _validate(compiled: CompiledSchema):
+            for domain in domains:
+                compiled.validate(domain)
+
+        interpreted_ms = min(timeit.repeat(lambda: _validate(interpreted), number=1, repeat=args.repeat)) * 1e3
+        generated_ms = min(timeit.repeat(lambda: _validate(generated), number=1, repeat=args.repeat)) * 1e3
+        print(f"{properties:>11}{interpreted_ms:>16.2f}{generated_ms:>13.2f}{interpreted_ms / generated_ms:>9.1f}x")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,71 @@
+from typing import Any, NamedTuple
+
+import pytest
 import pytest_asyncio
 
+from app.repository import base_repository, event_respository, hook_repository
+from app.repository.mongo import database
 from app.repository.mongo.database import mongo_client, default_database
+from app.service import hook_service, schema_service
+
+COMMAND_METHODS = ('find', 'find_one', 'find_one_and_update', 'find_one_and_replace', 'find_one_and_delete',
+                   'count_documents', 'insert_one', 'insert_many', 'update_one', 'update_many', 'delete_one',
+                   'delete_many', 'bulk_write', 'aggregate')
+
+
+class MongoCommand(NamedTuple):
+    collection: Any
+    method: str
+    args: tuple
+
+
+class _RecordingCollection:
+    """
+    Repassa as chamadas para a coleção real e registra cada comando enviado ao Mongo.
+    """
+
+    def __init__(self, collection, commands):
+        self._collection = collection
+        self._commands = commands
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+
+        if name not in COMMAND_METHODS:
+            return attr
+
+        def _record(*args, **kwargs):
+            self._commands.append(MongoCommand(self._collection, name, args))
+            return attr(*args, **kwargs)
+
+        return _record
+
+
+class _RecordingDatabase:
+    def __init__(self, db, commands):
+        self._db = db
+        self._commands = commands
+
+    def __getitem__(self, name):
+        return _RecordingCollection(self._db[name], self._commands)
+
+    def __getattr__(self, name):
+        return getattr(self._db, name)
 
 
 @pytest_asyncio.fixture(autouse=True)
 async def before_all():
     await mongo_client.drop_database(default_database)
+    hook_service.clear_cache()
+    schema_service.clear_cache()
+
+
+@pytest.fixture
+def mongo_commands(monkeypatch):
+    commands = []
+    recording_db = _RecordingDatabase(default_database, commands)
+
+    for module in (base_repository, event_respository, hook_repository, database):
+        monkeypatch.setattr(module, 'default_database', recording_db)
+
+    return commands
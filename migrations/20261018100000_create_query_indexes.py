@@ -0,0 +1,33 @@
+import pymongo
+from mongodb_migrations.base import BaseMigration
+
+
+class Migration(BaseMigration):
+    def upgrade(self):
+        self.db.hook.create_index(
+            [("schema_name", pymongo.ASCENDING),
+             ("event_name", pymongo.ASCENDING),
+             ("tags", pymongo.ASCENDING)],
+            name="idx_schema_event_tags"
+        )
+        self.db.hook.create_index(
+            [("type", pymongo.ASCENDING)],
+            name="idx_type"
+        )
+
+        self.db.domain_event.create_index(
+            [("status", pymongo.ASCENDING),
+             ("eta", pymongo.ASCENDING)],
+            name="idx_status_eta"
+        )
+        self.db.domain_event.create_index(
+            [("schema_name", pymongo.ASCENDING),
+             ("event_name", pymongo.ASCENDING)],
+            name="idx_schema_event"
+        )
+
+    def downgrade(self):
+        self.db.hook.drop_index("idx_schema_event_tags")
+        self.db.hook.drop_index("idx_type")
+        self.db.domain_event.drop_index("idx_status_eta")
+        self.db.domain_event.drop_index("idx_schema_event")
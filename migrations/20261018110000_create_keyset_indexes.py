@@ -0,0 +1,14 @@
+import pymongo
+from mongodb_migrations.base import BaseMigration
+
+
+class Migration(BaseMigration):
+    def upgrade(self):
+        self.db.domain_event.create_index(
+            [("schema_name", pymongo.ASCENDING),
+             ("_id", pymongo.ASCENDING)],
+            name="idx_schema_id"
+        )
+
+    def downgrade(self):
+        self.db.domain_event.drop_index("idx_schema_id")
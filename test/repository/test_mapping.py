@@ -0,0 +1,123 @@
+from typing import Optional
+
+import pytest
+from bson import ObjectId
+
+from app.domain.hook import Hook, HookBaseDomain, HookCondition, HookType, OID, Webhook
+from app.repository.exceptions import RepositoryException
+from app.repository.mapping import get_mapping
+
+
+class Product(HookBaseDomain):
+    id: Optional[OID]
+    name: Optional[str]
+    price: Optional[float]
+
+    class Meta:
+        collection_name: str = "product"
+        key = ('id',)
+
+
+class Price(HookBaseDomain):
+    schema_name: Optional[str]
+    domain_id: Optional[str]
+    value: Optional[float]
+
+    class Meta:
+        collection_name: str = "price"
+        key = ('schema_name', 'domain_id',)
+
+
+def test_mapping_is_computed_once_per_class():
+    mapping = get_mapping(Product)
+
+    assert get_mapping(Product(name='Eggs')) is mapping
+    assert mapping.collection_name == 'product'
+    assert mapping.key == ('id',)
+    assert mapping.oid_fields == {'id'}
+    assert get_mapping(Price).oid_fields == frozenset()
+
+
+def test_split_key_and_values():
+    product_id = ObjectId()
+
+    key_filter, values = get_mapping(Product).split_key_and_values(Product(id=str(product_id), name='Eggs'))
+    assert key_filter == {'_id': product_id}
+    assert values == {'name': 'Eggs', 'price': None}
+
+    key_filter, values = get_mapping(Price).split_key_and_values(
+        Price(schema_name='price', domain_id='1', value=2.5), {'exclude_unset': True})
+    assert list(key_filter.items()) == [('schema_name', 'price'), ('domain_id', '1')]
+    assert values == {'value': 2.5}
+
+    with pytest.raises(RepositoryException):
+        get_mapping(Price).split_key_and_values(Price(schema_name='price'))
+
+
+def test_document_round_trip():
+    mapping = get_mapping(Product)
+    product = Product(id=ObjectId(), name='Eggs', price=34.99)
+
+    document = mapping.to_document(product)
+    assert document == {'_id': product.id, 'name': 'Eggs', 'price': 34.99}
+
+    loaded = mapping.from_document(document)
+    assert loaded == product
+    assert loaded.id is product.id
+
+
+def test_trusted_read_matches_validated_read():
+    document = {
+        '_id': ObjectId(),
+        'type': 'webhook',
+        'tags': ['tenant-x'],
+        'schema_name': 'price',
+        'event_name': 'price_changed',
+        'condition_info': {'normalized': 'true', 'paths': [], 'always_true': True},
+        'webhook': {'callback_url': 'https://example.com/', 'delay_time': 0, 'http_headers': None},
+        'created_at': '2022-09-17T00:00:00',
+    }
+    mapping = get_mapping(Hook)
+
+    trusted = mapping.from_document(document, trusted=True)
+    validated = mapping.from_document(document)
+
+    assert trusted == validated
+    assert trusted.type is HookType.WEBHOOK
+    assert isinstance(trusted.webhook, Webhook) and trusted.webhook.max_retries == 3
+    assert isinstance(trusted.condition_info, HookCondition)
+    assert not hasattr(trusted, 'created_at')
+
+
+def test_keyset_pagination():
+    product_id = ObjectId()
+    assert get_mapping(Product).cursor_of(Product(id=product_id, name='Eggs')) == {'_id': product_id}
+    assert get_mapping(Product).keyset_filter({'_id': product_id}) == {'_id': {'$gt': product_id}}
+
+    mapping = get_mapping(Price)
+    after = mapping.cursor_of(Price(schema_name='price', domain_id='1', value=2.5))
+    assert after == {'schema_name': 'price', 'domain_id': '1'}
+    assert mapping.keyset_filter(after) == {'$or': [
+        {'schema_name': {'$gt': 'price'}},
+        {'schema_name': 'price', 'domain_id': {'$gt': '1'}},
+    ]}
+
+    with pytest.raises(RepositoryException):
+        mapping.keyset_filter({'_id': product_id})
+
+
+def test_projection():
+    mapping = get_mapping(Price)
+
+    partial_cls, projection = mapping.projection(['value'])
+    assert projection == {'schema_name': 1, 'domain_id': 1, 'value': 1}
+    assert list(partial_cls.__fields__) == ['schema_name', 'domain_id', 'value']
+    assert mapping.projection(('value', 'domain_id')) == (partial_cls, projection)
+
+    partial = get_mapping(partial_cls).from_document({'_id': ObjectId(), 'schema_name': 'price', 'domain_id': '1'})
+    assert partial.dict() == {'schema_name': 'price', 'domain_id': '1', 'value': None}
+    assert get_mapping(partial_cls).cursor_of(partial) == {'schema_name': 'price', 'domain_id': '1'}
+
+    partial_cls, projection = get_mapping(Product).projection(['name'])
+    assert projection == {'_id': 1, 'name': 1}
+    assert list(partial_cls.__fields__) == ['id', 'name']
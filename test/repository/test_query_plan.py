@@ -0,0 +1,118 @@
+import importlib.util
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from app.config.app import settings
+from app.domain.domain import Domain, DomainEvent, DomainEventStatus, DomainSchema
+from app.domain.hook import Hook, HookType
+from app.repository import base_repository, event_respository, hook_repository
+
+MIGRATIONS_PATH = Path(__file__).parents[2] / 'migrations'
+QUERY_METHODS = ('find', 'find_one', 'find_one_and_update', 'find_one_and_replace', 'find_one_and_delete',
+                 'count_documents')
+
+
+def _run_migrations():
+    for file in sorted(MIGRATIONS_PATH.glob('[0-9]*.py')):
+        spec = importlib.util.spec_from_file_location(file.stem, file)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        module.Migration(url=settings.mongo.connection_uri).upgrade()
+
+
+def _plan_stages(plan):
+    if isinstance(plan, dict):
+        if 'stage' in plan:
+            yield plan['stage']
+        for value in plan.values():
+            yield from _plan_stages(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from _plan_stages(value)
+
+
+@pytest.fixture
+def queries(mongo_commands):
+    _run_migrations()
+    return mongo_commands
+
+
+async def _assert_no_collscan(queries):
+    queries = [command for command in queries if command.method in QUERY_METHODS]
+    assert queries
+
+    for collection, method, args in queries:
+        query_filter = args[0] if args else {}
+        explain = await collection.find(query_filter).explain()
+        stages = set(_plan_stages(explain['queryPlanner']['winningPlan']))
+        assert 'COLLSCAN' not in stages, f'{collection.name}.{method}({query_filter}) -> {stages}'
+
+
+@pytest.mark.asyncio
+async def test_base_repository_queries(queries):
+    await base_repository.create(DomainSchema(name='price'))
+    await base_repository.find_by_key(DomainSchema(name='price'), DomainSchema)
+    await base_repository.find_by_example(DomainSchema(name='price'), DomainSchema)
+    await base_repository.find_by_keys([DomainSchema(name='price'), DomainSchema(name='stock')], DomainSchema)
+    await base_repository.delete_by_key(DomainSchema(name='price'), DomainSchema)
+
+    domain = Domain(schema_name='price', domain_id='1234567890', data={'price': 34.99})
+    await base_repository.create(domain)
+    await base_repository.upsert(domain)
+    await base_repository.replace(domain)
+    await base_repository.update(Domain(schema_name='price', domain_id='1234567890', data={'price': 9.99}))
+    await base_repository.find_first_by_key(domain, Domain)
+    await base_repository.find_by_example(Domain(schema_name='price', domain_id='1234567890'), Domain)
+    await base_repository.find_by_keys([domain, Domain(schema_name='price', domain_id='999')], Domain)
+    await base_repository.find_by_keys([domain, Domain(schema_name='stock', domain_id='999')], Domain)
+    await base_repository.find_by_example(Domain(schema_name='price'), Domain, limit=2,
+                                          after={'schema_name': 'price', 'domain_id': '1234567890'})
+    await base_repository.delete_by_key(domain, Domain)
+
+    hook = await base_repository.create(Hook(type=HookType.QUEUE, schema_name='price', event_name='price_changed',
+                                             queue_name='prices', tags=['tenant-x']))
+    await base_repository.find_by_example(Hook(type=HookType.QUEUE), Hook, limit=0)
+    await base_repository.find_by_example(Hook(schema_name='price', event_name='price_changed'), Hook, limit=0)
+    [hook async for hook in base_repository.iter_by_example(Hook(type=HookType.QUEUE), Hook)]
+    await base_repository.delete_by_key(Hook(id=hook.id), Hook)
+
+    await _assert_no_collscan(queries)
+
+
+@pytest.mark.asyncio
+async def test_event_repository_queries(queries):
+    events = await event_respository.create_events([
+        DomainEvent(schema_name='price', event_name='price_changed', domain_id='1234567890',
+                    status=DomainEventStatus.CREATED, eta=datetime.utcnow(),
+                    hook=Hook(type=HookType.QUEUE, queue_name='prices'))
+    ])
+    event = events[0]
+
+    await event_respository.find_pending_events(datetime.utcnow())
+    await event_respository.get_event_and_mark_processing(str(event.id))
+    await event_respository.find_events('price')
+    await event_respository.find_events('price', event_id=event.id)
+    await event_respository.find_events('price', event_name='price_changed')
+    await event_respository.find_events('price', queue_name='prices')
+    await event_respository.find_events('price', event.id, 'price_changed', 'prices')
+    await event_respository.find_events('price', after={'_id': event.id})
+    [evt async for evt in event_respository.iter_events('price', event_name='price_changed')]
+
+    await base_repository.find_first_by_key(DomainEvent(id=event.id), DomainEvent)
+    await base_repository.update(DomainEvent(id=event.id, status=DomainEventStatus.PROCESSED), DomainEvent)
+
+    await _assert_no_collscan(queries)
+
+
+@pytest.mark.asyncio
+async def test_hook_repository_queries(queries):
+    await base_repository.create(Hook(type=HookType.QUEUE, schema_name='price', event_name='price_changed',
+                                      queue_name='prices', tags=['tenant-x']))
+
+    await hook_repository.find_eligible_hooks('price', 'price_changed', [])
+    await hook_repository.find_eligible_hooks('price', 'price_changed', [['tenant-x']])
+    await hook_repository.find_eligible_hooks('price', 'price_changed', [['tenant-x'], ['tenant-y', 'us']])
+
+    await _assert_no_collscan(queries)
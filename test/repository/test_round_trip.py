@@ -0,0 +1,111 @@
+from starlette.testclient import TestClient
+
+from api import app
+
+client = TestClient(app)
+
+SCHEMA = {
+    "name": "price",
+    "domain_schema": {
+        "type": "object",
+        "properties": {
+            "price": {"type": "number"},
+            "name": {"type": "string"}
+        }
+    }
+}
+DOMAIN = {
+    "domain_id": "1234567890",
+    "data": {"name": "Eggs", "price": 34.99},
+    "tags": [["tenant-x"]]
+}
+HOOK = {
+    "type": "queue",
+    "schema_name": "price",
+    "event_name": "price_changed",
+    "queue_name": "price_changed",
+    "tags": ["tenant-x"]
+}
+EVENT = {
+    "event_name": "price_changed",
+    "metadata": {"new_price": 99.90}
+}
+
+
+def _commands(mongo_commands):
+    ret = [(command.collection.name, command.method) for command in mongo_commands]
+    mongo_commands.clear()
+    return ret
+
+
+def test_upsert_round_trips(mongo_commands):
+    ret = client.post('/api/v1/schemas', json=SCHEMA)
+    assert ret.status_code == 201
+    assert _commands(mongo_commands) == [('domain_schema', 'find_one_and_update')]
+
+    ret = client.post('/api/v1/schemas', json=SCHEMA)
+    assert ret.status_code == 201
+    assert _commands(mongo_commands) == [('domain_schema', 'find_one_and_update')]
+    assert ret.json().get('name') == 'price'
+
+
+def test_create_domain_round_trips(mongo_commands):
+    client.post('/api/v1/schemas', json=SCHEMA)
+    _commands(mongo_commands)
+
+    ret = client.post('/api/v1/schemas/price/domains', json=DOMAIN)
+    assert ret.status_code == 201
+    assert _commands(mongo_commands) == [('domain_schema', 'find_one'), ('domain', 'insert_one')]
+
+    # Com o schema compilado em memória, o domínio seguinte não consulta a coleção de schemas.
+    ret = client.post('/api/v1/schemas/price/domains', json={**DOMAIN, "domain_id": "999"})
+    assert ret.status_code == 201
+    assert _commands(mongo_commands) == [('domain', 'insert_one')]
+
+    # Alterar o schema invalida o validador compilado.
+    client.post('/api/v1/schemas', json=SCHEMA)
+    _commands(mongo_commands)
+    client.post('/api/v1/schemas/price/domains', json={**DOMAIN, "domain_id": "888"})
+    assert _commands(mongo_commands) == [('domain_schema', 'find_one'), ('domain', 'insert_one')]
+
+
+def test_insert_event_round_trips(mongo_commands):
+    client.post('/api/v1/schemas', json=SCHEMA)
+    client.post('/api/v1/schemas/price/domains', json=DOMAIN)
+    client.post('/api/v1/hooks', json=HOOK)
+    _commands(mongo_commands)
+
+    ret = client.post('/api/v1/schemas/price/domains/1234567890/events', json=EVENT)
+    assert ret.status_code == 201
+    assert len(ret.json()) == 1
+    assert _commands(mongo_commands) == [('domain', 'find_one'), ('hook', 'find'), ('domain_event', 'insert_many')]
+
+    # Com a rota de hooks em memória, o evento seguinte não consulta a coleção de hooks.
+    ret = client.post('/api/v1/schemas/price/domains/1234567890/events', json=EVENT)
+    assert ret.status_code == 201
+    assert _commands(mongo_commands) == [('domain', 'find_one'), ('domain_event', 'insert_many')]
+
+
+def test_bulk_domains_round_trips(mongo_commands):
+    client.post('/api/v1/schemas', json=SCHEMA)
+    _commands(mongo_commands)
+
+    ret = client.post('/api/v1/schemas/price/domains/bulk', json={"domains": [
+        {**DOMAIN, "domain_id": str(idx)} for idx in range(100)]})
+    assert ret.status_code == 200
+    assert _commands(mongo_commands) == [('domain_schema', 'find'), ('domain', 'bulk_write')]
+
+
+def test_patch_domain_round_trips(mongo_commands):
+    client.post('/api/v1/schemas', json=SCHEMA)
+    client.post('/api/v1/schemas/price/domains', json=DOMAIN)
+    client.post('/api/v1/hooks', json=HOOK)
+    _commands(mongo_commands)
+
+    ret = client.patch('/api/v1/schemas/price/domains/1234567890', json={
+        "data": {"price": 29.99}, "event_name": "price_changed"})
+    assert ret.status_code == 200
+    assert len(ret.json()['events']) == 1
+    assert _commands(mongo_commands) == [
+        ('domain', 'find_one'), ('domain', 'find_one_and_update'), ('hook', 'find'), ('domain_event', 'insert_many')
+    ]
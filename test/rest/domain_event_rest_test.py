@@ -1,3 +1,5 @@
+import json
+
 import pytest
 from starlette.testclient import TestClient
 
@@ -39,17 +41,19 @@ def _setup():
     assert ret.status_code == 201
 
 
-def _setup_hook(queue_name='price_changed'):
+def _setup_hook(queue_name='price_changed', condition=None, tags=None):
     payload = {
         "type": "queue",
         "schema_name": "price",
         "event_name": "price_changed",
         "queue_name": queue_name,
-        "tags": ["tenant-x"]
+        "condition": condition,
+        "tags": tags or ["tenant-x"]
     }
 
     ret = client.post('/api/v1/hooks', json=payload)
     assert ret.status_code == 201
+    return ret.json()
 
 
 def test_crud_create_event():
@@ -98,6 +102,56 @@ def test_crud_create_event():
     assert all(map(lambda x: x.get('hook').get('queue_name') in ('price_changed', 'new_queue_changed'), ret_json))
 
 
+def test_conditional_hooks():
+    _setup()
+    _setup_hook('expensive', 'event.metadata.new_price > 100')
+    _setup_hook('eggs', 'domain.data.name == "Eggs" and event.metadata.new_price <= 100')
+    _setup_hook('computed', 'event.metadata.new_price * 2 > 150')
+    hook = _setup_hook('deleted', 'event.metadata.new_price > 0')
+
+    ret = client.delete(f'/api/v1/hooks/{hook.get("id")}')
+    assert ret.status_code == 202
+
+    payload = {
+        "event_name": "price_changed",
+        "metadata": {
+            "new_price": 99.90
+        }
+    }
+
+    ret = client.post('/api/v1/schemas/price/domains/1234567890/events', json=payload)
+    assert ret.status_code == 201
+    assert sorted(evt.get('hook').get('queue_name') for evt in ret.json()) == ['computed', 'eggs']
+
+    payload["metadata"]["new_price"] = 150
+    ret = client.post('/api/v1/schemas/price/domains/1234567890/events', json=payload)
+    assert ret.status_code == 201
+    assert sorted(evt.get('hook').get('queue_name') for evt in ret.json()) == ['computed', 'expensive']
+
+
+def test_hooks_matching_many_tag_groups():
+    _setup()
+    _setup_hook('both', tags=['tenant-x', 'tenant-y'])
+    _setup_hook('tenant_y', tags=['tenant-y'])
+    _setup_hook('tenant_z', tags=['tenant-z'])
+
+    payload = {
+        "domain_id": "999",
+        "data": {"name": "Milk", "price": 4.99},
+        "tags": [["tenant-x"], ["tenant-y"]]
+    }
+    ret = client.post('/api/v1/schemas/price/domains', json=payload)
+    assert ret.status_code == 201
+
+    payload = {
+        "event_name": "price_changed",
+        "metadata": {"new_price": 5.99}
+    }
+    ret = client.post('/api/v1/schemas/price/domains/999/events', json=payload)
+    assert ret.status_code == 201
+    assert sorted(evt.get('hook').get('queue_name') for evt in ret.json()) == ['both', 'tenant_y']
+
+
 def test_invalid_payload():
     payload = {
         "abc": "price",
@@ -142,3 +196,150 @@ def test_queue_consumption():
 
     with pytest.raises(ValidationException):
         client.patch(f'/api/v1/schemas/price/events/{ret_json[0].get("id")}', json=payload)
+
+
+def test_bulk_events():
+    _setup()
+    _setup_hook()
+    _setup_hook('cheap', condition='event.metadata.new_price < 10')
+
+    payload = {
+        "domain_id": "999",
+        "data": {"name": "Milk", "price": 4.99},
+        "tags": [["tenant-x"]]
+    }
+    ret = client.post('/api/v1/schemas/price/domains', json=payload)
+    assert ret.status_code == 201
+
+    payload = {
+        "events": [
+            {"schema_name": "price", "domain_id": "1234567890", "event_name": "price_changed",
+             "metadata": {"new_price": 99.90}},
+            {"schema_name": "price", "domain_id": "999", "event_name": "price_changed",
+             "metadata": {"new_price": 5.99}},
+            {"schema_name": "price", "domain_id": "unknown", "event_name": "price_changed",
+             "metadata": {"new_price": 5.99}},
+            {"schema_name": "unknown", "domain_id": "999", "event_name": "price_changed",
+             "metadata": {"new_price": 5.99}},
+        ]
+    }
+    ret = client.post('/api/v1/events/bulk', json=payload)
+    assert ret.status_code == 200
+    ret_json = ret.json()
+
+    assert [item.get('index') for item in ret_json] == [0, 1, 2, 3]
+    assert [evt.get('hook').get('queue_name') for evt in ret_json[0].get('events')] == ['price_changed']
+    assert sorted(evt.get('hook').get('queue_name') for evt in ret_json[1].get('events')) == ['cheap', 'price_changed']
+    assert ret_json[2].get('events') == [] and ret_json[2].get('error')
+    assert ret_json[3].get('events') == [] and ret_json[3].get('error')
+    assert ret_json[0].get('error') is None
+
+    ret = client.get('/api/v1/schemas/price/events?event_name=price_changed')
+    assert ret.status_code == 200
+    assert len(ret.json()) == 3
+
+
+def test_bulk_events_condition_on_null_field():
+    _setup()
+    _setup_hook()
+    _setup_hook('doubled', condition='domain.data.price * 2 > 1')
+
+    ret = client.post('/api/v1/schemas/price/domains', json={"domain_id": "999", "data": {"name": "Milk"},
+                                                              "tags": [["tenant-x"]]})
+    assert ret.status_code == 201
+
+    ret = client.post('/api/v1/events/bulk', json={"events": [
+        {"schema_name": "price", "domain_id": "1234567890", "event_name": "price_changed", "metadata": {}},
+        {"schema_name": "price", "domain_id": "999", "event_name": "price_changed", "metadata": {}},
+    ]})
+    assert ret.status_code == 200
+    ret_json = ret.json()
+
+    assert sorted(evt.get('hook').get('queue_name') for evt in ret_json[0].get('events')) == \
+           ['doubled', 'price_changed']
+    assert ret_json[0].get('error') is None
+    # O erro da condição sobre o preço nulo fica somente no segundo item.
+    assert ret_json[1].get('events') == [] and ret_json[1].get('error')
+
+
+def test_bulk_events_invalid_payload():
+    ret = client.post('/api/v1/events/bulk', json={"events": []})
+    assert ret.status_code == 422
+
+
+def test_events_cursor_pagination():
+    _setup()
+    _setup_hook()
+
+    payload = {
+        "event_name": "price_changed",
+        "metadata": {"new_price": 99.90}
+    }
+    created = []
+    for _ in range(3):
+        ret = client.post('/api/v1/schemas/price/domains/1234567890/events', json=payload)
+        assert ret.status_code == 201
+        created.extend(evt.get('id') for evt in ret.json())
+
+    ret = client.get('/api/v1/schemas/price/events', params={"per_page": 2})
+    assert ret.status_code == 200
+    assert [evt.get('id') for evt in ret.json()] == created[:2]
+    cursor = ret.headers.get('X-Next-Cursor')
+    assert cursor
+
+    # Eventos gravados depois não deslocam a página seguinte.
+    ret = client.post('/api/v1/schemas/price/domains/1234567890/events', json=payload)
+    created.extend(evt.get('id') for evt in ret.json())
+
+    ret = client.get('/api/v1/schemas/price/events', params={"per_page": 2, "cursor": cursor})
+    assert ret.status_code == 200
+    assert [evt.get('id') for evt in ret.json()] == created[2:4]
+
+
+def test_events_ndjson_stream():
+    _setup()
+    _setup_hook()
+
+    payload = {
+        "event_name": "price_changed",
+        "metadata": {"new_price": 99.90}
+    }
+    for _ in range(3):
+        ret = client.post('/api/v1/schemas/price/domains/1234567890/events', json=payload)
+        assert ret.status_code == 201
+
+    ret = client.get('/api/v1/schemas/price/events')
+    events = ret.json()
+
+    ret = client.get('/api/v1/schemas/price/events', headers={"Accept": "application/x-ndjson"})
+    assert ret.status_code == 200
+    assert ret.headers['content-type'].startswith('application/x-ndjson')
+
+    lines = [json.loads(line) for line in ret.text.splitlines()]
+    assert [line.get('id') for line in lines] == [evt.get('id') for evt in events]
+    assert lines[0].get('hook').get('queue_name') == 'price_changed'
+
+
+def test_events_fields_projection():
+    _setup()
+    _setup_hook()
+
+    payload = {
+        "event_name": "price_changed",
+        "metadata": {"new_price": 99.90}
+    }
+    ret = client.post('/api/v1/schemas/price/domains/1234567890/events', json=payload)
+    assert ret.status_code == 201
+    event_id = ret.json()[0].get('id')
+
+    ret = client.get('/api/v1/schemas/price/events', params={"fields": "event_name,domain_id"})
+    assert ret.status_code == 200
+    assert ret.json() == [{"id": event_id, "event_name": "price_changed", "domain_id": "1234567890"}]
+
+    ret = client.get('/api/v1/schemas/price/events', params={"fields": "event_name"},
+                     headers={"Accept": "application/x-ndjson"})
+    assert ret.status_code == 200
+    assert [json.loads(line) for line in ret.text.splitlines()] == [{"id": event_id, "event_name": "price_changed"}]
+
+    with pytest.raises(ValidationException):
+        client.get('/api/v1/schemas/price/events', params={"fields": "event_name,password"})
@@ -1,6 +1,12 @@
+import json
+
+import pytest
 from starlette.testclient import TestClient
 
 from api import app
+from app.repository import base_repository
+from app.service import domain_service
+from app.service.exceptions import ValidationException, ConflictException
 
 client = TestClient(app)
 
@@ -73,3 +79,162 @@ def test_invalid_payload():
 
     ret = client.post('/api/v1/schemas/price/domains', json=payload)
     assert ret.status_code == 422
+
+
+def test_cursor_pagination():
+    payload = {
+        "name": "price",
+        "domain_schema": {"type": "object", "properties": {"price": {"type": "number"}}}
+    }
+    ret = client.post('/api/v1/schemas', json=payload)
+    assert ret.status_code == 201
+
+    for domain_id in ('3', '1', '5', '2', '4'):
+        ret = client.post('/api/v1/schemas/price/domains',
+                          json={"domain_id": domain_id, "data": {"price": 1}, "tags": [["tenant-x"]]})
+        assert ret.status_code == 201
+
+    pages, cursor = [], None
+    while True:
+        ret = client.get('/api/v1/schemas/price/domains', params={"per_page": 2, "cursor": cursor})
+        assert ret.status_code == 200
+        pages.append([domain.get('domain_id') for domain in ret.json()])
+        cursor = ret.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+
+    assert pages == [['1', '2'], ['3', '4'], ['5']]
+
+    with pytest.raises(ValidationException):
+        client.get('/api/v1/schemas/price/domains', params={"cursor": "not-a-cursor"})
+
+
+def test_bulk_domains():
+    ret = client.post('/api/v1/schemas', json={
+        "name": "price",
+        "domain_schema": {"type": "object", "properties": {"price": {"type": "number"}}}
+    })
+    assert ret.status_code == 201
+    client.post('/api/v1/schemas/price/domains', json={"domain_id": "1", "data": {"price": 1}, "tags": None})
+
+    ret = client.post('/api/v1/schemas/price/domains/bulk', json={"domains": [
+        {"domain_id": "1", "data": {"price": 10}, "tags": None},
+        {"domain_id": "2", "data": {"price": "20"}, "tags": None},
+        {"domain_id": "3", "data": {"price": 30}, "tags": [["tenant-x"]]},
+    ]})
+    assert ret.status_code == 200
+    assert [(item['index'], item['domain_id'], item['created']) for item in ret.json()] == [
+        (0, '1', False), (1, '2', None), (2, '3', True)]
+    assert ret.json()[1]['error'] == 'Domain has a invalid schema: price'
+
+    ret = client.get('/api/v1/schemas/price/domains')
+    assert [(domain['domain_id'], domain['data']) for domain in ret.json()] == [
+        ('1', {'price': 10}), ('3', {'price': 30})]
+
+    ret = client.post('/api/v1/schemas/stock/domains/bulk', json={"domains": [
+        {"domain_id": "1", "data": {}, "tags": None}]})
+    assert ret.json()[0]['error'] == 'Schema not found: stock'
+
+
+def test_import_domains():
+    client.post('/api/v1/schemas', json={
+        "name": "price",
+        "domain_schema": {"type": "object", "properties": {"price": {"type": "number"}}}
+    })
+    client.post('/api/v1/schemas/price/domains', json={"domain_id": "1", "data": {"price": 1}, "tags": None})
+
+    lines = [
+        json.dumps({"domain_id": "1", "data": {"price": 10}, "tags": None}),
+        '{"domain_id": "2", "data": ',
+        '',
+        json.dumps({"domain_id": "3", "data": {"price": "30"}, "tags": None}),
+        json.dumps({"domain_id": "4", "data": {"price": 40}, "tags": None}),
+        json.dumps({"domain_id": "5", "data": {"price": 50}, "tags": None}),
+    ]
+    ret = client.post('/api/v1/schemas/price/domains/import', data='\n'.join(lines) + '\n',
+                      headers={'Content-Type': 'application/x-ndjson'})
+    assert ret.status_code == 200
+
+    ret_json = ret.json()
+    assert {key: ret_json[key] for key in ('total', 'created', 'updated', 'failed')} == {
+        'total': 5, 'created': 2, 'updated': 1, 'failed': 2}
+    assert [(error['index'], error['error']) for error in ret_json['errors']] == [
+        (1, 'Invalid domain'), (3, 'Domain has a invalid schema: price')]
+
+    ret = client.get('/api/v1/schemas/price/domains?per_page=10')
+    assert [domain['domain_id'] for domain in ret.json()] == ['1', '4', '5']
+
+
+def test_patch_domain():
+    client.post('/api/v1/schemas', json={
+        "name": "price",
+        "domain_schema": {"type": "object", "additionalProperties": False,
+                          "properties": {"price": {"type": "number"}, "name": {"type": "string"}}}
+    })
+    client.post('/api/v1/schemas/price/domains', json={
+        "domain_id": "1", "data": {"name": "Eggs", "price": 34.99}, "tags": [["tenant-x"]]})
+    client.post('/api/v1/hooks', json={"type": "queue", "schema_name": "price", "event_name": "price_changed",
+                                       "queue_name": "prices", "tags": ["tenant-x"]})
+
+    ret = client.patch('/api/v1/schemas/price/domains/1', json={
+        "data": {"price": 29.99, "name": None}, "event_name": "price_changed", "metadata": {"source": "erp"}})
+    assert ret.status_code == 200
+    ret_json = ret.json()
+    assert ret_json['domain']['data'] == {"price": 29.99}
+    assert ret_json['changed_paths'] == ['price', 'name']
+    assert len(ret_json['events']) == 1
+    assert ret_json['events'][0]['metadata'] == {"source": "erp", "changed_paths": ['price', 'name']}
+
+    ret = client.get('/api/v1/schemas/price/domains?domain_id=1')
+    assert ret.json()[0]['data'] == {"price": 29.99}
+
+    # Sem alterações, nenhum evento é emitido.
+    ret = client.patch('/api/v1/schemas/price/domains/1', json={"data": {"price": 29.99},
+                                                                "event_name": "price_changed"})
+    assert ret.json()['changed_paths'] == [] and ret.json()['events'] == []
+
+    with pytest.raises(ValidationException):
+        client.patch('/api/v1/schemas/price/domains/1', json={"data": {"stock": 10}})
+
+    ret = client.get('/api/v1/schemas/price/domains?domain_id=1')
+    assert ret.json()[0]['data'] == {"price": 29.99}
+
+
+def test_patch_domain_concurrent_change(monkeypatch):
+    client.post('/api/v1/schemas', json={
+        "name": "price",
+        "domain_schema": {"type": "object", "properties": {"price": {"type": "number"}, "name": {"type": "string"}},
+                          "dependentRequired": {"price": ["name"]}}
+    })
+    client.post('/api/v1/schemas/price/domains', json={"domain_id": "1", "data": {"name": "Eggs"}})
+
+    get_domain_by_id = domain_service.get_domain_by_id
+    reads = []
+
+    async def _read_before_concurrent_write(schema_name, domain_id):
+        domain = await get_domain_by_id(schema_name, domain_id)
+        if not reads:
+            # Outra requisição remove o nome depois da primeira leitura deste patch.
+            await base_repository.update_paths(domain, {}, {"data.name": ""})
+        reads.append(domain)
+        return domain
+
+    monkeypatch.setattr(domain_service, 'get_domain_by_id', _read_before_concurrent_write)
+
+    # O patch é reaplicado sobre o documento sem nome, que com o preço deixa de ser válido.
+    with pytest.raises(ValidationException):
+        client.patch('/api/v1/schemas/price/domains/1', json={"data": {"price": 10}})
+    assert len(reads) == 2
+
+    ret = client.get('/api/v1/schemas/price/domains?domain_id=1')
+    assert ret.json()[0]['data'] == {}
+
+    async def _always_stale(schema_name, domain_id):
+        domain = await get_domain_by_id(schema_name, domain_id)
+        domain.data = {"name": "Milk"}
+        return domain
+
+    monkeypatch.setattr(domain_service, 'get_domain_by_id', _always_stale)
+
+    with pytest.raises(ConflictException):
+        client.patch('/api/v1/schemas/price/domains/1', json={"data": {"price": 10}})
@@ -10,3 +10,10 @@ def test_health_check():
     assert ret.status_code == 200
     ret_json = ret.json()
     assert ret_json == 'ok'
+
+
+def test_executor_metrics():
+    ret = client.get('/api/v1/health/executor')
+    assert ret.status_code == 200
+    assert set(ret.json()) == {'inline', 'offloaded', 'queue_depth', 'max_queue_depth', 'wait_time_total',
+                               'wait_time_max'}
@@ -1,6 +1,10 @@
+import json
+
+import pytest
 from starlette.testclient import TestClient
 
 from api import app
+from app.service.exceptions import ValidationException
 
 client = TestClient(app)
 
@@ -67,3 +71,61 @@ def test_invalid_payload():
 
     ret = client.post('/api/v1/hooks', json=payload)
     assert ret.status_code == 422
+
+
+def test_invalid_condition():
+    payload = {
+        "name": "delivery",
+        "domain_schema": {"type": "object"}
+    }
+    ret = client.post('/api/v1/schemas', json=payload)
+    assert ret.status_code == 201
+
+    payload = {
+        "type": "queue",
+        "schema_name": "delivery",
+        "event_name": "delivery_change",
+        "tags": ["tenant-x"]
+    }
+
+    with pytest.raises(ValidationException):
+        client.post('/api/v1/hooks', json={**payload, "condition": "event.metadata.value >"})
+
+    with pytest.raises(ValidationException):
+        client.post('/api/v1/hooks', json={**payload, "condition": "event.metadata.value ** 1000 > 1"})
+
+    ret = client.post('/api/v1/hooks', json={**payload, "condition": "event.metadata.value>1 * 2"})
+    assert ret.status_code == 201
+    assert ret.json().get('condition_info') == {
+        "normalized": "event.metadata.value > 2",
+        "paths": ["event.metadata.value"],
+        "always_true": False,
+    }
+
+
+def test_hooks_ndjson_stream():
+    payload = {
+        "name": "delivery",
+        "domain_schema": {"type": "object", "properties": {"carrier": {"type": "string"}}}
+    }
+    ret = client.post('/api/v1/schemas', json=payload)
+    assert ret.status_code == 201
+
+    for queue_name in ('first', 'second', 'third'):
+        payload = {
+            "type": "queue",
+            "schema_name": "delivery",
+            "event_name": "delivery_change",
+            "queue_name": queue_name,
+            "tags": ["tenant-x"]
+        }
+        ret = client.post('/api/v1/hooks', json=payload)
+        assert ret.status_code == 201
+
+    ret = client.get('/api/v1/hooks', params={"per_page": 1})
+    cursor = ret.headers.get('X-Next-Cursor')
+    assert [hook.get('queue_name') for hook in ret.json()] == ['first']
+
+    ret = client.get('/api/v1/hooks', params={"cursor": cursor}, headers={"Accept": "application/x-ndjson"})
+    assert ret.status_code == 200
+    assert [json.loads(line).get('queue_name') for line in ret.text.splitlines()] == ['second', 'third']
@@ -0,0 +1,56 @@
+import pytest
+
+from app.service import expression_service
+from app.service.extensions.evaluate_expression import larkparsing_engine, pyparsing_engine
+from app.service.extensions.evaluate_expression.analysis import fold_constants, to_expression, ConditionAnalysis
+
+
+@pytest.mark.parametrize("expression, normalized", [
+    ("event.metadata.new_price>20000", "event.metadata.new_price > 20000"),
+    ("a.b > 10 * 2 + 1", "a.b > 21"),
+    ("(a + b) * c", "(a + b) * c"),
+    ("a - (b - c)", "a - (b - c)"),
+    ("a - b - c", "a - b - c"),
+    ("2 ** 3 ** a", "2 ** 3 ** a"),
+    ("(2 ** a) ** 3", "(2 ** a) ** 3"),
+    ("-a ** 2", "-a ** 2"),
+    ("a > 1 - 3", "a > -2"),
+    ("(a or b) and c", "(a or b) and c"),
+    ("TRUE and a == \"Eggs\" OR false", "a == \"Eggs\" or false"),
+    ("false and a or true", "false"),
+    ("true or a", "true"),
+    ("1 / 0 > a", "1 / 0 > a"),
+    ("a > 0.1 + 0.2", "a > 0.30000000000000004"),
+    ("\"ab\" + \"cd\" == a", "\"abcd\" == a"),
+])
+def test_normalize(expression, normalized):
+    assert expression_service.analyze_condition(expression).normalized == normalized
+
+
+@pytest.mark.parametrize("expression", [
+    "a.b > 10 * 2 + 1",
+    "-a ** 2",
+    "a > 1 - 3",
+    "(a or b) and c",
+    "2 ** 3 ** a",
+    "a - (b - c) * -d",
+    "x.y < 2 and (z or -1 ** 2 == w)",
+])
+def test_normalized_expression_parses_to_the_same_tree(expression):
+    tree = fold_constants(pyparsing_engine.parse(expression))
+    normalized = to_expression(tree)
+
+    assert fold_constants(pyparsing_engine.parse(normalized)) == tree
+    assert fold_constants(larkparsing_engine.parse(normalized)) == tree
+
+
+def test_analyze():
+    analysis = expression_service.analyze_condition(
+        'event.metadata.new_price > 20000 and domain.data.name == "Eggs" or event.metadata.new_price < 10')
+
+    assert analysis.paths == ['domain.data.name', 'event.metadata.new_price']
+    assert not analysis.always_true
+
+    assert expression_service.analyze_condition("1 < 2 or a.b").always_true
+    assert expression_service.analyze_condition("1 < 2 or a.b") == ConditionAnalysis("true", [], True)
+    assert not expression_service.analyze_condition("1 > 2 and a.b").always_true
@@ -0,0 +1,109 @@
+import asyncio
+import os
+import pickle
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.service.exceptions import ValidationException
+from app.service.schema_registry import CompiledSchema
+from app.utils.executor import CpuExecutor, payload_size
+
+SCHEMA = {"type": "object", "properties": {"price": {"type": "number"}}, "required": ["price"]}
+
+
+def test_payload_size():
+    assert payload_size(1, 100) == 1
+    assert payload_size({"a": [1, 2, {"b": "x"}]}, 100) == 6
+    assert payload_size("x" * 640, 100) == 11
+    assert payload_size(list(range(10000)), 100) == 100
+
+
+def test_compiled_schema_pickle():
+    compiled = CompiledSchema('price', object(), SCHEMA, validator='codegen')
+    restored = pickle.loads(pickle.dumps(compiled))
+
+    assert restored.name == 'price' and restored.version == compiled.version and restored.generated
+    assert pickle.loads(pickle.dumps(compiled)) is restored
+
+
+def test_inline_execution():
+    executor = CpuExecutor(workers=2, threshold=100)
+    assert asyncio.run(executor.run(10, sum, [1, 2])) == 3
+
+    disabled = CpuExecutor(workers=0, threshold=0)
+    assert asyncio.run(disabled.run(1000, sum, [1, 2])) == 3
+
+    assert executor.metrics().inline == 1 and executor.metrics().offloaded == 0
+
+
+def test_process_pool_execution():
+    executor = CpuExecutor(workers=1, threshold=100)
+    compiled = CompiledSchema('price', None, SCHEMA, validator='codegen')
+
+    async def _run():
+        await asyncio.gather(*(executor.run(100, compiled.validate, {"price": idx}) for idx in range(4)))
+        with pytest.raises(ValidationException) as exc:
+            await executor.run(100, compiled.validate, {"price": "34.99"})
+        return exc.value
+
+    try:
+        error = asyncio.run(_run())
+    finally:
+        executor.shutdown()
+
+    assert error.details == "'34.99' is not of type 'number'"
+
+    metrics = executor.metrics()
+    assert metrics.inline == 0 and metrics.offloaded == 5
+    assert metrics.queue_depth == 0 and metrics.max_queue_depth == 4
+    assert metrics.wait_time_max >= 0 and metrics.wait_time_total >= metrics.wait_time_max
+
+
+def _crash_once(marker: str):
+    if not os.path.exists(marker):
+        open(marker, 'w').close()
+        os._exit(1)
+    return os.getpid()
+
+
+def _crash():
+    os._exit(1)
+
+
+def _double(items):
+    if 'fail' in items:
+        raise ValueError('chunk failed')
+    return [(item * 2, os.getpid()) for item in items]
+
+
+def test_broken_pool_recovery(tmp_path):
+    executor = CpuExecutor(workers=1, threshold=0)
+
+    async def _run():
+        retried = await executor.run(1, _crash_once, str(tmp_path / 'crashed'))
+        with pytest.raises(BrokenProcessPool):
+            await executor.run(1, _crash)
+        return retried, await executor.run(1, os.getpid)
+
+    try:
+        retried, recreated = asyncio.run(_run())
+    finally:
+        executor.shutdown()
+
+    assert os.getpid() not in (retried, recreated)
+
+
+def test_run_chunks():
+    executor = CpuExecutor(workers=2, threshold=4)
+
+    try:
+        inline = asyncio.run(executor.run_chunks(_double, [1, 2], [1, 1]))
+        chunked = asyncio.run(executor.run_chunks(_double, [1, 2, 3, 'fail', 5], [4, 4, 4, 4, 4]))
+    finally:
+        executor.shutdown()
+
+    assert inline == [(2, os.getpid()), (4, os.getpid())]
+    assert [ret for ret, _ in chunked[:3]] == [2, 4, 6] and os.getpid() not in {pid for _, pid in chunked[:3]}
+    assert all(isinstance(ret, ValueError) for ret in chunked[3:])
+    assert executor.metrics().offloaded == 2
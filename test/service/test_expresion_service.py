@@ -1,9 +1,18 @@
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List
+
 import pytest
+from pydantic import BaseModel
 
 from app.service import expression_service
+from app.service.exceptions import ValidationException
+from app.service.extensions.evaluate_expression.exceptions import BudgetExceededException, ExpressionSyntaxException
+from app.service.extensions.evaluate_expression import larkparsing_engine, pyparsing_engine
+from app.utils.cache import LRUCache, CacheInfo
 
 
-@pytest.mark.parametrize("expression, variables, expected", [
+EXPRESSIONS = [
     ("10 > 20", {}, False),
     ("12.3 + 30 > 40", {}, True),
     ("12 > 40 - 30", {}, True),
@@ -17,6 +26,156 @@ from app.service import expression_service
     ("b.c > 100 and TruE", {"a": 40, "b": {"c": 90}}, False),
     ("b.c * -1", {"a": 40, "b": {"c": 90}}, -90),
     ("b.c**3", {"b": {"c": 2}}, 8),
-])
+]
+
+
+@pytest.mark.parametrize("expression, variables, expected", EXPRESSIONS)
 def test_evaluate(expression, variables, expected):
-    assert expression_service.evaluate(expression, variables) == expected
\ No newline at end of file
+    assert expression_service.evaluate(expression, variables) == expected
+
+
+@pytest.mark.parametrize("engine", expression_service.ENGINES)
+@pytest.mark.parametrize("expression, variables, expected", [
+    *EXPRESSIONS,
+    ("2 ** 3 ** 2", {}, 512),
+    ("-a.b + 1", {"a": {"b": 3}}, -2),
+    ("a.x == \"Eggs\" and a.y > 1 or false", {"a": {"x": "Eggs", "y": 2}}, True),
+    ("false and true or true", {}, False),
+    ("a.missing.path", {"a": {"b": 1}}, None),
+])
+def test_evaluate_with_engine(engine, expression, variables, expected):
+    assert expression_service.evaluate(expression, variables, engine=engine) == expected
+
+
+@pytest.mark.parametrize("expression", [
+    *(expression for expression, _, _ in EXPRESSIONS),
+    "-2**2",
+    "2 ** -1",
+    "(a > 1) and (b or c)",
+    "a < b < c",
+    "1 - 2 - 3",
+    "8 / 2 / 2",
+    "x != \"a b\"",
+])
+def test_lark_and_pyparsing_build_same_tree(expression):
+    assert larkparsing_engine.parse(expression) == pyparsing_engine.parse(expression)
+
+
+def test_compiled_condition_cache():
+    expression_service.clear_cache()
+
+    assert expression_service.evaluate("a.b > 10", {"a": {"b": 20}}) is True
+    assert expression_service.evaluate("a.b > 10", {"a": {"b": 5}}) is False
+    assert expression_service.evaluate("a.c", {"a": {"b": 5}}) is None
+
+    info = expression_service.cache_info()
+    assert info.misses == 2
+    assert info.hits == 1
+    assert info.size == 2
+    assert expression_service.compile_condition("a.b > 10") is expression_service.compile_condition("a.b > 10")
+
+
+def test_lru_cache_eviction():
+    cache = LRUCache(maxsize=2)
+    cache.get_or_create('a', lambda: 1)
+    cache.get_or_create('b', lambda: 2)
+    cache.get_or_create('a', lambda: 3)
+    cache.get_or_create('c', lambda: 4)
+
+    assert 'a' in cache and 'c' in cache and 'b' not in cache
+    assert cache.info() == CacheInfo(hits=1, misses=3, evictions=1, size=2, maxsize=2)
+
+
+def test_concurrent_evaluation():
+    expression = "event.metadata.new_price > 100 and domain.data.name == \"Eggs\""
+
+    def _evaluate(price):
+        variables = {"event": {"metadata": {"new_price": price}}, "domain": {"data": {"name": "Eggs"}}}
+        return expression_service.evaluate(expression, variables), price > 100
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(_evaluate, range(0, 400, 3)))
+
+    assert all(ret == expected for ret, expected in results)
+
+
+@pytest.mark.parametrize("engine", expression_service.ENGINES)
+def test_compiled_condition_is_picklable(engine):
+    compiled = expression_service.compile_condition("a.b * 2 > 10 or c", engine=engine)
+    restored = pickle.loads(pickle.dumps(compiled))
+
+    assert restored == compiled
+    assert restored.evaluate({"a": {"b": 6}}) is True
+
+
+class _Hook(BaseModel):
+    condition: Optional[str]
+
+
+class _Event(BaseModel):
+    event_name: Optional[str]
+    metadata: Optional[dict]
+    hook: Optional[_Hook]
+
+
+class _Domain(BaseModel):
+    domain_id: Optional[str]
+    data: Optional[dict]
+    tags: Optional[List[List[str]]]
+
+
+@pytest.mark.parametrize("engine", expression_service.ENGINES)
+def test_evaluate_with_model_view(engine):
+    domain = _Domain(domain_id='1234567890', data={"name": "Eggs", "price": 34.99})
+    event = _Event(event_name='price_changed', metadata={"new_price": 30050}, hook=_Hook(condition='x'))
+    variables = {
+        "event": expression_service.ModelView(event, include={'event_name', 'metadata'}),
+        "domain": expression_service.ModelView(domain),
+    }
+
+    assert expression_service.evaluate(
+        'event.metadata.new_price > 20000 and domain.data.name == "Eggs"', variables, engine=engine) is True
+    assert expression_service.evaluate('domain.tags', variables, engine=engine) is None
+    assert expression_service.evaluate('event.hook.condition', variables, engine=engine) is None
+    assert expression_service.evaluate('domain.data.missing.path', variables, engine=engine) is None
+
+
+@pytest.mark.parametrize("expression", [
+    "a" * 2001,
+    "(" * 9 + "a" + ")" * 9,
+    " and ".join(["a > 1"] * 100),
+    "-" * 40 + "a",
+])
+def test_condition_over_budget_is_rejected(expression):
+    with pytest.raises(BudgetExceededException):
+        expression_service.compile_condition(expression)
+
+    with pytest.raises(ValidationException):
+        expression_service.analyze_condition(expression)
+
+
+@pytest.mark.parametrize("engine", expression_service.ENGINES)
+@pytest.mark.parametrize("expression, variables", [
+    ("2 ** 1000000", {}),
+    ("a ** b", {"a": 10, "b": 65}),
+    ("a ** 60 ** 2", {"a": 3}),
+    ("a.b * 100000 == \"x\"", {"a": {"b": "abc"}}),
+    ("a * a * a", {"a": 2 ** 2000}),
+])
+def test_expensive_operations_are_bounded(engine, expression, variables):
+    with pytest.raises(BudgetExceededException):
+        expression_service.evaluate(expression, variables, engine=engine)
+
+
+@pytest.mark.parametrize("engine", expression_service.ENGINES)
+def test_invalid_syntax(engine):
+    with pytest.raises(ExpressionSyntaxException):
+        expression_service.compile_condition("a >", engine=engine)
+
+    with pytest.raises(ExpressionSyntaxException):
+        expression_service.compile_condition("a >", engine=engine)
+
+
+def test_constant_exponent_is_checked_at_compile_time():
+    with pytest.raises(BudgetExceededException):
+        expression_service.compile_condition("a.b ** 1000 > 1")
@@ -0,0 +1,138 @@
+import random
+import time
+
+from app.domain.hook import Hook, OID
+from app.service.extensions.evaluate_expression import larkparsing_engine
+from app.service.hook_routing import ConditionIndex, RoutingTable, TagIndex, filter_by_tags
+
+
+def _hook(**kwargs):
+    return Hook(id=OID(), schema_name='price', event_name='price_changed', **kwargs)
+
+
+def test_routing_table():
+    table = RoutingTable(ttl=30)
+    key = ('price', 'price_changed')
+    first, second = _hook(tags=['tenant-x']), _hook(tags=['tenant-y'])
+
+    assert table.get(key) is None
+
+    table.load(key, [first])
+    table.add(second)
+    assert table.get(key) == [first, second]
+
+    table.remove(first)
+    assert table.get(key) == [second]
+
+    table.add(Hook(id=OID(), schema_name='price', event_name='other'))
+    assert table.get(('price', 'other')) is None
+
+
+def test_routing_table_expiration():
+    table = RoutingTable(ttl=0.01)
+    key = ('price', 'price_changed')
+
+    table.load(key, [_hook()])
+    assert table.get(key) is not None
+
+    time.sleep(0.02)
+    assert table.get(key) is None
+
+
+def test_disabled_routing_table():
+    table = RoutingTable(ttl=0)
+    key = ('price', 'price_changed')
+
+    table.load(key, [_hook()])
+    assert table.get(key) is None
+
+
+def test_filter_by_tags():
+    both, tenant_x, untagged = _hook(tags=['tenant-x', 'tenant-y']), _hook(tags=['tenant-x']), _hook()
+    hooks = [both, tenant_x, untagged]
+
+    assert filter_by_tags(hooks, [['tenant-x'], ['tenant-y']]) == [both, tenant_x]
+    assert filter_by_tags(hooks, [['tenant-x', 'tenant-y']]) == [both]
+    assert filter_by_tags(hooks, [['tenant-z']]) == []
+    assert filter_by_tags(hooks, []) == hooks
+    assert filter_by_tags(hooks, [['tenant-z'], []]) == hooks
+
+
+def test_tag_index_agrees_with_filter_by_tags():
+    rnd = random.Random(7)
+    tags = [f'tag-{idx}' for idx in range(8)]
+    hooks = [_hook(tags=rnd.sample(tags, rnd.randint(0, 4))) for _ in range(200)]
+    index = TagIndex(hooks)
+
+    for hook in hooks[::3]:
+        index.remove(hook)
+    remaining = [hook for idx, hook in enumerate(hooks) if idx % 3]
+
+    for _ in range(50):
+        groups = [rnd.sample(tags, rnd.randint(0, 3)) for _ in range(rnd.randint(0, 4))]
+        assert sorted(map(id, index.match(groups))) == sorted(map(id, filter_by_tags(remaining, groups)))
+
+
+def test_tag_index_reuses_slots():
+    index = TagIndex()
+    first, second = _hook(tags=['tenant-x']), _hook(tags=['tenant-x', 'tenant-y'])
+    index.add(first)
+    index.add(second)
+
+    index.remove(first)
+    third = _hook(tags=['tenant-y'])
+    index.add(third)
+
+    assert index.match([['tenant-y']]) == [third, second]
+    assert index.match([['tenant-x']]) == [second]
+    assert index.hooks() == [third, second]
+
+
+def test_routing_table_match():
+    table = RoutingTable(ttl=30)
+    key = ('price', 'price_changed')
+    hook = _hook(tags=['tenant-x'])
+
+    assert table.match(key, [['tenant-x']]) is None
+    table.load(key, [hook])
+    assert table.match(key, [['tenant-x']]) == [hook]
+    assert table.match(key, [['tenant-y']]) == []
+
+
+def test_condition_index_match():
+    unconditional, cheap = _hook(tags=['tenant-x']), _hook(condition='domain.price < 10', tags=['tenant-x'])
+    residual = _hook(condition='domain.price < 10 and domain.name != "Milk"')
+    other_tenant = _hook(condition='domain.price < 10', tags=['tenant-y'])
+    invalid = _hook(condition='domain.price <')
+    index = ConditionIndex(larkparsing_engine.parse, [unconditional, cheap, residual, other_tenant, invalid])
+
+    match = index.match([['tenant-x'], []], {"domain": {"price": 5}})
+    assert match.accepted == [unconditional, cheap, other_tenant]
+    assert match.to_evaluate == [residual] and match.rejected == [invalid]
+
+    match = index.match([['tenant-x']], {"domain": {"price": 50}})
+    assert match.accepted == [unconditional] and match.to_evaluate == [] and match.rejected == []
+
+    index.remove(cheap)
+    assert index.match([['tenant-x']], {"domain": {"price": 5}}).accepted == [unconditional]
+
+
+def test_routing_table_conditions():
+    table = RoutingTable(ttl=30, parse=larkparsing_engine.parse)
+    key = ('price', 'price_changed')
+    cheap, expensive = _hook(condition='domain.price < 10'), _hook(condition='domain.price > 100')
+
+    assert table.conditions(key) is None
+    table.load(key, [cheap, expensive])
+    table.remove(expensive)
+    assert table.conditions(key).match([], {"domain": {"price": 500}}).accepted == []
+
+    added = _hook(condition='domain.price > 200')
+    table.add(added)
+    assert table.conditions(key).match([], {"domain": {"price": 500}}).accepted == [added]
+
+    # A recarga da rota descarta os hooks removidos por outra instância.
+    table.load(key, [cheap])
+    assert table.conditions(key).match([], {"domain": {"price": 500}}).accepted == []
+    assert table.conditions(key).match([], {"domain": {"price": 5}}).accepted == [cheap]
+    assert RoutingTable(ttl=30).conditions(key) is None
@@ -0,0 +1,55 @@
+import pytest
+
+from app.service.exceptions import ValidationException
+from app.service.merge_patch import merge_patch
+
+DATA = {"name": "Eggs", "price": 34.99, "dimensions": {"width": 10, "height": 5}, "tags": ["a"]}
+
+
+def test_merge_patch():
+    ret = merge_patch(DATA, {"price": 29.99, "name": None, "dimensions": {"width": 12, "depth": 3},
+                             "tags": ["a", "b"], "origin": {"country": "BR", "state": None}}, 'data')
+
+    assert ret.document == {"price": 29.99, "dimensions": {"width": 12, "height": 5, "depth": 3},
+                            "tags": ["a", "b"], "origin": {"country": "BR"}}
+    assert ret.set_fields == {"data.price": 29.99, "data.dimensions.width": 12, "data.dimensions.depth": 3,
+                              "data.tags": ["a", "b"], "data.origin": {"country": "BR"}}
+    assert ret.unset_fields == {"data.name": ""}
+    assert ret.changed_paths == ["price", "name", "dimensions.width", "dimensions.depth", "tags", "origin"]
+    assert DATA["price"] == 34.99
+
+
+def test_merge_patch_unchanged():
+    ret = merge_patch(DATA, {"price": 34.99, "missing": None, "dimensions": {"width": 10}}, 'data')
+
+    assert ret.document == DATA
+    assert ret.set_fields == {} and ret.unset_fields == {} and ret.changed_paths == []
+
+
+def test_merge_patch_replaces_non_object():
+    ret = merge_patch({"price": 10}, {"price": {"amount": 10, "currency": "BRL"}}, 'data')
+    assert ret.set_fields == {"data.price": {"amount": 10, "currency": "BRL"}}
+
+
+
+def test_merge_patch_null_target():
+    ret = merge_patch(None, {"price": 10, "name": None}, 'data')
+    assert ret.document == {"price": 10}
+    assert ret.set_fields == {"data": {"price": 10}} and ret.unset_fields == {}
+    assert ret.changed_paths == ["price"]
+
+
+def test_merge_patch_type_changes():
+    ret = merge_patch({"active": True, "count": 0, "flags": [True]}, {"active": 1, "count": False, "flags": [1]},
+                      'data')
+    assert ret.set_fields == {"data.active": 1, "data.count": False, "data.flags": [1]}
+    assert ret.changed_paths == ["active", "count", "flags"]
+
+    assert merge_patch({"active": True}, {"active": True}, 'data').changed_paths == []
+
+
+@pytest.mark.parametrize('patch', [{"a.b": 1}, {"$set": 1}, {"": 1}, {"a": {"$inc": 1}}, {"a": {"b": {"$x": 1}}},
+                                   {"b": {"c": {"d.e": 1}}}, {"b": [{"$x": 1}]}])
+def test_merge_patch_invalid_keys(patch):
+    with pytest.raises(ValidationException):
+        merge_patch({"a": 1}, patch, 'data')
@@ -0,0 +1,70 @@
+import pytest
+
+from app.service.extensions.evaluate_expression import larkparsing_engine
+from app.service.extensions.evaluate_expression.predicate_index import PredicateIndex, decompose, Atom
+
+CONDITIONS = {
+    "gt": "event.metadata.new_price > 20000",
+    "ge": "event.metadata.new_price >= 20000",
+    "lt": "event.metadata.new_price < 100",
+    "le": "100 >= event.metadata.new_price",
+    "eq": "domain.data.name == \"Eggs\"",
+    "and": "domain.data.name == \"Eggs\" and event.metadata.new_price > 50",
+    "residual": "domain.data.name == \"Eggs\" and event.metadata.new_price * 2 > 50",
+    "or": "domain.data.name == \"Milk\" or event.metadata.new_price > 50",
+}
+
+
+def _variables(name, price):
+    return {"event": {"metadata": {"new_price": price}}, "domain": {"data": {"name": name}}}
+
+
+@pytest.fixture
+def index():
+    predicate_index = PredicateIndex()
+    for key, condition in CONDITIONS.items():
+        predicate_index.add(key, larkparsing_engine.parse(condition))
+    return predicate_index
+
+
+def test_decompose():
+    atoms, residual = decompose(larkparsing_engine.parse(CONDITIONS["and"]))
+    assert atoms == {Atom(("domain", "data", "name"), "==", "Eggs"), Atom(("event", "metadata", "new_price"), ">", 50)}
+    assert not residual
+
+    atoms, residual = decompose(larkparsing_engine.parse(CONDITIONS["le"]))
+    assert atoms == {Atom(("event", "metadata", "new_price"), "<=", 100)}
+
+    atoms, residual = decompose(larkparsing_engine.parse(CONDITIONS["or"]))
+    assert not atoms and residual
+
+
+@pytest.mark.parametrize("name, price", [
+    ("Eggs", 20000), ("Eggs", 20001), ("Eggs", 100), ("Eggs", 99.5), ("Milk", 60), ("Milk", 10), ("Eggs", 30),
+])
+def test_match_agrees_with_evaluation(index, name, price):
+    variables = _variables(name, price)
+    accepted, to_evaluate = index.match(variables)
+
+    matched = accepted | {key for key in to_evaluate
+                          if larkparsing_engine.evaluate(CONDITIONS[key], variables)}
+    expected = {key for key, condition in CONDITIONS.items() if larkparsing_engine.evaluate(condition, variables)}
+
+    assert matched == expected
+    assert not accepted & {"residual", "or"}
+
+
+def test_missing_or_incompatible_values_do_not_match(index):
+    accepted, to_evaluate = index.match({"event": {"metadata": {"new_price": "cheap"}}, "domain": {"data": {}}})
+    assert not accepted
+    assert to_evaluate == {"or"}
+
+
+def test_remove(index):
+    index.remove("gt")
+    index.remove("and")
+
+    accepted, _ = index.match(_variables("Eggs", 30000))
+    assert "gt" not in accepted and "and" not in accepted
+    assert "ge" in accepted
+    assert "gt" not in index and len(index) == len(CONDITIONS) - 2
@@ -0,0 +1,134 @@
+import random
+
+import pytest
+from jsonschema import Draft4Validator, Draft7Validator, Draft202012Validator
+from jsonschema.validators import validator_for
+
+from app.service.exceptions import ValidationException
+from app.service.extensions.json_schema import codegen
+from app.service.extensions.json_schema.exceptions import UnsupportedSchemaException
+from app.service.schema_registry import CompiledSchema
+
+VALUES = [None, True, False, 0, 1, -1, 1.0, 1.5, 0.1, 0.3, 10, 100, 2 ** 70, '', 'a', 'Eggs', 'x-1', '1.5',
+          [], [1], [1, 1], [1, True], [0, False], ['a', 'b'], ['a', 'a'], [{'a': 1}, {'a': 1}], [[1], [True]],
+          {}, {'a': 1}, {'a': True}, {'price': 34.99}, {'price': '34.99'}, {'x-a': 1}, {'x-a': 1.5}]
+
+# Corpus de conformidade: cada schema é verificado contra o jsonschema em todos os VALUES e em instâncias
+# aleatórias montadas a partir deles.
+CORPUS = [
+    True,
+    False,
+    {},
+    {"type": "null"},
+    {"type": "boolean"},
+    {"type": "integer"},
+    {"type": "number"},
+    {"type": "string"},
+    {"type": "array"},
+    {"type": "object"},
+    {"type": ["string", "null"]},
+    {"type": ["integer", "boolean"]},
+    {"enum": [1, "a", None]},
+    {"enum": [True, [1], {"a": 1}]},
+    {"enum": [0, 1.5]},
+    {"const": 1},
+    {"const": False},
+    {"const": [1, True]},
+    {"const": {"a": 1}},
+    {"minimum": 1, "maximum": 10},
+    {"exclusiveMinimum": 1, "exclusiveMaximum": 10},
+    {"type": "integer", "minimum": 0},
+    {"multipleOf": 0.1},
+    {"multipleOf": 2},
+    {"multipleOf": 0.01, "type": "number"},
+    {"minLength": 1, "maxLength": 3},
+    {"pattern": "^[A-Z]"},
+    {"type": "string", "pattern": "\\d"},
+    {"minItems": 1, "maxItems": 2},
+    {"uniqueItems": True},
+    {"uniqueItems": False},
+    {"items": {"type": "integer"}},
+    {"items": False},
+    {"items": True, "type": "array"},
+    {"items": {"type": "array", "items": {"type": "boolean"}}},
+    {"required": ["a"]},
+    {"type": "object", "required": ["price"], "properties": {"price": {"type": "number", "minimum": 0}}},
+    {"properties": {"a": {"type": "integer"}}, "additionalProperties": False},
+    {"properties": {"a": {"type": "integer"}}, "additionalProperties": {"type": "string"}},
+    {"patternProperties": {"^x-": {"type": "integer"}}},
+    {"patternProperties": {"^x-": True}, "additionalProperties": False},
+    {"minProperties": 1, "maxProperties": 1},
+    {"dependentRequired": {"a": ["price"]}},
+    {"allOf": [{"type": "number"}, {"minimum": 1}]},
+    {"anyOf": [{"type": "string"}, {"type": "integer"}]},
+    {"oneOf": [{"type": "number"}, {"type": "integer"}]},
+    {"oneOf": [{"minimum": 1}, {"type": "string"}, False]},
+    {"not": {"type": "array"}},
+    {"not": True},
+    {"if": {"type": "integer"}, "then": {"minimum": 10}, "else": {"type": "string"}},
+    {"if": {"type": "object"}, "then": {"required": ["a"]}},
+    {"then": {"type": "integer"}},
+    {"format": "email"},
+    {"title": "Price", "description": "ignored", "unknown": {"type": "integer"}},
+    {"properties": {"a": {"properties": {"b": {"enum": [1]}}, "required": ["b"]}}},
+    {"$schema": "http://json-schema.org/draft-07/schema#", "dependentRequired": {"a": ["price"]}},
+    {"$schema": "http://json-schema.org/draft-07/schema#", "exclusiveMinimum": 1, "const": 2},
+]
+
+
+def _random_instance(rnd: random.Random, depth: int = 0):
+    kind = rnd.random()
+    if depth > 2 or kind < 0.5:
+        return rnd.choice(VALUES)
+    if kind < 0.75:
+        return [_random_instance(rnd, depth + 1) for _ in range(rnd.randint(0, 3))]
+    keys = ['a', 'b', 'price', 'x-a', 'name']
+    return {rnd.choice(keys): _random_instance(rnd, depth + 1) for _ in range(rnd.randint(0, 3))}
+
+
+@pytest.mark.parametrize('schema', CORPUS)
+def test_conformance(schema):
+    validator_cls = validator_for(schema)
+    validator = validator_cls(schema)
+    check = codegen.compile_schema(schema, validator_cls)
+    rnd = random.Random(42)
+
+    for instance in VALUES + [_random_instance(rnd) for _ in range(300)]:
+        assert check(instance) == validator.is_valid(instance), (schema, instance)
+
+
+@pytest.mark.parametrize('schema, validator_cls', [
+    ({"$ref": "#/$defs/price", "$defs": {"price": {"type": "number"}}}, Draft202012Validator),
+    ({"properties": {"a": {"contains": {"type": "integer"}}}}, Draft202012Validator),
+    ({"prefixItems": [{"type": "integer"}]}, Draft202012Validator),
+    ({"items": [{"type": "integer"}]}, Draft7Validator),
+    ({"type": "integer"}, Draft4Validator),
+])
+def test_unsupported_schema(schema, validator_cls):
+    with pytest.raises(UnsupportedSchemaException):
+        codegen.compile_schema(schema, validator_cls)
+
+
+def test_compiled_schema_codegen():
+    schema = {"type": "object", "properties": {"price": {"type": "number"}}, "required": ["price"]}
+    compiled = CompiledSchema('price', None, schema, validator='codegen')
+    assert compiled.generated
+
+    compiled.validate({"price": 34.99})
+    with pytest.raises(ValidationException) as exc:
+        compiled.validate({"price": "34.99"})
+    assert str(exc.value) == 'Domain has a invalid schema: price'
+    assert exc.value.details == "'34.99' is not of type 'number'"
+
+
+def test_compiled_schema_codegen_fallback():
+    schema = {"$ref": "#/$defs/price", "$defs": {"price": {"type": "number"}}}
+    compiled = CompiledSchema('price', None, schema, validator='codegen')
+    assert not compiled.generated
+
+    compiled.validate(34.99)
+    with pytest.raises(ValidationException):
+        compiled.validate("34.99")
+
+    with pytest.raises(ValueError):
+        CompiledSchema('price', None, schema, validator='fastjsonschema')
@@ -0,0 +1,61 @@
+import time
+
+import pytest
+
+from app.service.exceptions import ValidationException
+from app.service.schema_registry import SchemaRegistry
+
+SCHEMA = {"type": "object", "properties": {"price": {"type": "number"}}, "required": ["price"]}
+
+
+def test_compiled_schema_validate():
+    compiled = SchemaRegistry(ttl=30).put('price', None, SCHEMA)
+
+    compiled.validate({"price": 34.99})
+
+    with pytest.raises(ValidationException) as exc:
+        compiled.validate({"price": "34.99"})
+    assert str(exc.value) == 'Domain has a invalid schema: price'
+    assert exc.value.details == "'34.99' is not of type 'number'"
+
+    with pytest.raises(ValidationException):
+        compiled.validate({})
+
+
+def test_compiled_schema_invalid_schema():
+    compiled = SchemaRegistry(ttl=30).put('price', None, {"type": "invalid"})
+
+    with pytest.raises(ValidationException) as exc:
+        compiled.validate({"price": 34.99})
+    assert str(exc.value) == 'Invalid schema: price'
+
+
+def test_schema_registry():
+    registry = SchemaRegistry(ttl=30)
+    assert registry.get('price') is None
+
+    compiled = registry.put('price', 'v1', SCHEMA)
+    assert registry.get('price') is compiled
+
+    # Mesma versão do schema: o validador compilado é reaproveitado.
+    assert registry.put('price', 'v2', dict(SCHEMA)) is compiled
+    assert compiled.schema == 'v2'
+
+    changed = registry.put('price', 'v3', {**SCHEMA, "required": []})
+    assert changed is not compiled
+    assert changed.version != compiled.version
+    changed.validate({})
+
+    registry.invalidate('price')
+    assert registry.get('price') is None
+
+
+def test_schema_registry_expiration():
+    registry = SchemaRegistry(ttl=0.01)
+    registry.put('price', None, SCHEMA)
+    time.sleep(0.02)
+    assert registry.get('price') is None
+
+    disabled = SchemaRegistry(ttl=0)
+    assert disabled.put('price', None, SCHEMA) is not None
+    assert disabled.get('price') is None